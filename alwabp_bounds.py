@@ -0,0 +1,115 @@
+import os
+import csv
+import math
+import argparse
+from typing import Dict, List, Optional, Tuple
+"""
+
+    limitantes inferiores do ALWABP
+
+    Limitantes clássicos calculados a partir da instância, usando para cada tarefa o
+    menor tempo entre os trabalhadores capazes de executá-la:
+      - carga: soma dos tempos mínimos dividida pelo número de estações m;
+      - maior tarefa: nenhuma estação tem carga menor que o maior tempo mínimo;
+      - pombos: com n > m, duas das m+1 maiores tarefas dividem uma estação.
+    Opcionalmente, combina-os com o LB/UB conhecido de instances.csv.
+    O VNS usa o limitante para parar assim que a melhor solução o atinge (ótimo provado).
+
+"""
+# Configurações
+INSTANCES_CSV = "instances.csv"
+INF = float('inf')
+
+# Sufixo do nome do arquivo de instância -> família em instances.csv
+FAMILIES = {
+    "hes": "heskia",
+    "ros": "roszieg",
+    "wee": "wee-mag",
+    "ton": "tonge",
+}
+
+def min_task_times(instance) -> List[float]:
+    """ Menor tempo de cada tarefa entre os trabalhadores (INF se nenhum a executa). """
+    return [min(instance.task_times[w][i] for w in range(instance.num_workers)) if instance.num_workers else INF
+            for i in range(instance.num_tasks)]
+
+def _integral(values: List[float]) -> bool:
+    return all(float(v).is_integer() for v in values)
+
+def lb_workload(instance) -> float:
+    """ Soma dos tempos mínimos / m (arredondada para cima quando todos os tempos são inteiros). """
+    times = min_task_times(instance)
+    if not times or instance.num_workers == 0:
+        return 0.0
+    bound = sum(times) / instance.num_workers
+    if bound < INF and _integral(times):
+        bound = float(math.ceil(bound - 1e-9))
+    return bound
+
+def lb_max_task(instance) -> float:
+    """ Maior tempo mínimo de tarefa. """
+    return max(min_task_times(instance), default=0.0)
+
+def lb_pigeonhole(instance) -> float:
+    """ Com n > m, alguma estação recebe duas das m+1 maiores tarefas: t[m-1] + t[m] (ordem decrescente). """
+    m = instance.num_workers
+    times = sorted(min_task_times(instance), reverse=True)
+    if m == 0 or len(times) <= m:
+        return 0.0
+    return times[m - 1] + times[m]
+
+def lower_bound(instance, known_lb: Optional[float] = None) -> Optional[float]:
+    """
+    Melhor limitante inferior disponível, ou None se alguma tarefa não puder ser executada
+    por nenhum trabalhador (instância infactível: não há limitante para a parada antecipada).
+    """
+    if lb_max_task(instance) >= INF:
+        return None
+    bounds = [lb_workload(instance), lb_max_task(instance), lb_pigeonhole(instance)]
+    if known_lb is not None:
+        bounds.append(known_lb)
+    return max(bounds)
+
+# --- Limitantes conhecidos (instances.csv) ---
+
+def load_known_bounds(path: str = INSTANCES_CSV) -> Dict[Tuple[str, int], Tuple[float, float]]:
+    """ (família, número) -> (LB, UB) lidos de instances.csv. """
+    bounds = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            row = {key.strip(): value for key, value in row.items()}
+            bounds[(row["name"], int(row["num"]))] = (float(row["LB"]), float(row["UB"]))
+    return bounds
+
+def instance_key(instance_name: str) -> Optional[Tuple[str, int]]:
+    """ Nome do arquivo de instância (ex.: '10_hes') -> chave de instances.csv (ex.: ('heskia', 10)). """
+    parts = os.path.basename(instance_name).split("_")
+    if len(parts) < 2 or parts[1] not in FAMILIES:
+        return None
+    try:
+        return FAMILIES[parts[1]], int(parts[0])
+    except ValueError:
+        return None
+
+def known_bounds(instance_name: str, path: str = INSTANCES_CSV) -> Optional[Tuple[float, float]]:
+    """ (LB, UB) conhecidos da instância, ou None se o arquivo ou a instância não existirem. """
+    key = instance_key(instance_name)
+    if key is None or not os.path.exists(path):
+        return None
+    return load_known_bounds(path).get(key)
+
+if __name__ == "__main__":
+    from alwabp_vns import ALWABPInstance
+
+    parser = argparse.ArgumentParser(description="Calcula os limitantes inferiores de instâncias do ALWABP.")
+    parser.add_argument("instances", nargs="+", help="arquivos de instância")
+    parser.add_argument("--csv", default=INSTANCES_CSV, help=f"arquivo com LB/UB conhecidos (padrão: {INSTANCES_CSV})")
+    args = parser.parse_args()
+
+    print("Instance;LB_workload;LB_max_task;LB_pigeonhole;LB_known;UB_known;LB")
+    for path in args.instances:
+        instance = ALWABPInstance.from_path(path)
+        known = known_bounds(path, args.csv)
+        known_lb, known_ub = known if known is not None else (None, None)
+        print(f"{os.path.basename(path)};{lb_workload(instance)};{lb_max_task(instance)};{lb_pigeonhole(instance)};"
+              f"{known_lb};{known_ub};{lower_bound(instance, known_lb)}")
@@ -0,0 +1,428 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from typing import List, Tuple, Dict, Any, Optional
+
+import alwabp_vns
+import alwabp_bounds
+from alwabp_vns import ALWABPInstance, ALWABPSolution, INF
+"""
+
+    modelo MILP do ALWABP
+
+    Constrói a formulação da seção 2 do README a partir de uma ALWABPInstance
+    (variáveis C, y_si, z_ws, u_wis e restrições R1 a R8) e a exporta nos formatos
+    LP e MPS. Opcionalmente resolve o modelo com um resolvedor de código aberto
+    instalado localmente (binário highs ou cbc no PATH), com número de threads e
+    limite de tempo configuráveis.
+
+    A melhor solução do VNS é usada como solução inicial (warm start) e o seu tempo
+    de ciclo como limite superior de C (cutoff); o limite inferior de C vem de
+    alwabp_bounds. u_wis só é criada para pares (tarefa, trabalhador) capazes; para
+    os incapazes, R5 vira y_si + z_ws <= 1 (a tarefa não pode ficar na estação do
+    trabalhador que não a executa).
+
+"""
+# Configurações
+SOLVERS = ("highs", "cbc") # Em ordem de preferência quando --solver não é dado
+THREADS = 1
+VNS_ITER = 50 # Iterações do VNS que gera a solução inicial
+LP_TERMS_PER_LINE = 8 # Termos por linha nas expressões do arquivo LP
+
+class MILPModel:
+    """
+    Modelo linear inteiro misto em memória: variáveis com limites e marca de integralidade,
+    objetivo de minimização e restrições (nome, coeficientes, sentido, lado direito).
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.variables: List[str] = []
+        self.bounds: Dict[str, Tuple[float, float]] = {}
+        self.binaries: set = set()
+        self.objective: Dict[str, float] = {}
+        # (nome, {variável: coeficiente}, sentido "<=", ">=" ou "=", lado direito)
+        self.constraints: List[Tuple[str, Dict[str, float], str, float]] = []
+
+    def add_variable(self, name: str, lower: float = 0.0, upper: float = INF, binary: bool = False) -> str:
+        self.variables.append(name)
+        self.bounds[name] = (0.0, 1.0) if binary else (lower, upper)
+        if binary:
+            self.binaries.add(name)
+        return name
+
+    def add_constraint(self, name: str, coefficients: Dict[str, float], sense: str, rhs: float):
+        self.constraints.append((name, coefficients, sense, rhs))
+
+    def activities(self, values: Dict[str, float]) -> Dict[str, float]:
+        """ Valor do lado esquerdo de cada restrição para os valores dados (ausentes = 0). """
+        return {name: sum(coef * values.get(var, 0.0) for var, coef in coefficients.items())
+                for name, coefficients, _, _ in self.constraints}
+
+    def objective_value(self, values: Dict[str, float]) -> float:
+        return sum(coef * values.get(var, 0.0) for var, coef in self.objective.items())
+
+def y_name(s: int, i: int) -> str:
+    return f"y_{s + 1}_{i + 1}"
+
+def z_name(w: int, s: int) -> str:
+    return f"z_{w + 1}_{s + 1}"
+
+def u_name(w: int, i: int, s: int) -> str:
+    return f"u_{w + 1}_{i + 1}_{s + 1}"
+
+def build_model(instance: ALWABPInstance, cutoff: Optional[float] = None,
+                lower_bound: Optional[float] = None) -> MILPModel:
+    """
+    Modelo da seção 2 do README para a instância (índices 1-indexados nos nomes, m = k estações).
+    cutoff: limite superior de C (ex.: tempo de ciclo do VNS); lower_bound: limite inferior de C.
+    """
+    n, k = instance.num_tasks, instance.num_workers
+    stations = range(k)
+    times = instance.task_times
+    model = MILPModel("alwabp")
+
+    c = model.add_variable("C", lower_bound if lower_bound is not None else 0.0,
+                           cutoff if cutoff is not None else INF)
+    model.objective[c] = 1.0
+    for s in stations:
+        for i in range(n):
+            model.add_variable(y_name(s, i), binary=True)
+    for w in range(k):
+        for s in stations:
+            model.add_variable(z_name(w, s), binary=True)
+    # u_wis só é criada quando o trabalhador w executa a tarefa i (os demais pares entram em R5)
+    capable = [(w, i) for w in range(k) for i in range(n) if times[w][i] < INF]
+    incapable = [(w, i) for w in range(k) for i in range(n) if times[w][i] == INF]
+    for w, i in capable:
+        for s in stations:
+            model.add_variable(u_name(w, i, s), binary=True)
+
+    for i in range(n):  # R1
+        model.add_constraint(f"R1_{i + 1}", {y_name(s, i): 1.0 for s in stations}, "=", 1.0)
+    for w in range(k):  # R2
+        model.add_constraint(f"R2_{w + 1}", {z_name(w, s): 1.0 for s in stations}, "=", 1.0)
+    for s in stations:  # R3
+        model.add_constraint(f"R3_{s + 1}", {z_name(w, s): 1.0 for w in range(k)}, "=", 1.0)
+    for w, i in capable:  # R4.1 a R4.3
+        for s in stations:
+            u, y, z = u_name(w, i, s), y_name(s, i), z_name(w, s)
+            model.add_constraint(f"R4a_{w + 1}_{i + 1}_{s + 1}", {u: 1.0, y: -1.0}, "<=", 0.0)
+            model.add_constraint(f"R4b_{w + 1}_{i + 1}_{s + 1}", {u: 1.0, z: -1.0}, "<=", 0.0)
+            model.add_constraint(f"R4c_{w + 1}_{i + 1}_{s + 1}", {u: 1.0, y: -1.0, z: -1.0}, ">=", -1.0)
+    for w, i in incapable:  # R5: com u_wis = 0, y_si e z_ws não podem valer 1 ao mesmo tempo
+        for s in stations:
+            model.add_constraint(f"R5_{w + 1}_{i + 1}_{s + 1}", {y_name(s, i): 1.0, z_name(w, s): 1.0}, "<=", 1.0)
+    for s in stations:  # R6
+        coefficients = {u_name(w, i, s): times[w][i] for w, i in capable}
+        coefficients[c] = -1.0
+        model.add_constraint(f"R6_{s + 1}", coefficients, "<=", 0.0)
+    for i, j in instance.precedences:  # R7 (pares 1-indexados)
+        coefficients = {y_name(s, i - 1): float(s + 1) for s in stations}
+        coefficients.update({y_name(s, j - 1): -float(s + 1) for s in stations})
+        model.add_constraint(f"R7_{i}_{j}", coefficients, "<=", 0.0)
+    return model
+
+def start_values(instance: ALWABPInstance, solution: ALWABPSolution) -> Dict[str, float]:
+    """ Valores não nulos das variáveis do modelo correspondentes a uma solução factível. """
+    if not solution.is_feasible:
+        raise ValueError("A solução inicial do MILP deve ser factível.")
+    values = {"C": solution.cycle_time}
+    for s, w in enumerate(solution.worker_station_assignment):
+        values[z_name(w, s)] = 1.0
+    for i, s in enumerate(solution.task_station_assignment):
+        values[y_name(s, i)] = 1.0
+        values[u_name(solution.worker_station_assignment[s], i, s)] = 1.0
+    return values
+
+def solution_from_values(instance: ALWABPInstance, values: Dict[str, float]) -> ALWABPSolution:
+    """ Solução (avaliada) a partir dos valores de y e z retornados pelo resolvedor. """
+    stations = range(instance.num_workers)
+    tasks = [max(stations, key=lambda s: values.get(y_name(s, i), 0.0)) for i in range(instance.num_tasks)]
+    workers = [max(range(instance.num_workers), key=lambda w: values.get(z_name(w, s), 0.0)) for s in stations]
+    solution = ALWABPSolution(instance, tasks, workers)
+    solution.evaluate()
+    return solution
+
+# --- Exportação (LP e MPS) ---
+
+def _number(value: float) -> str:
+    return f"{value:.15g}"
+
+def _lp_expression(coefficients: Dict[str, float]) -> List[str]:
+    """ Termos da expressão em linhas de até LP_TERMS_PER_LINE termos. """
+    terms = [f"{'-' if coef < 0 else '+'} {_number(abs(coef))} {var}" for var, coef in coefficients.items()]
+    return [" ".join(terms[start:start + LP_TERMS_PER_LINE]) for start in range(0, len(terms), LP_TERMS_PER_LINE)]
+
+def write_lp(model: MILPModel, path: str):
+    """ Grava o modelo no formato LP (CPLEX), lido por HiGHS, CBC e pela maioria dos resolvedores. """
+    lines = [f"\\ Modelo {model.name}", "Minimize"]
+    lines.extend(" obj: " + line if index == 0 else "   " + line
+                 for index, line in enumerate(_lp_expression(model.objective)))
+    lines.append("Subject To")
+    for name, coefficients, sense, rhs in model.constraints:
+        expression = _lp_expression(coefficients)
+        expression[-1] += f" {sense} {_number(rhs)}"
+        lines.append(f" {name}: " + expression[0])
+        lines.extend("   " + line for line in expression[1:])
+    lines.append("Bounds")
+    for var in model.variables:
+        if var in model.binaries:
+            continue
+        lower, upper = model.bounds[var]
+        lines.append(f" {_number(lower)} <= {var} <= {_number(upper)}" if upper < INF else f" {var} >= {_number(lower)}")
+    lines.append("Binaries")
+    binaries = [var for var in model.variables if var in model.binaries]
+    lines.extend(" " + " ".join(binaries[start:start + LP_TERMS_PER_LINE])
+                 for start in range(0, len(binaries), LP_TERMS_PER_LINE))
+    lines.append("End")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+def write_mps(model: MILPModel, path: str):
+    """
+    Grava o modelo no formato MPS livre (nomes separados por espaços). A marca FREE na linha NAME
+    faz o CBC ler o arquivo como livre; sem ela, nomes curtos (como C) são lidos em colunas fixas.
+    """
+    row_type = {"<=": "L", ">=": "G", "=": "E"}
+    columns: Dict[str, List[Tuple[str, float]]] = {var: [] for var in model.variables}
+    for var, coef in model.objective.items():
+        columns[var].append(("obj", coef))
+    for name, coefficients, _, _ in model.constraints:
+        for var, coef in coefficients.items():
+            columns[var].append((name, coef))
+
+    lines = [f"NAME {model.name} FREE", "ROWS", " N obj"]
+    lines.extend(f" {row_type[sense]} {name}" for name, _, sense, _ in model.constraints)
+    lines.append("COLUMNS")
+    integer = False
+    for var in model.variables:
+        if (var in model.binaries) != integer:
+            integer = not integer
+            marker = "'INTORG'" if integer else "'INTEND'"
+            lines.append(f"    MARKER 'MARKER' {marker}")
+        lines.extend(f"    {var} {row} {_number(coef)}" for row, coef in columns[var])
+    if integer:
+        lines.append("    MARKER 'MARKER' 'INTEND'")
+    lines.append("RHS")
+    lines.extend(f"    RHS {name} {_number(rhs)}" for name, _, _, rhs in model.constraints if rhs != 0)
+    lines.append("BOUNDS")
+    for var in model.variables:
+        lower, upper = model.bounds[var]
+        if var in model.binaries:
+            lines.append(f" BV BND {var}")
+            continue
+        if lower != 0:
+            lines.append(f" LO BND {var} {_number(lower)}")
+        if upper < INF:
+            lines.append(f" UP BND {var} {_number(upper)}")
+    lines.append("ENDATA")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+def write_model(model: MILPModel, path: str):
+    """ Grava no formato indicado pela extensão do arquivo (.lp ou .mps). """
+    if path.lower().endswith(".mps"):
+        write_mps(model, path)
+    elif path.lower().endswith(".lp"):
+        write_lp(model, path)
+    else:
+        raise ValueError(f"Extensão desconhecida para o modelo: {path} (use .lp ou .mps)")
+
+# --- Resolução com HiGHS ou CBC ---
+
+def find_solver(name: Optional[str] = None) -> Tuple[str, str]:
+    """ (nome, caminho do executável) do resolvedor pedido ou do primeiro de SOLVERS disponível no PATH. """
+    for candidate in ([name] if name is not None else SOLVERS):
+        path = shutil.which(candidate)
+        if path is not None:
+            return candidate, path
+    raise RuntimeError(f"Resolvedor MILP não encontrado no PATH: {name or ', '.join(SOLVERS)}")
+
+def write_highs_start(model: MILPModel, values: Dict[str, float], path: str):
+    """ Solução inicial no formato de solução do HiGHS (colunas e linhas), lida por --read_solution_file. """
+    activities = model.activities(values)
+    lines = ["Model status", "Unknown", "", "# Primal solution values", "Feasible",
+             f"Objective {_number(model.objective_value(values))}", f"# Columns {len(model.variables)}"]
+    lines.extend(f"{var} {_number(values.get(var, 0.0))}" for var in model.variables)
+    lines.append(f"# Rows {len(model.constraints)}")
+    lines.extend(f"{name} {_number(activities[name])}" for name, _, _, _ in model.constraints)
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+def write_cbc_start(model: MILPModel, values: Dict[str, float], path: str):
+    """ Solução inicial no formato de solução do CBC (índice, nome, valor), lida pela opção mipstart. """
+    lines = [f"Feasible - objective value {_number(model.objective_value(values))}"]
+    lines.extend(f"{index} {var} {_number(values.get(var, 0.0))} {_number(model.objective.get(var, 0.0))}"
+                 for index, var in enumerate(model.variables))
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+def read_highs_solution(path: str) -> Tuple[str, Optional[Dict[str, float]]]:
+    """ (status do modelo, valores das colunas ou None) do arquivo de solução do HiGHS. """
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    status = lines[lines.index("Model status") + 1] if "Model status" in lines else "Unknown"
+    for index, line in enumerate(lines):
+        if line.startswith("# Columns"):
+            count = int(line.split()[-1])
+            values = {}
+            for entry in lines[index + 1:index + 1 + count]:
+                var, value = entry.split()[:2]
+                values[var] = float(value)
+            return status, values
+    return status, None
+
+def read_cbc_solution(path: str) -> Tuple[str, Optional[Dict[str, float]]]:
+    """ (status, valores não nulos ou None) do arquivo de solução do CBC (comando solu). """
+    with open(path) as f:
+        lines = f.read().splitlines()
+    status = lines[0].split(" - ")[0].strip() if lines else "Unknown"
+    if status.startswith("Infeasible") or len(lines) < 2:
+        return status, None
+    values = {}
+    for line in lines[1:]:
+        fields = line.replace("**", " ").split()
+        if len(fields) >= 3:
+            values[fields[1]] = float(fields[2])
+    return status, values
+
+def solve(model: MILPModel, solver: Optional[str] = None, threads: int = THREADS, time_limit: Optional[float] = None,
+          start: Optional[Dict[str, float]] = None, workdir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve o modelo com o executável do HiGHS ou do CBC (exportado em LP num diretório temporário,
+    ou em workdir). start: valores de uma solução factível para o warm start.
+    Retorna {"solver", "status", "optimal", "objective", "values", "time_s"}; values é None sem solução.
+    """
+    name, executable = find_solver(solver)
+    with tempfile.TemporaryDirectory() as temporary:
+        directory = workdir if workdir is not None else temporary
+        model_path = os.path.join(directory, f"{model.name}.lp")
+        solution_path = os.path.join(directory, f"{model.name}.sol")
+        start_path = os.path.join(directory, f"{model.name}.start")
+        write_lp(model, model_path)
+
+        if name == "highs":
+            options_path = os.path.join(directory, f"{model.name}.opt")
+            with open(options_path, "w") as f:
+                f.write(f"threads = {threads}\n")
+                if time_limit is not None:
+                    f.write(f"time_limit = {time_limit}\n")
+            command = [executable, "--model_file", model_path, "--options_file", options_path,
+                       "--solution_file", solution_path]
+            if start is not None:
+                write_highs_start(model, start, start_path)
+                command += ["--read_solution_file", start_path]
+        else:
+            command = [executable, model_path, "threads", str(threads)]
+            if time_limit is not None:
+                command += ["sec", str(time_limit)]
+            if start is not None:
+                write_cbc_start(model, start, start_path)
+                command += ["mipstart", start_path]
+            command += ["solve", "solu", solution_path]
+
+        start_time = time.time()
+        process = subprocess.run(command, capture_output=True, text=True)
+        elapsed = time.time() - start_time
+        if not os.path.exists(solution_path):
+            raise RuntimeError(f"{name} não gravou a solução (código {process.returncode}): "
+                               f"{process.stderr.strip() or process.stdout.strip()[-500:]}")
+        status, values = (read_highs_solution if name == "highs" else read_cbc_solution)(solution_path)
+
+    return {"solver": name, "status": status, "optimal": status.startswith("Optimal"),
+            "objective": model.objective_value(values) if values is not None else None,
+            "values": values, "time_s": elapsed}
+
+def solve_instance(instance: ALWABPInstance, incumbent: Optional[ALWABPSolution] = None,
+                   lower_bound: Optional[float] = None, **solve_args) -> Dict[str, Any]:
+    """
+    Monta o modelo com o tempo de ciclo do incumbente como cutoff, resolve com warm start e
+    acrescenta ao resultado a melhor solução ("best_solution": a do resolvedor ou o incumbente).
+    Se a solução do resolvedor, decodificada e avaliada, for infactível ou tiver tempo de ciclo
+    maior que o objetivo informado, o resultado deixa de ser ótimo e o status passa a "Invalid: ...".
+    """
+    cutoff = incumbent.cycle_time if incumbent is not None and incumbent.is_feasible else None
+    if cutoff is not None and lower_bound is not None and cutoff <= lower_bound:
+        # O incumbente atinge o limitante inferior: já é ótimo, o resolvedor não é chamado
+        return {"solver": None, "status": "Optimal (LB)", "optimal": True, "objective": cutoff, "values": None,
+                "time_s": 0.0, "best_solution": incumbent}
+    model = build_model(instance, cutoff, lower_bound)
+    start = start_values(instance, incumbent) if cutoff is not None else None
+    result = solve(model, start=start, **solve_args)
+    best = incumbent
+    if result["values"] is not None:
+        solution = solution_from_values(instance, result["values"])
+        objective = result["objective"]
+        if not solution.is_feasible:
+            problem = "solução do resolvedor infactível"
+        elif solution.cycle_time > objective + 1e-6 * max(1.0, abs(objective)):
+            problem = f"tempo de ciclo avaliado {solution.cycle_time:g} maior que o objetivo {objective:g}"
+        else:
+            problem = None
+        if problem is not None:
+            result.update(status=f"Invalid: {problem} ({result['status']})", optimal=False)
+        elif best is None or solution.cycle_time < best.cycle_time:
+            best = solution
+    result["best_solution"] = best
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Modelo MILP do ALWABP: exportação LP/MPS e resolução com warm start "
+                                                 "do VNS. A instância é lida da entrada padrão ou de --instance.")
+    parser.add_argument("output_filename", nargs="?", default=None, help="arquivo para gravar a melhor solução")
+    parser.add_argument("--instance", default=None, help="arquivo da instância (em vez da entrada padrão)")
+    parser.add_argument("--lp", default=None, help="exporta o modelo no formato LP")
+    parser.add_argument("--mps", default=None, help="exporta o modelo no formato MPS")
+    parser.add_argument("--solve", action="store_true", help="resolve o modelo com HiGHS ou CBC")
+    parser.add_argument("--solver", choices=SOLVERS, default=None,
+                        help="resolvedor (padrão: o primeiro disponível no PATH entre " + ", ".join(SOLVERS) + ")")
+    parser.add_argument("--threads", type=int, default=THREADS, help=f"threads do resolvedor (padrão: {THREADS})")
+    parser.add_argument("--time-limit", type=float, default=None, help="limite de tempo do resolvedor (s)")
+    parser.add_argument("--no-warm-start", action="store_true",
+                        help="não executa o VNS (sem solução inicial e sem cutoff)")
+    parser.add_argument("--vns-iter", type=int, default=VNS_ITER,
+                        help=f"iterações do VNS que gera a solução inicial (padrão: {VNS_ITER})")
+    parser.add_argument("--seed", type=int, default=alwabp_vns.DEFAULT_SEED, help="semente do VNS")
+    args = parser.parse_args()
+    if not (args.lp or args.mps or args.solve):
+        parser.error("indique --lp, --mps e/ou --solve")
+
+    try:
+        instance = ALWABPInstance.from_stdin() if args.instance is None else ALWABPInstance.from_path(args.instance)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    known = alwabp_bounds.known_bounds(args.instance) if args.instance is not None else None
+    lower_bound = alwabp_bounds.lower_bound(instance, known[0] if known is not None else None)
+
+    incumbent = None
+    if not args.no_warm_start:
+        incumbent = alwabp_vns.run_vns(instance, args.seed, args.vns_iter, lower_bound=lower_bound)["best_solution"]
+        print(f"VNS: C = {incumbent.cycle_time:g}", file=sys.stderr)
+    cutoff = incumbent.cycle_time if incumbent is not None and incumbent.is_feasible else None
+
+    model = build_model(instance, cutoff, lower_bound)
+    for path in (args.lp, args.mps):
+        if path is not None:
+            write_model(model, path)
+    print(f"Modelo: {len(model.variables)} variáveis, {len(model.constraints)} restrições", file=sys.stderr)
+
+    if args.solve:
+        try:
+            result = solve_instance(instance, incumbent, lower_bound, solver=args.solver, threads=args.threads,
+                                    time_limit=args.time_limit)
+        except RuntimeError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            sys.exit(1)
+        best = result["best_solution"]
+        if result["status"].startswith("Invalid"):
+            print(f"Aviso: {result['status']}", file=sys.stderr)
+        # Saída: SF do VNS;C da melhor solução;status do resolvedor;tempo do resolvedor
+        print(f"{cutoff if cutoff is not None else INF};{best.cycle_time if best is not None else INF};"
+              f"{result['status']};{result['time_s']:.4f}")
+        if args.output_filename is not None and best is not None:
+            alwabp_vns.write_solution(args.output_filename, best)
@@ -1,12 +1,74 @@
+import os
 import sys
+import io
+import json
 import math
+import argparse
+import heapq
+import bisect
 import random
 import time
-from typing import List, Tuple, Dict, Any
+import multiprocessing
+from array import array
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import cProfile
+import pstats
+from typing import List, Tuple, Dict, Set, Any, Optional
+
+import alwabp_bounds
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: necessário apenas para o backend "numpy"
+    np = None
 
 # Constante para representar tempo infinito (incapacidade)
 INF = float('inf')
 
+# Backends de avaliação das vizinhanças da busca local
+BACKENDS = ("python", "numpy")
+
+# Parâmetros padrão do VNS
+MAX_ITER = 50 # Número máximo de iterações do VNS
+K_MAX = 3 # Número máximo de vizinhanças para o Shaking
+DEFAULT_SEED = 42
+
+# Modos de shaking: "feasible" sorteia apenas movimentos factíveis; "random" é a perturbação original
+SHAKING_MODES = ("feasible", "random")
+SHAKE_ATTEMPTS = 50 # Sorteios por perturbação antes de desistir de encontrar um movimento factível
+
+# Construção da solução inicial: "station" (orientada a estações, com busca binária do tempo de ciclo)
+# ou "greedy" (heurística gulosa original); regras de prioridade da construção orientada a estações
+CONSTRUCTIONS = ("station", "greedy")
+PRIORITY_RULES = ("positional_weight", "max_time", "min_ratio", "successors")
+CONSTRUCTION_TIME_SHARE = 0.5 # Fração máxima do limite de tempo usada pela construção; o restante fica para a busca
+
+# Motores de busca: "assignment" (tarefa -> estação) ou "sequence" (sequência de tarefas + permutação de trabalhadores)
+ENGINES = ("assignment", "sequence")
+
+# Memoização: nº máximo de soluções guardadas no cache LRU (0 desativa) e semente das tabelas de Zobrist
+CACHE_SIZE = 10000
+ZOBRIST_SEED = 0x5EED
+
+def _csr(num_tasks: int, arcs: List[Tuple[int, int]]) -> Tuple[array, array]:
+    """ Lista de arcos (u, v) 0-indexados -> (start, index) em CSR, preservando a ordem dos arcos de cada u. """
+    start = array('i', bytes(4 * (num_tasks + 1)))
+    for u, _ in arcs:
+        start[u + 1] += 1
+    for i in range(num_tasks):
+        start[i + 1] += start[i]
+    index = array('i', bytes(4 * len(arcs)))
+    fill = start[:-1]
+    for u, v in arcs:
+        index[fill[u]] = v
+        fill[u] += 1
+    return start, index
+
+def _masked_sum(mask: int, values: List[float]) -> float:
+    """ Soma de values[j] para os bits j ligados em mask. """
+    return sum(values[j] for j, bit in enumerate(reversed(bin(mask)[2:])) if bit == "1")
+
 class ALWABPInstance:
     """
     Armazena os dados de uma instância do problema ALWABP.
@@ -18,173 +80,583 @@ class ALWABPInstance:
         self.task_times = task_times
         # precedences é uma lista de pares (i, j) onde i deve preceder j (1-indexado)
         self.precedences = precedences
-        # Dicionário de adjacência para acesso rápido às precedências (1-indexado)
-        self.predecessors: Dict[int, List[int]] = {i: [] for i in range(1, num_tasks + 1)}
-        self.successors: Dict[int, List[int]] = {i: [] for i in range(1, num_tasks + 1)}
+        # Adjacência em CSR (0-indexada): os sucessores diretos da tarefa i são
+        # succ_index[succ_start[i]:succ_start[i + 1]]; idem para pred_start/pred_index
         for i, j in precedences:
-            self.successors[i].append(j)
-            self.predecessors[j].append(i)
+            if not (1 <= i <= num_tasks and 1 <= j <= num_tasks):
+                raise ValueError(f"Precedência ({i}, {j}) fora do intervalo de tarefas 1..{num_tasks}.")
+        self.succ_start, self.succ_index = _csr(num_tasks, [(i - 1, j - 1) for i, j in precedences])
+        self.pred_start, self.pred_index = _csr(num_tasks, [(j - 1, i - 1) for i, j in precedences])
+        self._times_array = None
+        self._zobrist = None
+        self._closure = None
+        self._head_tail = None
+        self._station_bounds = None
+        self._decoder_bounds = None
+
+    def successors(self, i: int) -> array:
+        """ Sucessores diretos da tarefa i (0-indexados). """
+        return self.succ_index[self.succ_start[i]:self.succ_start[i + 1]]
+
+    def predecessors(self, i: int) -> array:
+        """ Predecessores diretos da tarefa i (0-indexados). """
+        return self.pred_index[self.pred_start[i]:self.pred_start[i + 1]]
+
+    def closure(self) -> Tuple[List[int], List[int]]:
+        """
+        Fecho transitivo das precedências como bitsets (int), construído sob demanda:
+        o bit j de ancestors[i] indica que j precede i (direta ou indiretamente), e o
+        bit j de descendants[i], que i precede j.
+        """
+        if self._closure is None:
+            n = self.num_tasks
+            order = _topological_order(self)
+            ancestors = [0] * n
+            descendants = [0] * n
+            for i in order:
+                for j in self.successors(i):
+                    ancestors[j] |= ancestors[i] | (1 << i)
+            for i in reversed(order):
+                for j in self.successors(i):
+                    descendants[i] |= descendants[j] | (1 << j)
+            self._closure = (ancestors, descendants)
+        return self._closure
+
+    def ordered(self, i: int, j: int) -> bool:
+        """ True se há caminho de precedência entre as tarefas i e j, em qualquer sentido (O(1)). """
+        descendants = self.closure()[1]
+        return bool((descendants[i] >> j) & 1 or (descendants[j] >> i) & 1)
+
+    def station_bounds(self, cycle_time: float) -> Tuple[List[int], List[int]]:
+        """
+        Menor e maior estação (0-indexadas) que cada tarefa pode ocupar em qualquer solução
+        com tempo de ciclo <= cycle_time: as estações até a da tarefa contêm também todos
+        os seus ancestrais, e as seguintes, todos os seus descendentes (tempos mínimos).
+        Guarda o último resultado, pois a busca consulta o mesmo tempo de ciclo repetidamente.
+        """
+        if self._station_bounds is not None and self._station_bounds[0] == cycle_time:
+            return self._station_bounds[1]
+        if self._head_tail is None:
+            min_times = alwabp_bounds.min_task_times(self)
+            ancestors, descendants = self.closure()
+            self._head_tail = ([min_times[i] + _masked_sum(ancestors[i], min_times) for i in range(self.num_tasks)],
+                               [min_times[i] + _masked_sum(descendants[i], min_times) for i in range(self.num_tasks)])
+        head, tail = self._head_tail
+        m = self.num_workers
+        if not 0 < cycle_time < INF:
+            bounds = ([0] * self.num_tasks, [m - 1] * self.num_tasks)
+        else:
+            # Nº mínimo de estações para a carga h: ceil(h / C), limitado a m + 1 (inclui h = INF)
+            ceil, inverse, cap = math.ceil, 1.0 / cycle_time, m + 1
+            bounds = ([max(0, ceil(min(h * inverse, cap) - 1e-9) - 1) for h in head],
+                      [min(m - 1, m - ceil(min(t * inverse, cap) - 1e-9)) for t in tail])
+        self._station_bounds = (cycle_time, bounds)
+        return bounds
+
+    def decoder_bounds(self) -> Tuple[float, bool]:
+        """
+        (limitante inferior de C_max, todos os tempos finitos são inteiros), calculados uma vez
+        para a bissecção do decodificador do motor "sequence".
+        """
+        if self._decoder_bounds is None:
+            integral = all(t >= INF or float(t).is_integer() for times in self.task_times for t in times)
+            lower = alwabp_bounds.lower_bound(self)
+            self._decoder_bounds = (lower if lower is not None else 0.0, integral)
+        return self._decoder_bounds
+
+    def zobrist_tables(self) -> Tuple[List[List[int]], List[List[int]]]:
+        """
+        Chaves aleatórias de 64 bits para o hash de Zobrist das soluções, construídas sob demanda:
+        task_keys[i][s + 1] (tarefa i na estação s, s = -1 para não alocada) e worker_keys[s][w].
+        Usa um gerador próprio com semente fixa, sem consumir o estado de `random`.
+        """
+        if self._zobrist is None:
+            rng = random.Random(ZOBRIST_SEED)
+            m = self.num_workers
+            task_keys = [[rng.getrandbits(64) for _ in range(m + 1)] for _ in range(self.num_tasks)]
+            worker_keys = [[rng.getrandbits(64) for _ in range(m)] for _ in range(m)]
+            self._zobrist = (task_keys, worker_keys)
+        return self._zobrist
+
+    def times_array(self):
+        """
+        Matriz (m x n) NumPy com os tempos task_times[w][i] (inf para incapacidade).
+        Construída sob demanda e reutilizada pelo backend "numpy".
+        """
+        if self._times_array is None:
+            self._times_array = np.array(self.task_times, dtype=float).reshape(self.num_workers, self.num_tasks)
+        return self._times_array
 
     @classmethod
     def from_stdin(cls) -> 'ALWABPInstance':
         """
         Lê os dados da instância a partir da entrada padrão (stdin)
-        conforme o formato especificado.
+        conforme o formato especificado. Encerra o programa em caso de erro.
         """
         try:
-            # 1. Número de tarefas (n)
-            line = sys.stdin.readline().strip()
-            if not line:
-                raise EOFError("Fim de arquivo inesperado ao ler o número de tarefas.")
-            num_tasks = int(line)
-        except Exception as e:
-            print(f"Erro ao ler o número de tarefas: {e}", file=sys.stderr)
+            return cls.from_stream(sys.stdin)
+        except ValueError as e:
+            print(e, file=sys.stderr)
             sys.exit(1)
 
-        # 2. Matriz de tempos de tarefa (t_wi)
-        task_times_raw: List[List[float]] = []
-        num_workers = 0
-        for _ in range(num_tasks):
-            try:
-                line = sys.stdin.readline().strip()
-                if not line:
-                    raise EOFError("Fim de arquivo inesperado ao ler tempos de tarefa.")
-                
-                # Os tempos são lidos como strings e convertidos para float
-                times = [float(t) for t in line.split()]
-                task_times_raw.append(times)
-                
-                # O número de trabalhadores (k) é o número de colunas na primeira linha
-                if num_workers == 0:
-                    num_workers = len(times)
-                elif len(times) != num_workers:
-                    raise ValueError("Número inconsistente de trabalhadores/tempos por tarefa.")
-            except Exception as e:
-                print(f"Erro ao ler tempos de tarefa: {e}", file=sys.stderr)
-                sys.exit(1)
+    @classmethod
+    def from_stream(cls, stream) -> 'ALWABPInstance':
+        """
+        Lê os dados da instância de um arquivo aberto (texto ou binário)
+        conforme o formato especificado. Lança ValueError se a entrada for inválida.
+        """
+        data = stream.read()
+        if isinstance(data, str):
+            data = data.encode()
+        return cls.from_bytes(data)
 
+    @classmethod
+    def from_path(cls, path: str) -> 'ALWABPInstance':
+        """ Lê a instância de um arquivo. Lança ValueError se o conteúdo for inválido. """
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ALWABPInstance':
+        """
+        Interpreta o conteúdo completo de um arquivo de instância de uma só vez:
+        n, a matriz n x k de tempos (Inf = incapacidade) e os pares de precedência
+        terminados por -1 -1. Aceita quebras de linha \n, \r\n ou \r.
+        Lança ValueError se a entrada for inválida.
+        """
+        lines = data.splitlines()
+
+        # 1. Número de tarefas (n)
+        try:
+            num_tasks = int(lines[0])
+        except (IndexError, ValueError) as e:
+            raise ValueError(f"Erro ao ler o número de tarefas: {e}") from e
+
+        # 2. Matriz de tempos de tarefa (t_wi), convertida em bloco
+        time_lines = lines[1:num_tasks + 1]
+        if len(time_lines) < num_tasks or not all(time_lines):
+            raise ValueError("Erro ao ler tempos de tarefa: Fim de arquivo inesperado ao ler tempos de tarefa.")
+        # O número de trabalhadores (k) é o número de colunas na primeira linha
+        num_workers = len(time_lines[0].split()) if num_tasks > 0 else 0
         if num_workers == 0 and num_tasks > 0:
-             raise ValueError("Não foi possível determinar o número de trabalhadores.")
-        
+            raise ValueError("Não foi possível determinar o número de trabalhadores.")
+        try:
+            times = [float(t) for t in b" ".join(time_lines).split()]
+        except ValueError as e:
+            raise ValueError(f"Erro ao ler tempos de tarefa: {e}") from e
+        if len(times) != num_tasks * num_workers:
+            raise ValueError("Erro ao ler tempos de tarefa: Número inconsistente de trabalhadores/tempos por tarefa.")
+
         # Transpor a matriz para ter task_times[w][i]
         # task_times[w][i] = tempo da tarefa i (0-indexado) pelo trabalhador w (0-indexado)
-        if num_tasks > 0 and num_workers > 0:
-            task_times_transposed = [[task_times_raw[i][w] for i in range(num_tasks)] for w in range(num_workers)]
-        else:
-            task_times_transposed = []
+        task_times = [times[w::num_workers] for w in range(num_workers)]
 
-        # 3. Restrições de precedência (i j)
+        # 3. Restrições de precedência (i j), 1-indexadas, até o par -1 -1
+        precedence_lines = [line for line in lines[num_tasks + 1:] if not line.lstrip().startswith(b"#")]
+        try:
+            values = [int(v) for v in b" ".join(precedence_lines).split()]
+        except ValueError as e:
+            raise ValueError(f"Erro ao ler precedências: {e}") from e
         precedences: List[Tuple[int, int]] = []
-        while True:
-            try:
-                line = sys.stdin.readline().strip()
-                if not line:
-                    # Se não houver mais linhas, pode ser o fim do arquivo
-                    break
-                
-                parts = line.split()
-                if not parts:
-                    continue
+        for k in range(0, len(values) - 1, 2):
+            i, j = values[k], values[k + 1]
+            if i == -1 and j == -1:
+                break
+            precedences.append((i, j))
+        else:
+            if len(values) % 2:
+                raise ValueError(f"Erro ao ler precedências: valor sem par ({values[-1]}).")
 
-                i, j = map(int, parts)
-                
-                if i == -1 and j == -1:
-                    break
-                
-                # As tarefas são 1-indexadas no arquivo
-                precedences.append((i, j))
-            except Exception as e:
-                # Se a linha não for -1 -1 e não for um par de inteiros, é um erro
-                if line and not line.startswith('#'):
-                     print(f"Erro ao ler precedências na linha: {line}. Erro: {e}", file=sys.stderr)
-                     sys.exit(1)
-                elif not line:
-                     break
-                
-        return cls(num_tasks, num_workers, task_times_transposed, precedences)
+        return cls(num_tasks, num_workers, task_times, precedences)
+
+def _arc_violated(station_i: int, station_j: int) -> int:
+    """ Retorna 1 se o arco de precedência (i, j) está violado nas estações dadas, 0 caso contrário. """
+    if station_i == -1 or station_j == -1 or station_i > station_j:
+        return 1
+    return 0
 
 class ALWABPSolution:
     """
     Representa uma solução para o problema ALWABP.
     Uma solução é definida pela alocação de tarefas a estações e trabalhadores a estações.
+
+    Após evaluate(), a solução mantém um estado incremental (cargas por estação,
+    contadores de infactibilidade e estações gargalo) que permite avaliar movimentos
+    de reatribuição de tarefa e troca de trabalhadores sem reavaliar a solução inteira.
+    Os movimentos só são aplicados (apply_*) quando aceitos, e podem ser desfeitos
+    pelos objetos de movimento (ReassignMove, TaskSwapMove, WorkerSwapMove).
     """
+    __slots__ = ("instance", "task_station_assignment", "worker_station_assignment", "cycle_time", "is_feasible",
+                 "station_loads", "station_incapable", "station_tasks", "incapable_count", "violations",
+                 "unassigned", "bottleneck", "window_lo", "window_hi", "worker_loads", "worker_incapable",
+                 "hash_key", "_evaluated")
+
     def __init__(self, instance: ALWABPInstance, task_station_assignment: List[int], worker_station_assignment: List[int]):
         self.instance = instance
         # task_station_assignment[i] = s (tarefa i (0-indexada) na estação s (0-indexada))
-        self.task_station_assignment = task_station_assignment
+        self.task_station_assignment = array('i', task_station_assignment)
         # worker_station_assignment[s] = w (trabalhador w (0-indexado) na estação s (0-indexada))
-        self.worker_station_assignment = worker_station_assignment
+        self.worker_station_assignment = array('i', worker_station_assignment)
         self.cycle_time = INF
         self.is_feasible = False
-        self.station_times: List[float] = []
+
+        # Estado incremental (preenchido por evaluate())
+        # station_loads[s] = soma dos tempos finitos das tarefas da estação s
+        self.station_loads: List[float] = []
+        # station_incapable[s] = nº de tarefas da estação s que o trabalhador alocado não executa
+        self.station_incapable: List[int] = []
+        # station_tasks[s] = conjunto das tarefas (0-indexadas) da estação s
+        self.station_tasks: List[Set[int]] = []
+        self.incapable_count = 0  # total de tarefas com tempo infinito
+        self.violations = 0  # nº de arcos de precedência violados
+        self.unassigned = 0  # nº de tarefas não alocadas (estação -1)
+        self.bottleneck: List[int] = []  # até 3 estações de maior carga, em ordem decrescente
+        # Janela de precedência de cada tarefa: [maior estação dos predecessores, menor estação dos sucessores]
+        self.window_lo: List[int] = []
+        self.window_hi: List[int] = []
+        # Matriz estação x trabalhador (construída sob demanda pela vizinhança Worker Swap):
+        # worker_loads[s][w] = soma dos tempos finitos das tarefas da estação s pelo trabalhador w
+        # worker_incapable[s][w] = nº de tarefas da estação s que o trabalhador w não executa
+        self.worker_loads: Optional[List[List[float]]] = None
+        self.worker_incapable: Optional[List[List[int]]] = None
+        # Hash de Zobrist das alocações (tarefa -> estação e estação -> trabalhador), mantido pelos apply_*
+        self.hash_key = 0
+        self._evaluated = False
 
     def evaluate(self):
         """
         Avalia a solução, verificando a factibilidade e calculando o tempo de ciclo (C_max).
+        Reconstrói também o estado incremental usado por evaluate_reassign/evaluate_worker_swap.
         """
         inst = self.instance
-        n = inst.num_tasks
         m = inst.num_workers # número de estações
+        tsa = self.task_station_assignment
+        wsa = self.worker_station_assignment
 
-        # 1. Verificar Factibilidade de Precedência
+        # 1. Contar violações de precedência
         # A tarefa i deve estar em uma estação anterior ou igual à estação da tarefa j, se i precede j.
-        for i_task_1, j_task_2 in inst.precedences:
-            # Converter para 0-indexado para acesso ao vetor
-            i = i_task_1 - 1
-            j = j_task_2 - 1
-            
-            # task_station_assignment é 0-indexado, representando a estação (0 a m-1)
-            station_i = self.task_station_assignment[i]
-            station_j = self.task_station_assignment[j]
-
-            # Se alguma tarefa não foi alocada (station_i == -1), a solução é infactível
-            if station_i == -1 or station_j == -1:
-                self.is_feasible = False
-                self.cycle_time = INF
-                self.station_times = [INF] * m
-                return
+        violations = 0
+        succ_start, succ_index = inst.succ_start, inst.succ_index
+        for i in range(inst.num_tasks):
+            s_i = tsa[i]
+            for j in succ_index[succ_start[i]:succ_start[i + 1]]:
+                violations += _arc_violated(s_i, tsa[j])
 
-            if station_i > station_j:
-                self.is_feasible = False
-                self.cycle_time = INF
-                self.station_times = [INF] * m
-                return
+        # 2. Calcular a carga de cada estação e contar incapacidades
+        station_loads = [0.0] * m
+        station_incapable = [0] * m
+        station_tasks: List[Set[int]] = [set() for _ in range(m)]
+        unassigned = 0
+        for i, s in enumerate(tsa):
+            if s == -1:
+                unassigned += 1
+                continue
+            station_tasks[s].add(i)
+            task_time = inst.task_times[wsa[s]][i]
+            # Verificar Incapacidade (tempo infinito)
+            if task_time >= INF:
+                station_incapable[s] += 1
+            else:
+                station_loads[s] += task_time
 
-        # 2. Calcular o tempo de trabalho em cada estação e verificar incapacidade
-        station_times = [0.0] * m
-        
-        # Agrupar tarefas por estação
-        tasks_in_station: Dict[int, List[int]] = {s: [] for s in range(m)}
-        for i in range(n):
-            station = self.task_station_assignment[i]
-            tasks_in_station[station].append(i) # i é a tarefa 0-indexada
+        self.violations = violations
+        self.unassigned = unassigned
+        self.station_loads = station_loads
+        self.station_incapable = station_incapable
+        self.incapable_count = sum(station_incapable)
+        self.station_tasks = station_tasks
+        self.window_lo = [self._compute_window_lo(i) for i in range(inst.num_tasks)]
+        self.window_hi = [self._compute_window_hi(i) for i in range(inst.num_tasks)]
+        self.worker_loads = None
+        self.worker_incapable = None
+        task_keys, worker_keys = inst.zobrist_tables()
+        hash_key = 0
+        for i, s in enumerate(tsa):
+            hash_key ^= task_keys[i][s + 1]
+        for s, w in enumerate(wsa):
+            hash_key ^= worker_keys[s][w]
+        self.hash_key = hash_key
+        self._evaluated = True
 
-        # Calcular o tempo de cada estação
-        for s in range(m):
-            # w é o trabalhador 0-indexado alocado à estação s
-            w = self.worker_station_assignment[s]
-            
-            current_station_time = 0.0
-            for i in tasks_in_station[s]:
-                # i é o índice da tarefa (0-indexado)
-                # w é o índice do trabalhador (0-indexado)
-                task_time = inst.task_times[w][i]
-
-                # 2.1. Verificar Incapacidade (tempo infinito)
-                if task_time >= INF: # Usamos >= INF para capturar float('inf') e valores muito grandes
-                    self.is_feasible = False
-                    self.cycle_time = INF
-                    self.station_times = [INF] * m
-                    return
+        # 3. Calcular C_max
+        self._refresh()
 
-                current_station_time += task_time
-            
-            station_times[s] = current_station_time
+    def _refresh(self):
+        """ Atualiza factibilidade, estações gargalo e C_max a partir do estado incremental. """
+        m = self.instance.num_workers
+        loads = self.station_loads
+        self.bottleneck = heapq.nlargest(3, range(m), key=loads.__getitem__)
+        self.is_feasible = not (self.violations or self.unassigned or self.incapable_count)
+        if self.is_feasible:
+            self.cycle_time = loads[self.bottleneck[0]] if m else 0.0
+        else:
+            self.cycle_time = INF
 
-        # 3. Calcular C_max
-        self.is_feasible = True
-        self.station_times = station_times
-        self.cycle_time = max(station_times) if station_times else 0.0
+    def critical_stations(self) -> List[int]:
+        """ Estações cuja carga é igual à maior carga (as estações gargalo), em ordem crescente. """
+        loads = self.station_loads
+        if not loads:
+            return []
+        max_load = loads[self.bottleneck[0]]
+        return [s for s in range(len(loads)) if loads[s] == max_load]
+
+    @property
+    def station_times(self) -> List[float]:
+        """ Tempo de cada estação (INF em todas se a solução for infactível). """
+        if self.is_feasible:
+            return list(self.station_loads)
+        return [INF] * self.instance.num_workers
+
+    def _compute_window_lo(self, i: int) -> int:
+        """ Maior estação entre os predecessores alocados da tarefa i (0 se não houver). """
+        tsa = self.task_station_assignment
+        start = self.instance.pred_start
+        return max((s for s in (tsa[p] for p in self.instance.pred_index[start[i]:start[i + 1]]) if s != -1),
+                   default=0)
+
+    def _compute_window_hi(self, i: int) -> int:
+        """ Menor estação entre os sucessores alocados da tarefa i (m-1 se não houver). """
+        tsa = self.task_station_assignment
+        last = self.instance.num_workers - 1
+        start = self.instance.succ_start
+        return min((s for s in (tsa[q] for q in self.instance.succ_index[start[i]:start[i + 1]]) if s != -1),
+                   default=last)
+
+    def feasible_stations(self, i: int) -> range:
+        """
+        Estações para as quais a tarefa i pode ser movida sem violar precedências,
+        dada a alocação atual das demais tarefas (vazio se a janela for inválida).
+        """
+        return range(self.window_lo[i], self.window_hi[i] + 1)
+
+    def _max_load_excluding(self, s1: int, s2: int) -> float:
+        """ Maior carga entre as estações diferentes de s1 e s2 (O(1) via estações gargalo). """
+        for s in self.bottleneck:
+            if s != s1 and s != s2:
+                return self.station_loads[s]
+        return 0.0
+
+    def _ensure_worker_loads(self):
+        """ Constrói a matriz estação x trabalhador (O(n*m)) se ainda não existir. """
+        if self.worker_loads is not None:
+            return
+        inst = self.instance
+        m = inst.num_workers
+        loads = [[0.0] * m for _ in range(m)]
+        incapable = [[0] * m for _ in range(m)]
+        for w in range(m):
+            times = inst.task_times[w]
+            for i, s in enumerate(self.task_station_assignment):
+                if s == -1:
+                    continue
+                if times[i] >= INF:
+                    incapable[s][w] += 1
+                else:
+                    loads[s][w] += times[i]
+        self.worker_loads = loads
+        self.worker_incapable = incapable
+
+    def _move_worker_loads(self, i: int, s_old: int, s_new: int):
+        """ Atualiza a matriz estação x trabalhador para a tarefa i saindo de s_old e entrando em s_new (O(m)). """
+        inst = self.instance
+        for w in range(inst.num_workers):
+            t = inst.task_times[w][i]
+            if t >= INF:
+                if s_old != -1:
+                    self.worker_incapable[s_old][w] -= 1
+                if s_new != -1:
+                    self.worker_incapable[s_new][w] += 1
+            else:
+                if s_old != -1:
+                    self.worker_loads[s_old][w] -= t
+                if s_new != -1:
+                    self.worker_loads[s_new][w] += t
+
+    def evaluate_reassign(self, i: int, s_new: int) -> float:
+        """
+        Tempo de ciclo resultante de mover a tarefa i para a estação s_new, sem aplicar o movimento.
+        Custo O(1) pela janela de precedência (O(grau de i) se a solução atual violar precedências).
+        Retorna INF se o vizinho for infactível; o movimento nulo (s_new igual à estação atual)
+        devolve o tempo de ciclo da própria solução.
+        """
+        inst = self.instance
+        tsa = self.task_station_assignment
+        s_old = tsa[i]
+        if s_new == s_old:
+            return self.cycle_time
+
+        # Precedências: fora da janela de i algum arco incidente fica violado
+        if not self.window_lo[i] <= s_new <= self.window_hi[i]:
+            return INF
+        if self.violations or self.unassigned:
+            # Solução atual infactível: apenas os arcos incidentes em i mudam
+            violations = self.violations
+            for p in inst.predecessors(i):
+                s_p = tsa[p]
+                violations += _arc_violated(s_p, s_new) - _arc_violated(s_p, s_old)
+            for q in inst.successors(i):
+                s_q = tsa[q]
+                violations += _arc_violated(s_new, s_q) - _arc_violated(s_old, s_q)
+            if violations or self.unassigned - (s_old == -1):
+                return INF
+
+        wsa = self.worker_station_assignment
+        t_new = inst.task_times[wsa[s_new]][i]
+        incapable = self.incapable_count + (t_new >= INF)
+        load_old = 0.0
+        if s_old != -1:
+            t_old = inst.task_times[wsa[s_old]][i]
+            if t_old >= INF:
+                incapable -= 1
+            else:
+                load_old = self.station_loads[s_old] - t_old
+        if incapable:
+            return INF
+
+        load_new = self.station_loads[s_new] + t_new
+        return max(load_old, load_new, self._max_load_excluding(s_old, s_new))
+
+    def evaluate_task_swap(self, i1: int, i2: int) -> float:
+        """
+        Tempo de ciclo resultante de trocar as estações das tarefas i1 e i2, sem aplicar o movimento.
+        Custo O(1): janelas de precedência e fecho transitivo (as tarefas não podem estar ordenadas).
+        Válido para soluções factíveis; retorna INF se o vizinho for infactível.
+        """
+        inst = self.instance
+        tsa = self.task_station_assignment
+        s1, s2 = tsa[i1], tsa[i2]
+        if s1 == s2 or self.violations or self.unassigned:
+            return INF
+        if not (self.window_lo[i1] <= s2 <= self.window_hi[i1] and self.window_lo[i2] <= s1 <= self.window_hi[i2]):
+            return INF
+        if inst.ordered(i1, i2):
+            return INF
+        wsa = self.worker_station_assignment
+        times_1, times_2 = inst.task_times[wsa[s1]], inst.task_times[wsa[s2]]
+        if times_1[i2] >= INF or times_2[i1] >= INF or self.incapable_count:
+            return INF
+        load_1 = self.station_loads[s1] - times_1[i1] + times_1[i2]
+        load_2 = self.station_loads[s2] - times_2[i2] + times_2[i1]
+        return max(load_1, load_2, self._max_load_excluding(s1, s2))
+
+    def apply_reassign(self, i: int, s_new: int):
+        """ Move a tarefa i para a estação s_new (-1 desaloca), atualizando o estado incremental. """
+        inst = self.instance
+        tsa = self.task_station_assignment
+        wsa = self.worker_station_assignment
+        s_old = tsa[i]
+
+        predecessors = inst.pred_index[inst.pred_start[i]:inst.pred_start[i + 1]]
+        successors = inst.succ_index[inst.succ_start[i]:inst.succ_start[i + 1]]
+        for p in predecessors:
+            s_p = tsa[p]
+            self.violations += _arc_violated(s_p, s_new) - _arc_violated(s_p, s_old)
+        for q in successors:
+            s_q = tsa[q]
+            self.violations += _arc_violated(s_new, s_q) - _arc_violated(s_old, s_q)
+
+        if s_old == -1:
+            self.unassigned -= 1
+        else:
+            t_old = inst.task_times[wsa[s_old]][i]
+            if t_old >= INF:
+                self.station_incapable[s_old] -= 1
+                self.incapable_count -= 1
+            else:
+                self.station_loads[s_old] -= t_old
+            self.station_tasks[s_old].discard(i)
+
+        if s_new == -1:
+            self.unassigned += 1
+        else:
+            t_new = inst.task_times[wsa[s_new]][i]
+            if t_new >= INF:
+                self.station_incapable[s_new] += 1
+                self.incapable_count += 1
+            else:
+                self.station_loads[s_new] += t_new
+            self.station_tasks[s_new].add(i)
+        if self.worker_loads is not None:
+            self._move_worker_loads(i, s_old, s_new)
+        tsa[i] = s_new
+        task_keys = inst.zobrist_tables()[0][i]
+        self.hash_key ^= task_keys[s_old + 1] ^ task_keys[s_new + 1]
+
+        # Apenas as janelas dos vizinhos de i no grafo de precedência mudam
+        for p in predecessors:
+            self.window_hi[p] = self._compute_window_hi(p)
+        for q in successors:
+            self.window_lo[q] = self._compute_window_lo(q)
+        self._refresh()
+
+    def evaluate_worker_swap(self, s1: int, s2: int) -> float:
+        """
+        Tempo de ciclo resultante de trocar os trabalhadores das estações s1 e s2, sem aplicar o movimento.
+        Custo O(1) via matriz estação x trabalhador. Retorna INF se o vizinho for infactível.
+        """
+        if self.violations or self.unassigned:
+            return INF
+        self._ensure_worker_loads()
+        w1 = self.worker_station_assignment[s1]
+        w2 = self.worker_station_assignment[s2]
+        incapable = (self.incapable_count - self.station_incapable[s1] - self.station_incapable[s2]
+                     + self.worker_incapable[s1][w2] + self.worker_incapable[s2][w1])
+        if incapable:
+            return INF
+        return max(self.worker_loads[s1][w2], self.worker_loads[s2][w1], self._max_load_excluding(s1, s2))
+
+    def apply_worker_swap(self, s1: int, s2: int):
+        """ Troca os trabalhadores das estações s1 e s2, atualizando o estado incremental. """
+        self._ensure_worker_loads()
+        wsa = self.worker_station_assignment
+        worker_keys = self.instance.zobrist_tables()[1]
+        self.hash_key ^= (worker_keys[s1][wsa[s1]] ^ worker_keys[s2][wsa[s2]]
+                          ^ worker_keys[s1][wsa[s2]] ^ worker_keys[s2][wsa[s1]])
+        wsa[s1], wsa[s2] = wsa[s2], wsa[s1]
+        for s in (s1, s2):
+            incapable = self.worker_incapable[s][wsa[s]]
+            self.incapable_count += incapable - self.station_incapable[s]
+            self.station_loads[s] = self.worker_loads[s][wsa[s]]
+            self.station_incapable[s] = incapable
+        self._refresh()
+
+    def apply_worker_assignment(self, worker_station_assignment: List[int]):
+        """ Substitui a alocação de trabalhadores inteira (O(m) via matriz estação x trabalhador). """
+        self._ensure_worker_loads()
+        worker_keys = self.instance.zobrist_tables()[1]
+        for s, w in enumerate(self.worker_station_assignment):
+            self.hash_key ^= worker_keys[s][w]
+        self.worker_station_assignment[:] = array('i', worker_station_assignment)
+        for s, w in enumerate(self.worker_station_assignment):
+            self.station_loads[s] = self.worker_loads[s][w]
+            self.station_incapable[s] = self.worker_incapable[s][w]
+            self.hash_key ^= worker_keys[s][w]
+        self.incapable_count = sum(self.station_incapable)
+        self._refresh()
+
+    def copy(self) -> 'ALWABPSolution':
+        """ Cópia independente da solução, incluindo o estado incremental. """
+        new = ALWABPSolution(self.instance, self.task_station_assignment, self.worker_station_assignment)
+        if not self._evaluated:
+            new.evaluate()
+            return new
+        new.cycle_time = self.cycle_time
+        new.is_feasible = self.is_feasible
+        new.station_loads = list(self.station_loads)
+        new.station_incapable = list(self.station_incapable)
+        new.station_tasks = [set(tasks) for tasks in self.station_tasks]
+        new.incapable_count = self.incapable_count
+        new.violations = self.violations
+        new.unassigned = self.unassigned
+        new.bottleneck = list(self.bottleneck)
+        new.window_lo = list(self.window_lo)
+        new.window_hi = list(self.window_hi)
+        if self.worker_loads is not None:
+            new.worker_loads = [list(row) for row in self.worker_loads]
+            new.worker_incapable = [list(row) for row in self.worker_incapable]
+        new.hash_key = self.hash_key
+        new._evaluated = True
+        return new
     
     def __lt__(self, other: 'ALWABPSolution') -> bool:
         """
@@ -230,6 +702,277 @@ class ALWABPSolution:
             
         return output.strip()
 
+# --- Movimentos (aplicáveis e reversíveis no lugar) ---
+
+class ReassignMove:
+    """ Move a tarefa `task` para a estação `station`. """
+    __slots__ = ("task", "station", "previous")
+
+    def __init__(self, task: int, station: int):
+        self.task = task
+        self.station = station
+        self.previous = -1
+
+    def evaluate(self, solution: ALWABPSolution) -> float:
+        return solution.evaluate_reassign(self.task, self.station)
+
+    def apply(self, solution: ALWABPSolution):
+        self.previous = solution.task_station_assignment[self.task]
+        solution.apply_reassign(self.task, self.station)
+
+    def undo(self, solution: ALWABPSolution):
+        solution.apply_reassign(self.task, self.previous)
+
+class TaskSwapMove:
+    """ Troca as estações das tarefas `task_1` e `task_2`. """
+    __slots__ = ("task_1", "task_2")
+
+    def __init__(self, task_1: int, task_2: int):
+        self.task_1 = task_1
+        self.task_2 = task_2
+
+    def evaluate(self, solution: ALWABPSolution) -> float:
+        # Composição de duas reatribuições: aplica, lê o tempo de ciclo e desfaz
+        self.apply(solution)
+        cycle_time = solution.cycle_time
+        self.undo(solution)
+        return cycle_time
+
+    def apply(self, solution: ALWABPSolution):
+        tsa = solution.task_station_assignment
+        s1, s2 = tsa[self.task_1], tsa[self.task_2]
+        solution.apply_reassign(self.task_1, s2)
+        solution.apply_reassign(self.task_2, s1)
+
+    def undo(self, solution: ALWABPSolution):
+        self.apply(solution) # A troca é sua própria inversa
+
+class WorkerSwapMove:
+    """ Troca os trabalhadores das estações `station_1` e `station_2`. """
+    __slots__ = ("station_1", "station_2")
+
+    def __init__(self, station_1: int, station_2: int):
+        self.station_1 = station_1
+        self.station_2 = station_2
+
+    def evaluate(self, solution: ALWABPSolution) -> float:
+        return solution.evaluate_worker_swap(self.station_1, self.station_2)
+
+    def apply(self, solution: ALWABPSolution):
+        solution.apply_worker_swap(self.station_1, self.station_2)
+
+    def undo(self, solution: ALWABPSolution):
+        self.apply(solution) # A troca é sua própria inversa
+
+class WorkerAssignmentMove:
+    """ Substitui toda a alocação de trabalhadores por `assignment`. """
+    __slots__ = ("assignment", "previous")
+
+    def __init__(self, assignment: List[int]):
+        self.assignment = assignment
+        self.previous = None
+
+    def apply(self, solution: ALWABPSolution):
+        self.previous = array('i', solution.worker_station_assignment)
+        solution.apply_worker_assignment(self.assignment)
+
+    def undo(self, solution: ALWABPSolution):
+        solution.apply_worker_assignment(self.previous)
+
+def _apply_move(solution: ALWABPSolution, move, trail: Optional[list]):
+    """ Aplica o movimento e o registra na trilha (se houver) para poder desfazê-lo. """
+    move.apply(solution)
+    if trail is not None:
+        trail.append(move)
+
+def _undo_moves(solution: ALWABPSolution, trail: list):
+    """ Desfaz, em ordem inversa, todos os movimentos da trilha. """
+    for move in reversed(trail):
+        move.undo(solution)
+    trail.clear()
+
+# --- Orçamento da busca e traço de convergência ---
+
+class SearchBudget:
+    """
+    Critérios de parada por tempo de relógio e por número de avaliações, e traço
+    de convergência (tempo, avaliações, melhor tempo de ciclo) a cada melhoria.
+    Uma avaliação é um vizinho pontuado (movimento avaliado, solução perturbada
+    ou alocação exata de trabalhadores).
+    """
+    def __init__(self, time_limit: Optional[float] = None, max_evaluations: Optional[int] = None):
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.start_time = time.perf_counter()
+        self.evaluations = 0
+        # trace[k] = (segundos desde o início, avaliações, melhor tempo de ciclo)
+        self.trace: List[Tuple[float, int, float]] = []
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    def exhausted(self) -> bool:
+        """ True se algum dos limites (tempo ou avaliações) foi atingido. """
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return True
+        return self.time_limit is not None and self.elapsed() >= self.time_limit
+
+    def record(self, best_cycle_time: float):
+        """ Registra uma melhoria da melhor solução no traço de convergência. """
+        self.trace.append((self.elapsed(), self.evaluations, best_cycle_time))
+
+def write_trace(output_filename: str, trace: List[Tuple[float, int, float]]):
+    """ Grava o traço de convergência em CSV (separado por ';', como o resumo dos experimentos). """
+    with open(output_filename, "w") as f:
+        f.write("Time_s;Evaluations;Best\n")
+        for elapsed, evaluations, best in trace:
+            f.write(f"{elapsed:.4f};{evaluations};{best}\n")
+
+# --- Instrumentação da busca ---
+
+class SearchStats:
+    """
+    Contadores opcionais da busca (ativados passando uma instância a vns()):
+    por vizinhança de shaking k, chamadas, perturbações infactíveis, vizinhos aceitos,
+    rejeitados e descartados pelo cache, avaliações e tempo (shaking + VND); por
+    vizinhança do VND, chamadas, descidas com melhoria, avaliações e tempo; e o
+    número de reinícios do VND (retornos à primeira vizinhança após uma melhoria).
+    """
+    def __init__(self):
+        self.iterations = 0
+        self.improvements = 0
+        self.vnd_runs = 0
+        self.vnd_restarts = 0
+        self.shaking: Dict[int, Dict[str, float]] = {}
+        self.vnd: Dict[str, Dict[str, float]] = {}
+
+    def shaking_entry(self, k: int) -> Dict[str, float]:
+        entry = self.shaking.get(k)
+        if entry is None:
+            entry = self.shaking[k] = {"calls": 0, "infeasible": 0, "accepted": 0, "rejected": 0,
+                                       "cache_skips": 0, "evaluations": 0, "time_s": 0.0}
+        return entry
+
+    def vnd_entry(self, name: str) -> Dict[str, float]:
+        entry = self.vnd.get(name)
+        if entry is None:
+            entry = self.vnd[name] = {"calls": 0, "improved": 0, "evaluations": 0, "time_s": 0.0}
+        return entry
+
+    def merge(self, other: Dict[str, Any]):
+        """ Acumula os contadores de outra busca (no formato de to_dict()). """
+        for key in ("iterations", "improvements", "vnd_runs", "vnd_restarts"):
+            setattr(self, key, getattr(self, key) + other[key])
+        for k, counters in other["shaking"].items():
+            entry = self.shaking_entry(int(k))
+            for key, value in counters.items():
+                entry[key] += value
+        for name, counters in other["vnd"].items():
+            entry = self.vnd_entry(name)
+            for key, value in counters.items():
+                entry[key] += value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "iterations": self.iterations,
+            "improvements": self.improvements,
+            "vnd_runs": self.vnd_runs,
+            "vnd_restarts": self.vnd_restarts,
+            "shaking": {str(k): dict(self.shaking[k]) for k in sorted(self.shaking)},
+            "vnd": {name: dict(counters) for name, counters in self.vnd.items()},
+        }
+
+def profile_summary(profiler: cProfile.Profile, limit: int = 25) -> List[Dict[str, Any]]:
+    """ As `limit` funções de maior tempo acumulado de um perfil do cProfile. """
+    profile_stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in profile_stats.stats.items():
+        rows.append({"function": f"{filename}:{line}({function})", "calls": calls,
+                     "tottime_s": round(tottime, 6), "cumtime_s": round(cumtime, 6)})
+    rows.sort(key=lambda row: row["cumtime_s"], reverse=True)
+    return rows[:limit]
+
+def stats_filename(output_filename: str) -> str:
+    """ Arquivo JSON das estatísticas ao lado do arquivo da solução. """
+    return os.path.splitext(output_filename)[0] + ".stats.json"
+
+def write_stats(output_filename: str, stats: Dict[str, Any]):
+    """ Grava as estatísticas da busca em JSON. """
+    with open(output_filename, "w") as f:
+        json.dump(stats, f, indent=2)
+
+# --- Memoização de avaliações ---
+
+class EvaluationCache:
+    """
+    Cache LRU limitado: hash de Zobrist de uma solução -> (factível, tempo de ciclo).
+    No VNS guarda o resultado do VND a partir de cada solução perturbada: um vizinho já
+    visitado cujo resultado não melhorou a solução corrente dispensa uma nova busca local.
+    Contabiliza acertos e falhas para dimensionar o cache.
+    Isso exige que o VND seja determinístico: o resultado deve depender apenas da solução de
+    partida (sem sorteios, com as mesmas vizinhanças e o mesmo backend durante a vida do cache).
+    Um VND interrompido pelo orçamento não satisfaz essa condição e não é guardado.
+    """
+    def __init__(self, max_size: int = CACHE_SIZE):
+        self.max_size = max_size
+        self.entries: 'OrderedDict[int, Tuple[bool, float]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: int) -> Optional[Tuple[bool, float]]:
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: int, value: Tuple[bool, float]):
+        if self.max_size <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def memory_bytes(self) -> int:
+        """ Estimativa da memória ocupada pelo cache (dicionário, chaves e valores). """
+        size = sys.getsizeof(self.entries)
+        for key, value in self.entries.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value) + sys.getsizeof(value[1])
+        return size
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+            "max_size": self.max_size,
+            "memory_bytes": self.memory_bytes(),
+        }
+
+def merge_cache_stats(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """ Soma as estatísticas de vários caches (p. ex. das trajetórias de parallel_vns). """
+    hits = sum(s["hits"] for s in stats)
+    misses = sum(s["misses"] for s in stats)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        "entries": max((s["entries"] for s in stats), default=0),
+        "max_size": max((s["max_size"] for s in stats), default=0),
+        "memory_bytes": max((s["memory_bytes"] for s in stats), default=0),
+    }
+
+def cache_summary(stats: Dict[str, Any]) -> str:
+    """ Resumo legível das estatísticas do cache. """
+    return (f"Cache: {stats['hits']} acertos, {stats['misses']} falhas "
+            f"(taxa {100 * stats['hit_rate']:.1f}%), {stats['entries']}/{stats['max_size']} entradas, "
+            f"~{stats['memory_bytes'] / 1024:.0f} KiB")
+
 # --- Funções Auxiliares para o VNS ---
 
 def check_precedence_feasibility(instance: ALWABPInstance, task_station_assignment: List[int]) -> bool:
@@ -263,7 +1006,7 @@ def generate_initial_solution(instance: ALWABPInstance) -> ALWABPSolution:
     
     # Ordenação topológica das tarefas (para garantir precedência)
     # Usando Kahn's algorithm
-    in_degree = {i: len(instance.predecessors[i+1]) for i in range(n)}
+    in_degree = {i: len(instance.predecessors(i)) for i in range(n)}
     queue = [i for i in range(n) if in_degree[i] == 0]
     topological_order = []
     
@@ -271,8 +1014,7 @@ def generate_initial_solution(instance: ALWABPInstance) -> ALWABPSolution:
         i = queue.pop(0)
         topological_order.append(i)
         
-        for j_task_1 in instance.successors[i+1]:
-            j = j_task_1 - 1
+        for j in instance.successors(i):
             in_degree[j] -= 1
             if in_degree[j] == 0:
                 queue.append(j)
@@ -287,8 +1029,6 @@ def generate_initial_solution(instance: ALWABPInstance) -> ALWABPSolution:
     current_station_times = [0.0] * m
     
     for i in topological_order: # Tarefa 0-indexada
-        task_1_index = i + 1
-        
         # Tentar alocar a tarefa i para a estação com menor tempo de trabalho atual
         best_station = -1
         min_time = INF
@@ -305,8 +1045,7 @@ def generate_initial_solution(instance: ALWABPInstance) -> ALWABPSolution:
             # Restrição de Precedência (já garantida pela ordem topológica,
             # mas vamos garantir que todos os predecessores estão em estações <= s)
             precedence_ok = True
-            for pred_1_index in instance.predecessors[task_1_index]:
-                pred_0_index = pred_1_index - 1
+            for pred_0_index in instance.predecessors(i):
                 # A estação do predecessor deve ser <= estação atual
                 if task_station_assignment[pred_0_index] > s:
                     precedence_ok = False
@@ -335,46 +1074,369 @@ def generate_initial_solution(instance: ALWABPInstance) -> ALWABPSolution:
     
     return sol
 
+# --- Construção orientada a estações ---
+
+def _priority_ranks(instance: ALWABPInstance, rule: str) -> List[List[int]]:
+    """
+    ranks[w][i] = posição da tarefa i na ordem de prioridade do trabalhador w (menor = mais prioritária).
+    positional_weight: tempo mínimo da tarefa somado ao de todos os seus sucessores (diretos e indiretos);
+    max_time: maior tempo mínimo; min_ratio: menor razão t_wi / tempo mínimo (tarefas em que w é eficiente);
+    successors: mais sucessores diretos. Empates pelo peso posicional.
+    """
+    n = instance.num_tasks
+    m = instance.num_workers
+    min_times = alwabp_bounds.min_task_times(instance)
+    descendants: List[Set[int]] = [set() for _ in range(n)]
+    for i in reversed(_topological_order(instance)):
+        for j in instance.successors(i):
+            descendants[i].add(j)
+            descendants[i] |= descendants[j]
+    weight = [min_times[i] + sum(min_times[j] for j in descendants[i]) for i in range(n)]
+
+    ranks = []
+    for w in range(m):
+        times = instance.task_times[w]
+        if rule == "positional_weight":
+            key = lambda i: -weight[i]
+        elif rule == "max_time":
+            key = lambda i: (-min_times[i], -weight[i])
+        elif rule == "min_ratio":
+            key = lambda i: (times[i] / min_times[i] if 0 < min_times[i] < INF else 1.0, -weight[i])
+        elif rule == "successors":
+            key = lambda i: (-(instance.succ_start[i + 1] - instance.succ_start[i]), -weight[i])
+        else:
+            raise ValueError(f"Regra de prioridade desconhecida: {rule}")
+        rank = [0] * n
+        for position, i in enumerate(sorted(range(n), key=key)):
+            rank[i] = position
+        ranks.append(rank)
+    return ranks
+
+def _topological_order(instance: ALWABPInstance) -> List[int]:
+    """ Ordem topológica das tarefas (0-indexadas), pelo algoritmo de Kahn. """
+    n = instance.num_tasks
+    in_degree = [instance.pred_start[i + 1] - instance.pred_start[i] for i in range(n)]
+    queue = deque(i for i in range(n) if in_degree[i] == 0)
+    order = []
+    while queue:
+        i = queue.popleft()
+        order.append(i)
+        for j in instance.successors(i):
+            in_degree[j] -= 1
+            if in_degree[j] == 0:
+                queue.append(j)
+    return order
+
+def _fill_station(instance: ALWABPInstance, w: int, cycle_time: float, rank: List[int],
+                  remaining_preds: List[int], available: List[int]) -> Tuple[List[int], float]:
+    """
+    Preenche uma estação com o trabalhador w: repetidamente aloca a tarefa disponível
+    (predecessores já alocados) de maior prioridade que w executa e que cabe em cycle_time.
+    Não altera remaining_preds nem available. Retorna (tarefas, carga).
+    """
+    times = instance.task_times[w]
+    succ_start, succ_index = instance.succ_start, instance.succ_index
+    limit = cycle_time + 1e-9
+    candidates = [i for i in available if times[i] < INF]
+    released: Dict[int, int] = {}
+    tasks: List[int] = []
+    load = 0.0
+    while True:
+        best = -1
+        for i in candidates:
+            if load + times[i] <= limit and (best == -1 or rank[i] < rank[best]):
+                best = i
+        if best == -1:
+            return tasks, load
+        candidates.remove(best)
+        tasks.append(best)
+        load += times[best]
+        for j in succ_index[succ_start[best]:succ_start[best + 1]]:
+            released[j] = released.get(j, 0) + 1
+            if released[j] == remaining_preds[j] and times[j] < INF:
+                candidates.append(j)
+
+def _build_stations(instance: ALWABPInstance, cycle_time: float, ranks: List[List[int]],
+                    min_times: List[float]) -> Optional[Tuple[List[int], List[int]]]:
+    """
+    Abre as estações em ordem; para cada uma, preenche uma estação candidata com cada
+    trabalhador ainda livre e escolhe a que absorve mais trabalho (soma dos tempos mínimos
+    das tarefas alocadas), dando preferência às que deixam o restante viável: a soma,
+    sobre as tarefas que sobram, do menor tempo entre os demais trabalhadores livres
+    precisa caber nas estações seguintes. Sem essa verificação, os melhores trabalhadores
+    são consumidos primeiro e as últimas estações ficam com tarefas que só executam mal.
+    Retorna (tarefa -> estação, estação -> trabalhador), ou None se sobrarem tarefas ao
+    fim das m estações.
+    """
+    n = instance.num_tasks
+    m = instance.num_workers
+    task_times = instance.task_times
+    remaining_preds = [instance.pred_start[i + 1] - instance.pred_start[i] for i in range(n)]
+    available = [i for i in range(n) if remaining_preds[i] == 0]
+    free_workers = list(range(m))
+    task_station_assignment = [-1] * n
+    worker_station_assignment = [-1] * m
+    remaining = set(range(n))
+    limit = cycle_time + 1e-9
+
+    for s in range(m):
+        # Menor e segundo menor tempo de cada tarefa restante entre os trabalhadores livres:
+        # sem o trabalhador w, a tarefa passa a custar o segundo menor se w era o melhor
+        # (exclusive[w] conta as tarefas que só w, entre os livres, executa)
+        best_time: Dict[int, Tuple[float, int, float]] = {}
+        remaining_work = 0.0
+        extra = [0.0] * m
+        exclusive = [0] * m
+        for i in remaining:
+            first, second, first_w = INF, INF, -1
+            for w in free_workers:
+                t = task_times[w][i]
+                if t < first:
+                    first, second, first_w = t, first, w
+                elif t < second:
+                    second = t
+            best_time[i] = (first, first_w, second)
+            remaining_work += first
+            if second < INF:
+                extra[first_w] += second - first
+            elif first_w >= 0:
+                exclusive[first_w] += 1
+        capacity = (m - s - 1) * limit
+
+        best_w, best_tasks, best_key = -1, [], (False, -1.0)
+        for w in free_workers:
+            tasks, _ = _fill_station(instance, w, cycle_time, ranks[w], remaining_preds, available)
+            rest = remaining_work + extra[w]
+            covered = 0
+            for i in tasks:
+                first, first_w, second = best_time[i]
+                if first_w != w:
+                    rest -= first
+                elif second < INF:
+                    rest -= second
+                else:
+                    rest -= first
+                    covered += 1
+            key = (covered == exclusive[w] and rest <= capacity, sum(min_times[i] for i in tasks))
+            if key > best_key:
+                best_w, best_tasks, best_key = w, tasks, key
+        free_workers.remove(best_w)
+        worker_station_assignment[s] = best_w
+        for i in best_tasks:
+            task_station_assignment[i] = s
+            remaining.discard(i)
+            available.remove(i)
+            for j in instance.successors(i):
+                remaining_preds[j] -= 1
+                if remaining_preds[j] == 0:
+                    available.append(j)
+
+    if remaining:
+        return None
+    return task_station_assignment, worker_station_assignment
+
+def station_oriented_solution(instance: ALWABPInstance, rules: Tuple[str, ...] = PRIORITY_RULES,
+                              budget: Optional[SearchBudget] = None) -> Optional[ALWABPSolution]:
+    """
+    Heurística construtiva orientada a estações: para cada regra de prioridade, busca
+    binária do menor tempo de ciclo alvo C (entre o limitante inferior e a soma dos
+    maiores tempos) para o qual _build_stations aloca todas as tarefas em m estações.
+    Retorna a melhor solução encontrada, ou None se nenhuma construção for completa.
+    budget: a busca é interrompida (com a melhor solução até então) quando o limite se esgota.
+    """
+    n = instance.num_tasks
+    m = instance.num_workers
+    if n == 0 or m == 0:
+        return None
+    min_times = alwabp_bounds.min_task_times(instance)
+    if max(min_times) >= INF:
+        return None
+    integral = all(float(t).is_integer() for t in min_times)
+    upper = sum(max((instance.task_times[w][i] for w in range(m) if instance.task_times[w][i] < INF))
+                for i in range(n))
+
+    best: Optional[ALWABPSolution] = None
+    for rule in rules:
+        ranks = _priority_ranks(instance, rule)
+        lo = alwabp_bounds.lower_bound(instance)
+        hi = upper
+        steps = 0
+        while lo < hi and (integral or steps < 30):
+            if budget is not None and budget.exhausted():
+                return best
+            target = math.floor((lo + hi) / 2) if integral else (lo + hi) / 2
+            steps += 1
+            built = _build_stations(instance, target, ranks, min_times)
+            if built is None:
+                lo = target + 1 if integral else target
+                continue
+            solution = ALWABPSolution(instance, *built)
+            solution.evaluate()
+            if best is None or solution < best:
+                best = solution
+            # O alvo seguinte fica abaixo do tempo de ciclo efetivamente obtido
+            hi = min(target, solution.cycle_time)
+            if integral:
+                hi = min(hi, solution.cycle_time - 1)
+                lo = min(lo, hi)
+        if best is not None and best.cycle_time <= alwabp_bounds.lower_bound(instance):
+            break
+    return best
+
+def build_initial_solution(instance: ALWABPInstance, construction: str = "station",
+                           budget: Optional[SearchBudget] = None) -> ALWABPSolution:
+    """
+    Solução inicial do VNS: "station" usa a construção orientada a estações e recorre à
+    heurística gulosa original se ela falhar (ou se a gulosa for melhor); "greedy" usa apenas a gulosa.
+    budget: limita o tempo da construção orientada a estações (ver station_oriented_solution).
+    """
+    if construction not in CONSTRUCTIONS:
+        raise ValueError(f"Construção desconhecida: {construction}")
+    greedy = generate_initial_solution(instance)
+    if construction == "greedy":
+        return greedy
+    station = station_oriented_solution(instance, budget=budget)
+    if station is None or greedy < station:
+        return greedy
+    return station
+
 # --- Implementação do VNS ---
 
-def vns(instance: ALWABPInstance, max_iter: int, k_max: int) -> Tuple[ALWABPSolution, ALWABPSolution]:
+def vns(instance: ALWABPInstance, max_iter: Optional[int], k_max: int, backend: str = "python",
+        budget: Optional[SearchBudget] = None, initial: Optional[ALWABPSolution] = None,
+        shaking_mode: str = "feasible", cache: Optional[EvaluationCache] = None,
+        lower_bound: Optional[float] = None, stats: Optional[SearchStats] = None,
+        neighborhoods: Optional[Tuple[str, ...]] = None, engine: str = "assignment") -> Tuple[ALWABPSolution, ALWABPSolution]:
     """
     Implementação da metaheurística Variable Neighborhood Search (VNS).
+    max_iter: número máximo de iterações (None = sem limite; exige limite no budget).
+    backend: "python" (avaliação incremental movimento a movimento) ou
+    "numpy" (avaliação vetorizada das vizinhanças; requer numpy).
+    budget: limites de tempo/avaliações e traço de convergência (opcional).
+    initial: solução de partida (padrão: gerada por generate_initial_solution).
+    shaking_mode: "feasible" (apenas perturbações factíveis enquanto a solução corrente
+    for factível) ou "random" (perturbação original, sem verificação).
+    cache: memoização do resultado do VND por hash da solução perturbada (opcional).
+    lower_bound: limitante inferior de C_max; a busca para quando a melhor solução o atinge.
+    stats: contadores de avaliações, movimentos e tempo por vizinhança (opcional).
+    neighborhoods: sequência de vizinhanças do VND (nomes de VND_NEIGHBORHOODS; padrão: DEFAULT_VND).
+    engine: "assignment" (busca sobre tarefa -> estação) ou "sequence" (SequenceSolution: sequência
+    topológica + permutação de trabalhadores, com vizinhanças de SEQUENCE_NEIGHBORHOODS e padrão
+    DEFAULT_SEQUENCE_VND). Em ambos os casos as soluções retornadas são ALWABPSolution.
+
+    A solução corrente é modificada no lugar: os movimentos do shaking e do VND são
+    registrados numa trilha e desfeitos quando o resultado é rejeitado; uma cópia só
+    é feita quando uma nova melhor solução é encontrada.
     """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend}")
+    if backend == "numpy" and np is None:
+        raise RuntimeError("O backend 'numpy' requer o pacote numpy instalado.")
+    if shaking_mode not in SHAKING_MODES:
+        raise ValueError(f"Modo de shaking desconhecido: {shaking_mode}")
+    if engine not in ENGINES:
+        raise ValueError(f"Motor de busca desconhecido: {engine}")
+    sequence_engine = engine == "sequence"
+    registry = SEQUENCE_NEIGHBORHOODS if sequence_engine else VND_NEIGHBORHOODS
+    neighborhoods = tuple(neighborhoods) if neighborhoods else (DEFAULT_SEQUENCE_VND if sequence_engine else DEFAULT_VND)
+    for name in neighborhoods:
+        if name not in registry:
+            raise ValueError(f"Vizinhança desconhecida: {name}")
+    if budget is None:
+        budget = SearchBudget()
+    if max_iter is None and budget.time_limit is None and budget.max_evaluations is None:
+        raise ValueError("Sem limite de iterações é preciso definir um limite de tempo ou de avaliações.")
     
     # 1. Geração da Solução Inicial
-    s_initial = generate_initial_solution(instance)
-    s_best = s_initial
-    s_current = s_initial
+    s_initial = initial.copy() if initial is not None else generate_initial_solution(instance)
+    budget.evaluations += 1
+    budget.record(s_initial.cycle_time)
+    s_best = SequenceSolution.from_solution(s_initial) if sequence_engine else s_initial
+    s_current = s_best.copy()
     
     if not s_best.is_feasible:
         # Se a solução inicial não é factível, o VNS pode não convergir
         # Mas vamos tentar, pois a busca local pode reparar a solução.
         pass
         
+    def optimal() -> bool:
+        return lower_bound is not None and s_best.is_feasible and s_best.cycle_time <= lower_bound
+
+    trail: list = []
     iteration = 0
-    while iteration < max_iter:
+    while (max_iter is None or iteration < max_iter) and not budget.exhausted() and not optimal():
         k = 1
-        while k <= k_max:
+        while k <= k_max and not budget.exhausted() and not optimal():
+            # O tempo de ciclo é INF para soluções infactíveis, então comparar
+            # tempos de ciclo equivale a comparar as soluções com __lt__
+            current_cycle_time = s_current.cycle_time
+            if stats is not None:
+                shaking_stats = stats.shaking_entry(k)
+                shaking_stats["calls"] += 1
+                step_start, step_evaluations = time.perf_counter(), budget.evaluations
+
             # 2. Shaking (Perturbação)
-            s_prime = shaking(s_current, k)
+            if sequence_engine:
+                _shake_sequence(s_current, k, trail)
+            elif shaking_mode == "feasible" and s_current.is_feasible:
+                _shake_feasible(s_current, k, trail)
+            else:
+                _shake(s_current, k, trail)
+            budget.evaluations += 1
+            if stats is not None and not s_current.is_feasible:
+                shaking_stats["infeasible"] += 1
+
+            # Vizinho já visitado cujo VND não melhorou a solução corrente: descarta sem nova busca local
+            shaken_key = s_current.hash_key
+            if cache is not None:
+                cached = cache.get(shaken_key)
+                if cached is not None and cached[1] >= current_cycle_time:
+                    _undo_moves(s_current, trail)
+                    k += 1
+                    if stats is not None:
+                        shaking_stats["cache_skips"] += 1
+                        shaking_stats["evaluations"] += budget.evaluations - step_evaluations
+                        shaking_stats["time_s"] += time.perf_counter() - step_start
+                    continue
             
             # 3. Busca Local (Local Search)
             # Usaremos o VNS-Descent (VND) no lugar do Local Search
-            s_prime_prime = vnd(s_prime)
+            completed = _vnd(s_current, backend, neighborhoods, trail, budget, stats, registry)
+            if cache is not None and completed:
+                # Um VND interrompido pelo orçamento não é guardado (resultado incompleto)
+                cache.put(shaken_key, (s_current.is_feasible, s_current.cycle_time))
+            accepted = s_current.cycle_time < current_cycle_time
+            if stats is not None:
+                shaking_stats["accepted" if accepted else "rejected"] += 1
+                shaking_stats["evaluations"] += budget.evaluations - step_evaluations
+                shaking_stats["time_s"] += time.perf_counter() - step_start
             
             # 4. Movimento (Move)
-            if s_prime_prime < s_current:
-                s_current = s_prime_prime
+            if accepted:
+                trail.clear()
                 if s_current < s_best:
-                    s_best = s_current
+                    s_best = s_current.copy()
+                    budget.record(s_best.cycle_time)
+                    if stats is not None:
+                        stats.improvements += 1
                     k = 1 # Reinicia a busca
                 else:
                     k += 1 # Vai para a próxima vizinhança
             else:
+                _undo_moves(s_current, trail)
                 k += 1 # Vai para a próxima vizinhança
                 
         iteration += 1
+        if stats is not None:
+            stats.iterations += 1
+
+    # 5. Pós-otimização: alocação ótima de trabalhadores para a partição de tarefas da melhor solução
+    if sequence_engine:
+        s_best = s_best.to_solution() if s_best < s_initial else s_initial
+    s_polished = s_best.copy()
+    if not optimal() and _descent_worker_assignment(s_polished, backend, None, budget):
+        s_best = s_polished
+        budget.record(s_best.cycle_time)
         
     return s_initial, s_best
 
@@ -386,231 +1448,1486 @@ def shaking(solution: ALWABPSolution, k: int) -> ALWABPSolution:
     k=2: Reatribuição de 1 tarefa para uma estação diferente (Task Reassignment).
     k=3: Troca de 2 trabalhadores entre 2 estações diferentes (Worker Swap).
     """
+    s_prime = solution.copy()
+    _shake(s_prime, k, None)
+    return s_prime
+
+def _shake(solution: ALWABPSolution, k: int, trail: Optional[list]):
+    """ Shaking no lugar: aplica o movimento aleatório da k-ésima vizinhança e o registra na trilha. """
     inst = solution.instance
     n = inst.num_tasks
     m = inst.num_workers
     
-    new_task_station_assignment = list(solution.task_station_assignment)
-    new_worker_station_assignment = list(solution.worker_station_assignment)
-    
     if k == 1:
         # Task Swap: Troca de 2 tarefas entre 2 estações
-        if n < 2: return solution
+        if n < 2: return
         
-        # Seleciona duas tarefas diferentes
+        # Seleciona duas tarefas diferentes e troca as estações
         i1, i2 = random.sample(range(n), 2)
-        
-        # Troca as estações
-        s1 = new_task_station_assignment[i1]
-        s2 = new_task_station_assignment[i2]
-        
-        new_task_station_assignment[i1] = s2
-        new_task_station_assignment[i2] = s1
+        _apply_move(solution, TaskSwapMove(i1, i2), trail)
         
     elif k == 2:
         # Task Reassignment: Reatribuição de 1 tarefa para uma estação diferente
-        if n < 1: return solution
+        if n < 1: return
             
         # Seleciona uma tarefa e uma nova estação
         i = random.choice(range(n))
-        s_old = new_task_station_assignment[i]
+        s_old = solution.task_station_assignment[i]
         
         # Seleciona uma nova estação diferente da atual
         possible_new_stations = [s for s in range(m) if s != s_old]
-        if not possible_new_stations: return solution
+        if not possible_new_stations: return
             
         s_new = random.choice(possible_new_stations)
-        
-        new_task_station_assignment[i] = s_new
+        _apply_move(solution, ReassignMove(i, s_new), trail)
         
     elif k == 3:
         # Worker Swap: Troca de 2 trabalhadores entre 2 estações
-        if m < 2: return solution
+        if m < 2: return
             
-        # Seleciona duas estações diferentes
+        # Seleciona duas estações diferentes e troca os trabalhadores
         s1, s2 = random.sample(range(m), 2)
-        
-        # Troca os trabalhadores
-        w1 = new_worker_station_assignment[s1]
-        w2 = new_worker_station_assignment[s2]
-        
-        new_worker_station_assignment[s1] = w2
-        new_worker_station_assignment[s2] = w1
+        _apply_move(solution, WorkerSwapMove(s1, s2), trail)
         
     else:
         # Para k > 3, repete o movimento de reatribuição de tarefa
-        return shaking(solution, 2)
-        
-    s_prime = ALWABPSolution(inst, new_task_station_assignment, new_worker_station_assignment)
-    s_prime.evaluate()
+        _shake(solution, 2, trail)
+
+def feasible_shaking(solution: ALWABPSolution, k: int) -> ALWABPSolution:
+    """
+    Shaking que preserva a factibilidade de uma solução factível: as mesmas vizinhanças
+    de shaking(), mas sorteando apenas movimentos que respeitam as precedências (pelas
+    janelas de precedência das tarefas) e as incapacidades dos trabalhadores.
+    """
+    s_prime = solution.copy()
+    _shake_feasible(s_prime, k, None)
     return s_prime
 
-def vnd(solution: ALWABPSolution) -> ALWABPSolution:
+def _shake_feasible(solution: ALWABPSolution, k: int, trail: Optional[list]):
+    """ Shaking factível no lugar (a solução precisa ser factível). """
+    inst = solution.instance
+    n = inst.num_tasks
+    m = inst.num_workers
+    tsa = solution.task_station_assignment
+    wsa = solution.worker_station_assignment
+    times = inst.task_times
+
+    if k == 1:
+        # Task Swap entre estações diferentes: cada tarefa deve caber na janela e ser
+        # executável pelo trabalhador da outra estação, e as duas não podem ter arco entre si
+        if n >= 2:
+            for _ in range(SHAKE_ATTEMPTS):
+                i1, i2 = random.sample(range(n), 2)
+                s1, s2 = tsa[i1], tsa[i2]
+                if s1 == s2:
+                    continue
+                if not (solution.window_lo[i1] <= s2 <= solution.window_hi[i1]
+                        and solution.window_lo[i2] <= s1 <= solution.window_hi[i2]):
+                    continue
+                if times[wsa[s2]][i1] >= INF or times[wsa[s1]][i2] >= INF:
+                    continue
+                if inst.ordered(i1, i2):
+                    continue
+                _apply_move(solution, TaskSwapMove(i1, i2), trail)
+                return
+        # Nenhuma troca factível encontrada: recorre à reatribuição
+        _shake_feasible(solution, 2, trail)
+
+    elif k == 2:
+        # Task Reassignment para uma estação da janela cujo trabalhador executa a tarefa
+        if n < 1: return
+        for _ in range(SHAKE_ATTEMPTS):
+            i = random.randrange(n)
+            s_old = tsa[i]
+            possible_new_stations = [s for s in solution.feasible_stations(i)
+                                     if s != s_old and times[wsa[s]][i] < INF]
+            if possible_new_stations:
+                _apply_move(solution, ReassignMove(i, random.choice(possible_new_stations)), trail)
+                return
+
+    elif k == 3:
+        # Worker Swap entre estações cujos trabalhadores executam as tarefas da outra
+        if m < 2: return
+        solution._ensure_worker_loads()
+        for _ in range(SHAKE_ATTEMPTS):
+            s1, s2 = random.sample(range(m), 2)
+            if solution.worker_incapable[s1][wsa[s2]] == 0 and solution.worker_incapable[s2][wsa[s1]] == 0:
+                _apply_move(solution, WorkerSwapMove(s1, s2), trail)
+                return
+
+    else:
+        # Para k > 3, repete o movimento de reatribuição de tarefa
+        _shake_feasible(solution, 2, trail)
+
+def vnd(solution: ALWABPSolution, backend: str = "python", neighborhoods: Optional[Tuple[str, ...]] = None) -> ALWABPSolution:
     """
     Variable Neighborhood Descent (VND) - Busca Local com Múltiplas Vizinhanças.
-    Vizinhanças (l):
+    Vizinhanças (l), na ordem de `neighborhoods` (nomes de VND_NEIGHBORHOODS). Padrão:
     l=1: Task Reassignment (First Improvement)
-    l=2: Worker Swap (First Improvement)
+    l=2: Worker Assignment (alocação ótima de trabalhadores, LBAP)
+    """
+    s_current = solution.copy()
+    _vnd(s_current, backend, neighborhoods or DEFAULT_VND, None)
+    return s_current
+
+def _vnd(solution: ALWABPSolution, backend: str, neighborhoods: Tuple[str, ...], trail: Optional[list],
+         budget: Optional[SearchBudget] = None, stats: Optional[SearchStats] = None,
+         registry: Optional[Dict[str, Any]] = None):
     """
-    s_current = solution
-    l_max = 2
+    VND no lugar: cada descida aplica apenas movimentos que melhoram e os registra na trilha.
+    registry: nome -> descida (padrão: VND_NEIGHBORHOODS; SEQUENCE_NEIGHBORHOODS no motor "sequence").
+    Retorna False se o orçamento se esgotou durante o VND (a solução pode não ser um ótimo local).
+    """
+    registry = registry or VND_NEIGHBORHOODS
+    l_max = len(neighborhoods)
     l = 1
+    if stats is not None:
+        stats.vnd_runs += 1
+        if budget is None:
+            budget = SearchBudget()
     
     while l <= l_max:
-        s_prime = s_current
-        
-        if l == 1:
-            # Vizinhança 1: Task Reassignment (Mover 1 tarefa para outra estação)
-            s_prime = local_search_task_reassignment(s_current)
-        elif l == 2:
-            # Vizinhança 2: Worker Swap (Trocar 2 trabalhadores de estação)
-            s_prime = local_search_worker_swap(s_current)
-            
-        if s_prime < s_current:
-            s_current = s_prime
+        if budget is not None and budget.exhausted():
+            return False
+        descent = registry[neighborhoods[l - 1]]
+        if stats is None:
+            improved = descent(solution, backend, trail, budget)
+        else:
+            descent_stats = stats.vnd_entry(neighborhoods[l - 1])
+            descent_start, descent_evaluations = time.perf_counter(), budget.evaluations
+            improved = descent(solution, backend, trail, budget)
+            descent_stats["calls"] += 1
+            descent_stats["improved"] += improved
+            descent_stats["evaluations"] += budget.evaluations - descent_evaluations
+            descent_stats["time_s"] += time.perf_counter() - descent_start
+            stats.vnd_restarts += improved and l > 1
+        if improved:
             l = 1 # Reinicia a busca
         else:
             l += 1 # Vai para a próxima vizinhança
-            
-    return s_current
+    # A última descida também pode ter sido interrompida pelo orçamento
+    return budget is None or not budget.exhausted()
+
+# --- Avaliação vetorizada das vizinhanças (backend "numpy") ---
 
-def local_search_task_reassignment(solution: ALWABPSolution) -> ALWABPSolution:
+def _max_load_excluding_np(solution: ALWABPSolution, s1, s2):
     """
-    Busca Local (First Improvement) usando a vizinhança de Task Reassignment.
+    Versão vetorizada de ALWABPSolution._max_load_excluding: para cada par (s1, s2)
+    (arrays compatíveis por broadcasting) retorna a maior carga entre as demais estações.
+    """
+    other = np.zeros(np.broadcast(s1, s2).shape)
+    # Percorre as estações gargalo da menos para a mais carregada: a primeira válida prevalece
+    for s in reversed(solution.bottleneck):
+        valid = (s1 != s) & (s2 != s)
+        other = np.where(valid, solution.station_loads[s], other)
+    return other
+
+def _pick_move_np(cycle_times, current: float, first_improvement: bool):
+    """ Índice (linear) do movimento escolhido em cycle_times, ou None se nenhum melhora current. """
+    flat = cycle_times.ravel()
+    if first_improvement:
+        improving = np.flatnonzero(flat < current)
+        return int(improving[0]) if improving.size else None
+    best = int(np.argmin(flat)) if flat.size else None
+    return best if best is not None and flat[best] < current else None
+
+def best_reassignment_move_np(solution: ALWABPSolution, first_improvement: bool = True) -> Optional[Tuple[int, int, float]]:
+    """
+    Avalia de uma vez todos os n*m movimentos de Task Reassignment de uma solução factível.
+    Retorna (tarefa, nova estação, tempo de ciclo) do primeiro movimento que melhora
+    (na mesma ordem da busca em Python) ou do melhor, ou None se não houver melhoria.
     """
-    s_current = solution
     inst = solution.instance
     n = inst.num_tasks
     m = inst.num_workers
+    tsa = np.asarray(solution.task_station_assignment)
+    loads = np.asarray(solution.station_loads)
+    # station_times_of[s, i] = tempo da tarefa i pelo trabalhador alocado à estação s
+    station_times_of = inst.times_array()[np.asarray(solution.worker_station_assignment)]
+
+    load_old = loads[tsa] - station_times_of[tsa, np.arange(n)]  # (n,)
+    load_new = loads[None, :] + station_times_of.T  # (n, m)
+    s_old = tsa[:, None]
+    s_new = np.arange(m)[None, :]
+    cycle_times = np.maximum(np.maximum(load_old[:, None], load_new), _max_load_excluding_np(solution, s_old, s_new))
+
+    # Movimentos nulos ou fora da janela de precedência são descartados
+    lo = np.asarray(solution.window_lo)[:, None]
+    hi = np.asarray(solution.window_hi)[:, None]
+    cycle_times[(s_new == s_old) | (s_new < lo) | (s_new > hi)] = INF
+
+    move = _pick_move_np(cycle_times, solution.cycle_time, first_improvement)
+    if move is None:
+        return None
+    i, s = divmod(move, m)
+    return i, s, float(cycle_times[i, s])
+
+def best_worker_swap_move_np(solution: ALWABPSolution, first_improvement: bool = True) -> Optional[Tuple[int, int, float]]:
+    """
+    Avalia de uma vez todas as trocas de trabalhadores (s1 < s2) de uma solução factível.
+    Retorna (s1, s2, tempo de ciclo) do primeiro movimento que melhora ou do melhor,
+    ou None se não houver melhoria.
+    """
+    m = solution.instance.num_workers
+    solution._ensure_worker_loads()
+    # load[s, w] = carga da estação s se operada pelo trabalhador w
+    load = np.array(solution.worker_loads)
+    load[np.asarray(solution.worker_incapable) > 0] = INF
+
+    # swapped[s1, s2] = carga da estação s1 com o trabalhador da estação s2
+    swapped = load[:, np.asarray(solution.worker_station_assignment)]
+    s1 = np.arange(m)[:, None]
+    s2 = np.arange(m)[None, :]
+    cycle_times = np.maximum(np.maximum(swapped, swapped.T), _max_load_excluding_np(solution, s1, s2))
+    cycle_times[s2 <= s1] = INF
+
+    move = _pick_move_np(cycle_times, solution.cycle_time, first_improvement)
+    if move is None:
+        return None
+    s1, s2 = divmod(move, m)
+    return s1, s2, float(cycle_times[s1, s2])
+
+def best_critical_reassign_move_np(solution: ALWABPSolution, first_improvement: bool = True) -> Optional[Tuple[int, int, float]]:
+    """
+    Avalia de uma vez as reatribuições das tarefas das estações gargalo de uma solução factível,
+    com o critério de _descent_critical_reassign: melhora se reduz o tempo de ciclo ou, empatando,
+    o número de estações gargalo. Retorna (tarefa, nova estação, tempo de ciclo) do primeiro
+    movimento que melhora (na mesma ordem da busca em Python) ou do melhor, ou None.
+    """
+    inst = solution.instance
+    m = inst.num_workers
+    current = solution.cycle_time
+    critical = solution.critical_stations()
+    tasks = np.array([i for s in critical for i in sorted(solution.station_tasks[s])], dtype=np.intp)
+    if tasks.size == 0:
+        return None
+    tsa = np.asarray(solution.task_station_assignment)[tasks]
+    loads = np.asarray(solution.station_loads)
+    station_times_of = inst.times_array()[np.asarray(solution.worker_station_assignment)]
+
+    load_old = loads[tsa] - station_times_of[tsa, tasks]  # (t,)
+    load_new = loads[None, :] + station_times_of[:, tasks].T  # (t, m)
+    s_old = tsa[:, None]
+    s_new = np.arange(m)[None, :]
+    cycle_times = np.maximum(np.maximum(load_old[:, None], load_new), _max_load_excluding_np(solution, s_old, s_new))
+    lo = np.asarray(solution.window_lo)[tasks][:, None]
+    hi = np.asarray(solution.window_hi)[tasks][:, None]
+    cycle_times[(s_new == s_old) | (s_new < lo) | (s_new > hi)] = INF
+
+    # Nº de estações gargalo após o movimento (s_old é gargalo antes dele)
+    counts = (len(critical) - 1 - (loads[None, :] == current) + (load_old[:, None] == current)
+              + (load_new == current))
+    improving = (cycle_times < current) | ((cycle_times == current) & (counts < len(critical)))
+    candidates = np.flatnonzero(improving.ravel())
+    if candidates.size == 0:
+        return None
+    if first_improvement:
+        move = int(candidates[0])
+    else:
+        # Menor (tempo de ciclo, nº de gargalos); em empate, o primeiro na ordem da busca
+        order = np.lexsort((candidates, counts.ravel()[candidates], cycle_times.ravel()[candidates]))
+        move = int(candidates[order[0]])
+    row, s = divmod(move, m)
+    return int(tasks[row]), s, float(cycle_times[row, s])
+
+# --- Alocação ótima de trabalhadores (Linear Bottleneck Assignment) ---
+
+def _perfect_matching(cost: List[List[float]], threshold: float) -> Optional[List[int]]:
+    """
+    Emparelhamento perfeito estação -> trabalhador usando apenas pares com cost[s][w] <= threshold
+    (caminhos aumentantes por BFS). Retorna match[s] = w ou None se não existir.
+    """
+    m = len(cost)
+    allowed = [[w for w in range(m) if cost[s][w] <= threshold] for s in range(m)]
+    match_station = [-1] * m  # match_station[s] = w
+    match_worker = [-1] * m  # match_worker[w] = s
+    for root in range(m):
+        reached_from = [-1] * m  # reached_from[w] = estação pela qual w foi alcançado
+        queue = deque([root])
+        augmented = False
+        while queue and not augmented:
+            s = queue.popleft()
+            for w in allowed[s]:
+                if reached_from[w] != -1:
+                    continue
+                reached_from[w] = s
+                if match_worker[w] == -1:
+                    # Inverte o caminho aumentante até a raiz
+                    while w != -1:
+                        s = reached_from[w]
+                        next_w = match_station[s]
+                        match_station[s] = w
+                        match_worker[w] = s
+                        w = next_w
+                    augmented = True
+                    break
+                queue.append(match_worker[w])
+        if not augmented:
+            return None
+    return match_station
+
+def optimal_worker_assignment(solution: ALWABPSolution) -> Optional[Tuple[List[int], float]]:
+    """
+    Resolve de forma exata o problema de alocação de gargalo (LBAP) dos trabalhadores
+    às estações, mantendo fixa a partição de tarefas da solução: busca binária sobre os
+    valores ordenados de worker_loads[s][w] com teste de emparelhamento perfeito.
+    Retorna (worker_station_assignment, tempo de ciclo) ou None se nenhuma alocação for factível.
+    """
+    solution._ensure_worker_loads()
+    m = solution.instance.num_workers
+    if m == 0:
+        return None
+    cost = [[load if incapable == 0 else INF
+             for load, incapable in zip(solution.worker_loads[s], solution.worker_incapable[s])]
+            for s in range(m)]
+
+    # Limite inferior: cada estação precisa de algum trabalhador e cada trabalhador de alguma estação
+    lower = max(max(min(row) for row in cost), max(min(cost[s][w] for s in range(m)) for w in range(m)))
+    if lower >= INF:
+        return None
+    thresholds = sorted({c for row in cost for c in row if lower <= c < INF})
+
+    best = None
+    lo, hi = 0, len(thresholds) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        assignment = _perfect_matching(cost, thresholds[mid])
+        if assignment is not None:
+            best = (assignment, thresholds[mid])
+            hi = mid - 1
+        else:
+            lo = mid + 1
+    return best
+
+def local_search_worker_assignment(solution: ALWABPSolution, backend: str = "python") -> ALWABPSolution:
+    """
+    Vizinhança exata de alocação de trabalhadores: substitui a alocação atual pela alocação
+    ótima (LBAP) para a partição de tarefas corrente, se ela reduzir o tempo de ciclo.
+    """
+    s_current = solution.copy()
+    _descent_worker_assignment(s_current, backend)
+    return s_current
+
+def _descent_worker_assignment(solution: ALWABPSolution, backend: str = "python", trail: Optional[list] = None,
+                               budget: Optional[SearchBudget] = None) -> bool:
+    if solution.violations or solution.unassigned:
+        return False
+    result = optimal_worker_assignment(solution)
+    if budget is not None:
+        budget.evaluations += 1
+    if result is None or not result[1] < solution.cycle_time:
+        return False
+    _apply_move(solution, WorkerAssignmentMove(result[0]), trail)
+    return True
+
+def local_search_task_reassignment(solution: ALWABPSolution, backend: str = "python") -> ALWABPSolution:
+    """
+    Busca Local (First Improvement) usando a vizinhança de Task Reassignment.
+    Os vizinhos são avaliados incrementalmente e o movimento só é aplicado quando aceito.
+    Apenas estações dentro da janela de precedência de cada tarefa são enumeradas.
+    Com backend="numpy", a vizinhança inteira é avaliada em lote a cada passo.
+    """
+    s_current = solution.copy()
+    _descent_task_reassignment(s_current, backend)
+    return s_current
+
+def _descent_task_reassignment(solution: ALWABPSolution, backend: str = "python", trail: Optional[list] = None,
+                               budget: Optional[SearchBudget] = None) -> bool:
+    n = solution.instance.num_tasks
+    improved_any = False
+
+    if backend == "numpy":
+        # A avaliação em lote exige uma solução factível; caso contrário segue em Python
+        while solution.is_feasible:
+            if budget is not None:
+                budget.evaluations += n * solution.instance.num_workers
+            move = best_reassignment_move_np(solution)
+            if move is None:
+                return improved_any
+            _apply_move(solution, ReassignMove(move[0], move[1]), trail)
+            improved_any = True
+            if budget is not None and budget.exhausted():
+                return improved_any
     
+    evaluations = 0
     improved = True
     while improved:
         improved = False
+        if budget is not None:
+            budget.evaluations += evaluations
+            evaluations = 0
+            if budget.exhausted():
+                break
         
         # Iterar sobre todos os movimentos de Task Reassignment
         for i in range(n): # Tarefa 0-indexada
-            s_old = s_current.task_station_assignment[i]
+            s_old = solution.task_station_assignment[i]
             
-            for s_new in range(m): # Nova estação 0-indexada
+            # Apenas estações dentro da janela de precedência da tarefa i
+            for s_new in solution.feasible_stations(i): # Nova estação 0-indexada
                 if s_new == s_old:
                     continue
                 
-                # Criar nova solução
-                new_task_station_assignment = list(s_current.task_station_assignment)
-                new_task_station_assignment[i] = s_new
-                
-                # Verificar factibilidade de precedência antes de avaliar
-                if not check_precedence_feasibility(inst, new_task_station_assignment):
-                    continue
-                
-                s_neighbor = ALWABPSolution(inst, new_task_station_assignment, s_current.worker_station_assignment)
-                s_neighbor.evaluate()
-                
+                # Avaliação incremental do vizinho (INF se infactível)
                 # Critério de Melhoria (First Improvement)
-                if s_neighbor < s_current:
-                    s_current = s_neighbor
-                    improved = True
+                evaluations += 1
+                if solution.evaluate_reassign(i, s_new) < solution.cycle_time:
+                    _apply_move(solution, ReassignMove(i, s_new), trail)
+                    improved = improved_any = True
                     break # Sai do loop de s_new e recomeça a busca
             
             if improved:
                 break # Sai do loop de i e recomeça a busca
                 
-    return s_current
+    if budget is not None:
+        budget.evaluations += evaluations
+    return improved_any
 
-def local_search_worker_swap(solution: ALWABPSolution) -> ALWABPSolution:
+def local_search_worker_swap(solution: ALWABPSolution, backend: str = "python") -> ALWABPSolution:
     """
     Busca Local (First Improvement) usando a vizinhança de Worker Swap.
+    Os vizinhos são avaliados incrementalmente e o movimento só é aplicado quando aceito.
+    Com backend="numpy", a vizinhança inteira é avaliada em lote a cada passo.
     """
-    s_current = solution
-    inst = solution.instance
-    m = inst.num_workers
+    s_current = solution.copy()
+    _descent_worker_swap(s_current, backend)
+    return s_current
+
+def _descent_worker_swap(solution: ALWABPSolution, backend: str = "python", trail: Optional[list] = None,
+                         budget: Optional[SearchBudget] = None) -> bool:
+    m = solution.instance.num_workers
+    improved_any = False
+
+    if backend == "numpy":
+        while solution.is_feasible:
+            if budget is not None:
+                budget.evaluations += m * (m - 1) // 2
+            move = best_worker_swap_move_np(solution)
+            if move is None:
+                return improved_any
+            _apply_move(solution, WorkerSwapMove(move[0], move[1]), trail)
+            improved_any = True
+            if budget is not None and budget.exhausted():
+                return improved_any
     
+    evaluations = 0
     improved = True
     while improved:
         improved = False
+        if budget is not None:
+            budget.evaluations += evaluations
+            evaluations = 0
+            if budget.exhausted():
+                break
         
         # Iterar sobre todos os pares de estações (s1, s2)
         for s1 in range(m):
             for s2 in range(s1 + 1, m):
-                # Criar nova solução
-                new_worker_station_assignment = list(s_current.worker_station_assignment)
-                
-                # Troca os trabalhadores
-                new_worker_station_assignment[s1], new_worker_station_assignment[s2] = \
-                    new_worker_station_assignment[s2], new_worker_station_assignment[s1]
-                
-                s_neighbor = ALWABPSolution(inst, s_current.task_station_assignment, new_worker_station_assignment)
-                s_neighbor.evaluate()
-                
                 # Critério de Melhoria (First Improvement)
-                if s_neighbor < s_current:
-                    s_current = s_neighbor
-                    improved = True
+                evaluations += 1
+                if solution.evaluate_worker_swap(s1, s2) < solution.cycle_time:
+                    _apply_move(solution, WorkerSwapMove(s1, s2), trail)
+                    improved = improved_any = True
                     break # Sai do loop de s2 e recomeça a busca
             
             if improved:
                 break # Sai do loop de s1 e recomeça a busca
                 
+    if budget is not None:
+        budget.evaluations += evaluations
+    return improved_any
+
+def _critical_key(cycle_time: float, critical_count: int, loads_before: Tuple[float, float],
+                  loads_after: Tuple[float, float], current_cycle_time: float) -> Tuple[float, int]:
+    """
+    Chave lexicográfica (tempo de ciclo, nº de estações gargalo) de um vizinho em que
+    apenas duas estações mudam de carga (loads_before -> loads_after).
+    """
+    if cycle_time > current_cycle_time:
+        return cycle_time, 0
+    count = (critical_count - sum(load == current_cycle_time for load in loads_before)
+             + sum(load == current_cycle_time for load in loads_after))
+    return cycle_time, count
+
+def _descent_critical_reassign(solution: ALWABPSolution, backend: str = "python", trail: Optional[list] = None,
+                               budget: Optional[SearchBudget] = None, best_improvement: bool = False) -> bool:
+    """
+    Busca local focada no gargalo: apenas movimentos que retiram uma tarefa de uma estação
+    gargalo. Um vizinho é aceito se reduz o tempo de ciclo ou, empatando, reduz o número de
+    estações gargalo (desempate que permite progredir quando várias estações têm a carga máxima).
+    Com backend="numpy", os movimentos das estações gargalo são avaliados em lote a cada passo.
+    """
+    if not solution.is_feasible:
+        return False
+    inst = solution.instance
+    times = inst.task_times
+    wsa = solution.worker_station_assignment
+    loads = solution.station_loads
+    improved_any = False
+
+    if backend == "numpy":
+        while budget is None or not budget.exhausted():
+            if budget is not None:
+                budget.evaluations += sum(len(solution.station_tasks[s]) for s in solution.critical_stations()) * inst.num_workers
+            move = best_critical_reassign_move_np(solution, not best_improvement)
+            if move is None:
+                break
+            _apply_move(solution, ReassignMove(move[0], move[1]), trail)
+            improved_any = True
+        return improved_any
+
+    while budget is None or not budget.exhausted():
+        current = solution.cycle_time
+        critical = solution.critical_stations()
+        current_key = (current, len(critical))
+        best_key, best_move = current_key, None
+        evaluations = 0
+        for s_old in critical:
+            for i in sorted(solution.station_tasks[s_old]):
+                for s_new in solution.feasible_stations(i):
+                    if s_new == s_old:
+                        continue
+                    evaluations += 1
+                    cycle_time = solution.evaluate_reassign(i, s_new)
+                    if cycle_time >= INF:
+                        continue
+                    key = _critical_key(cycle_time, len(critical), (loads[s_old], loads[s_new]),
+                                        (loads[s_old] - times[wsa[s_old]][i], loads[s_new] + times[wsa[s_new]][i]),
+                                        current)
+                    if key < best_key:
+                        best_key, best_move = key, (i, s_new)
+                        if not best_improvement:
+                            break
+                if best_move is not None and not best_improvement:
+                    break
+            if best_move is not None and not best_improvement:
+                break
+        if budget is not None:
+            budget.evaluations += evaluations
+        if best_move is None:
+            break
+        _apply_move(solution, ReassignMove(*best_move), trail)
+        improved_any = True
+    return improved_any
+
+def _descent_critical_reassign_best(solution: ALWABPSolution, backend: str = "python", trail: Optional[list] = None,
+                                    budget: Optional[SearchBudget] = None) -> bool:
+    """ Variante Best Improvement de _descent_critical_reassign. """
+    return _descent_critical_reassign(solution, backend, trail, budget, best_improvement=True)
+
+def _descent_critical_task_swap(solution: ALWABPSolution, backend: str = "python", trail: Optional[list] = None,
+                                budget: Optional[SearchBudget] = None) -> bool:
+    """
+    Trocas de tarefas em que uma delas sai de uma estação gargalo (First Improvement), com o
+    mesmo critério de desempate de _descent_critical_reassign. A factibilidade de cada troca
+    é decidida em O(1) pelas janelas, pelo fecho transitivo e pelas estações possíveis.
+    """
+    if not solution.is_feasible:
+        return False
+    inst = solution.instance
+    n = inst.num_tasks
+    times = inst.task_times
+    tsa = solution.task_station_assignment
+    wsa = solution.worker_station_assignment
+    loads = solution.station_loads
+    improved_any = False
+
+    if backend == "numpy":
+        while budget is None or not budget.exhausted():
+            if budget is not None:
+                budget.evaluations += sum(len(solution.station_tasks[s]) for s in solution.critical_stations()) * inst.num_workers
+            move = best_critical_reassign_move_np(solution, not best_improvement)
+            if move is None:
+                break
+            _apply_move(solution, ReassignMove(move[0], move[1]), trail)
+            improved_any = True
+        return improved_any
+
+    while budget is None or not budget.exhausted():
+        current = solution.cycle_time
+        critical = solution.critical_stations()
+        current_key = (current, len(critical))
+        earliest, latest = inst.station_bounds(current)
+        move = None
+        evaluations = 0
+        for s1 in critical:
+            times_1 = times[wsa[s1]]
+            for i1 in sorted(solution.station_tasks[s1]):
+                for i2 in range(n):
+                    s2 = tsa[i2]
+                    if s2 == s1 or not (earliest[i1] <= s2 <= latest[i1] and earliest[i2] <= s1 <= latest[i2]):
+                        continue
+                    evaluations += 1
+                    cycle_time = solution.evaluate_task_swap(i1, i2)
+                    if cycle_time >= INF:
+                        continue
+                    times_2 = times[wsa[s2]]
+                    key = _critical_key(cycle_time, len(critical), (loads[s1], loads[s2]),
+                                        (loads[s1] - times_1[i1] + times_1[i2], loads[s2] - times_2[i2] + times_2[i1]),
+                                        current)
+                    if key < current_key:
+                        move = (i1, i2)
+                        break
+                if move is not None:
+                    break
+            if move is not None:
+                break
+        if budget is not None:
+            budget.evaluations += evaluations
+        if move is None:
+            break
+        _apply_move(solution, TaskSwapMove(*move), trail)
+        improved_any = True
+    return improved_any
+
+def _descent_critical_worker_swap(solution: ALWABPSolution, backend: str = "python", trail: Optional[list] = None,
+                                  budget: Optional[SearchBudget] = None) -> bool:
+    """
+    Trocas de trabalhadores que envolvem uma estação gargalo (First Improvement),
+    com o mesmo critério de desempate de _descent_critical_reassign.
+    """
+    if not solution.is_feasible:
+        return False
+    m = solution.instance.num_workers
+    wsa = solution.worker_station_assignment
+    loads = solution.station_loads
+    improved_any = False
+
+    if backend == "numpy":
+        while budget is None or not budget.exhausted():
+            if budget is not None:
+                budget.evaluations += sum(len(solution.station_tasks[s]) for s in solution.critical_stations()) * inst.num_workers
+            move = best_critical_reassign_move_np(solution, not best_improvement)
+            if move is None:
+                break
+            _apply_move(solution, ReassignMove(move[0], move[1]), trail)
+            improved_any = True
+        return improved_any
+
+    while budget is None or not budget.exhausted():
+        current = solution.cycle_time
+        critical = solution.critical_stations()
+        current_key = (current, len(critical))
+        move = None
+        evaluations = 0
+        for s1 in critical:
+            for s2 in range(m):
+                if s2 == s1:
+                    continue
+                evaluations += 1
+                cycle_time = solution.evaluate_worker_swap(s1, s2)
+                if cycle_time >= INF:
+                    continue
+                key = _critical_key(cycle_time, len(critical), (loads[s1], loads[s2]),
+                                    (solution.worker_loads[s1][wsa[s2]], solution.worker_loads[s2][wsa[s1]]),
+                                    current)
+                if key < current_key:
+                    move = (s1, s2)
+                    break
+            if move is not None:
+                break
+        if budget is not None:
+            budget.evaluations += evaluations
+        if move is None:
+            break
+        _apply_move(solution, WorkerSwapMove(*move), trail)
+        improved_any = True
+    return improved_any
+
+def local_search_critical_reassign(solution: ALWABPSolution, backend: str = "python",
+                                   best_improvement: bool = False) -> ALWABPSolution:
+    """
+    Busca Local focada no gargalo: reatribui apenas tarefas das estações gargalo,
+    desempatando pelo número de estações com a carga máxima (First ou Best Improvement).
+    """
+    s_current = solution.copy()
+    _descent_critical_reassign(s_current, backend, best_improvement=best_improvement)
     return s_current
 
+# Vizinhanças disponíveis para o VND
+# (nome -> descida no lugar (solução, backend, trilha, budget), que retorna True se melhorou)
+VND_NEIGHBORHOODS = {
+    "reassign": _descent_task_reassignment,
+    "worker_swap": _descent_worker_swap,
+    "worker_assignment": _descent_worker_assignment,
+    "critical_reassign": _descent_critical_reassign,
+    "critical_reassign_best": _descent_critical_reassign_best,
+    "critical_task_swap": _descent_critical_task_swap,
+    "critical_worker_swap": _descent_critical_worker_swap,
+}
+# A alocação exata de trabalhadores domina a busca por trocas par a par
+DEFAULT_VND = ("critical_reassign", "worker_assignment")
+# Vizinhanças com avaliação vetorizada pelo backend "numpy"; as demais seguem avaliadas em Python
+NUMPY_NEIGHBORHOODS = ("reassign", "worker_swap", "critical_reassign", "critical_reassign_best")
+
+# --- Motor por permutação: sequência de tarefas + permutação de trabalhadores ---
+
+class SequenceSolution:
+    """
+    Solução do motor "sequence": uma sequência de tarefas que respeita as precedências e uma
+    permutação de trabalhadores (estação -> trabalhador). O decodificador carrega as estações
+    em ordem com as tarefas da sequência enquanto cabem no tempo de ciclo alvo (uma tarefa que
+    o trabalhador da estação não executa fecha a estação) e busca, por bissecção, o menor alvo
+    para o qual toda a sequência cabe nas m estações. Inserções e trocas que mantêm a sequência
+    topológica nunca violam precedências: a infactibilidade vem apenas de incapacidades.
+    """
+    __slots__ = ("instance", "sequence", "workers", "cycle_time", "is_feasible", "station_loads", "boundaries",
+                 "hash_key")
+
+    def __init__(self, instance: ALWABPInstance, sequence: List[int], workers: List[int]):
+        self.instance = instance
+        self.sequence = list(sequence)
+        self.workers = list(workers)
+        self.decode()
+
+    @classmethod
+    def from_solution(cls, solution: ALWABPSolution) -> 'SequenceSolution':
+        """ Codifica uma solução por atribuição: tarefas ordenadas por (estação, ordem topológica). """
+        inst = solution.instance
+        rank = [inst.num_tasks] * inst.num_tasks
+        for position, i in enumerate(_topological_order(inst)):
+            rank[i] = position
+        tsa = solution.task_station_assignment
+        if solution.is_feasible:
+            sequence = sorted(range(inst.num_tasks), key=lambda i: (tsa[i], rank[i]))
+        else:
+            sequence = sorted(range(inst.num_tasks), key=lambda i: rank[i])
+        return cls(inst, sequence, solution.worker_station_assignment)
+
+    def _pack(self, cycle_time: float, station: int = 0, base_boundaries: Optional[List[int]] = None,
+              base_loads: Optional[List[float]] = None, move=None) -> Tuple[List[int], List[float]]:
+        """
+        Carga gulosa das estações com o tempo de ciclo alvo: (início de cada estação na sequência,
+        seguido da posição em que a carga parou; carga de cada estação). Todas as tarefas foram
+        alocadas se a última posição for n. Com uma carga base (da sequência antes de `move`, no
+        mesmo tempo de ciclo), as estações anteriores a `station` são copiadas dela, e o restante
+        também, assim que a nova carga volta a coincidir com a base depois do trecho alterado.
+        """
+        task_times = self.instance.task_times
+        sequence = self.sequence
+        workers = self.workers
+        n = len(sequence)
+        limit = cycle_time + 1e-9 if cycle_time < INF else sys.float_info.max
+        boundaries = base_boundaries[:station + 1] if base_boundaries is not None else [0]
+        loads = base_loads[:station] if base_loads is not None else []
+        position = boundaries[station]
+        for s in range(station, len(workers)):
+            times = task_times[workers[s]]
+            load = 0.0
+            while position < n:
+                t = times[sequence[position]]
+                if load + t > limit:
+                    break
+                load += t
+                position += 1
+            boundaries.append(position)
+            loads.append(load)
+            if move is not None and position == base_boundaries[s + 1] and move.settled(s, position):
+                boundaries.extend(base_boundaries[s + 2:])
+                loads.extend(base_loads[s + 1:])
+                break
+        return boundaries, loads
+
+    def _load(self, cycle_time: float) -> Optional[Tuple[List[int], List[float]]]:
+        """ Carga gulosa com o tempo de ciclo alvo, ou None se sobrarem tarefas. """
+        packed = self._pack(cycle_time)
+        return packed if packed[0][-1] == len(self.sequence) else None
+
+    def _step(self, cycle_time: float) -> float:
+        """ Menor redução significativa do tempo de ciclo (1 com tempos inteiros). """
+        return 1.0 if self.instance.decoder_bounds()[1] else 1e-6 * cycle_time
+
+    def decode(self, hint: Optional[float] = None):
+        """
+        Decodifica a sequência: menor tempo de ciclo alvo em que a carga gulosa aloca todas as
+        tarefas. hint: tempo de ciclo provável (o da solução antes do movimento); a busca desce
+        dele em passos que dobram e termina por bissecção.
+        """
+        self.hash_key = hash((tuple(self.sequence), tuple(self.workers)))
+        loaded = self._load(hint) if hint is not None and hint < INF else None
+        if loaded is None:
+            loaded = self._load(INF)
+        if loaded is None:
+            m = self.instance.num_workers
+            self.cycle_time, self.is_feasible = INF, False
+            self.boundaries, self.station_loads = [0] * (m + 1), [INF] * m
+            return
+        lower, integral = self.instance.decoder_bounds()
+        high = max(loaded[1], default=0.0)
+        low = min(math.ceil(lower - 1e-9), high) if integral else min(lower, high)
+        gap = self._step(high)
+        while high - gap >= low:
+            attempt = self._load(high - gap)
+            if attempt is None:
+                low = max(low, high - gap + 1 if integral else high - gap)
+                break
+            loaded, high = attempt, max(attempt[1])
+            gap *= 2
+        while high - low > (0.5 if integral else 1e-6 * high):
+            middle = math.floor((low + high) / 2) if integral else (low + high) / 2
+            attempt = self._load(middle)
+            if attempt is None:
+                low = middle + 1 if integral else middle
+            else:
+                loaded, high = attempt, max(attempt[1])
+        self.boundaries, self.station_loads = loaded
+        self.cycle_time, self.is_feasible = high, True
+
+    def probe_base(self) -> tuple:
+        """
+        Chave (tempo de ciclo, nº de estações gargalo) da solução (factível) e suas cargas gulosas
+        em C - passo e em C, reaproveitadas por improves() ao testar os vizinhos.
+        """
+        cycle_time = self.cycle_time
+        below = cycle_time - self._step(cycle_time)
+        packed_at = self._pack(cycle_time)
+        # critical_prefix[s] = nº de estações gargalo entre as estações 0..s-1 da carga em C
+        critical_prefix = [0]
+        for load in packed_at[1]:
+            critical_prefix.append(critical_prefix[-1] + (load >= cycle_time - 1e-9))
+        return self.key(), below, self._pack(below), packed_at, critical_prefix
+
+    def improves(self, base: tuple, move) -> bool:
+        """
+        True se a sequência atual (a da base alterada por `move`) decodifica com chave menor que a
+        da base. Basta a carga gulosa em C - passo e em C, recomeçando na primeira estação afetada;
+        se as estações anteriores a ela já esgotam as m estações (em C - passo) ou já têm tantos
+        gargalos quanto a base (em C), o vizinho não melhora e a carga nem é refeita.
+        """
+        (cycle_time, count), below, packed_below, packed_at, critical_prefix = base
+        n = len(self.sequence)
+        m = len(self.workers)
+        station = move.resume_station(packed_below[0])
+        if station < m and self._pack(below, station, *packed_below, move)[0][-1] == n:
+            return True
+        station = move.resume_station(packed_at[0])
+        if critical_prefix[station] >= count:
+            return False
+        boundaries, loads = self._pack(cycle_time, station, *packed_at, move)
+        return boundaries[-1] == n and sum(load >= cycle_time - 1e-9 for load in loads) < count
+
+    def key(self) -> Tuple[float, int]:
+        """ (tempo de ciclo, nº de estações gargalo). """
+        return self.cycle_time, len(self.critical_stations())
+
+    def critical_stations(self) -> List[int]:
+        """ Estações com carga igual ao tempo de ciclo (vazio se a solução for infactível). """
+        if not self.is_feasible:
+            return []
+        return [s for s, load in enumerate(self.station_loads) if load >= self.cycle_time - 1e-9]
+
+    def positions(self) -> List[int]:
+        """ Posição de cada tarefa na sequência. """
+        position = [0] * len(self.sequence)
+        for p, i in enumerate(self.sequence):
+            position[i] = p
+        return position
+
+    def _snapshot(self) -> tuple:
+        return self.cycle_time, self.is_feasible, self.station_loads, self.boundaries, self.hash_key
+
+    def _restore(self, state: tuple):
+        self.cycle_time, self.is_feasible, self.station_loads, self.boundaries, self.hash_key = state
+
+    def to_solution(self) -> ALWABPSolution:
+        """ Solução por atribuição equivalente à decodificação (avaliada). """
+        inst = self.instance
+        tsa = [-1] * inst.num_tasks
+        if self.is_feasible:
+            for s in range(inst.num_workers):
+                for p in range(self.boundaries[s], self.boundaries[s + 1]):
+                    tsa[self.sequence[p]] = s
+        solution = ALWABPSolution(inst, tsa, self.workers)
+        solution.evaluate()
+        return solution
+
+    def copy(self) -> 'SequenceSolution':
+        new = SequenceSolution.__new__(SequenceSolution)
+        new.instance = self.instance
+        new.sequence = list(self.sequence)
+        new.workers = list(self.workers)
+        new._restore(self._snapshot())
+        return new
+
+    def __lt__(self, other: 'SequenceSolution') -> bool:
+        if self.is_feasible != other.is_feasible:
+            return self.is_feasible
+        return self.cycle_time < other.cycle_time
+
+class SequenceInsertionMove:
+    """ Retira a tarefa da posição `source` e a reinsere na posição `target` da sequência. """
+    __slots__ = ("source", "target", "state")
+
+    def __init__(self, source: int, target: int):
+        self.source = source
+        self.target = target
+        self.state = None
+
+    def resume_station(self, boundaries: List[int]) -> int:
+        """ Primeira estação cuja carga pode mudar: a que contém (ou termina na) primeira posição alterada. """
+        return bisect.bisect_left(boundaries, min(self.source, self.target), 1) - 1
+
+    def settled(self, station: int, position: int) -> bool:
+        """ True se a carga que parou em `position` já passou do trecho alterado da sequência. """
+        return position > max(self.source, self.target)
+
+    def permute(self, solution: SequenceSolution):
+        solution.sequence.insert(self.target, solution.sequence.pop(self.source))
+
+    def revert(self, solution: SequenceSolution):
+        solution.sequence.insert(self.source, solution.sequence.pop(self.target))
+
+    def apply(self, solution: SequenceSolution):
+        self.permute(solution)
+        self.state = solution._snapshot()
+        solution.decode(solution.cycle_time)
+
+    def undo(self, solution: SequenceSolution):
+        self.revert(solution)
+        solution._restore(self.state)
+
+class SequenceSwapMove(SequenceInsertionMove):
+    """ Troca as tarefas das posições `source` e `target` da sequência. """
+    __slots__ = ()
+
+    def permute(self, solution: SequenceSolution):
+        sequence = solution.sequence
+        sequence[self.source], sequence[self.target] = sequence[self.target], sequence[self.source]
+
+    revert = permute
+
+class SequenceWorkerSwapMove(SequenceInsertionMove):
+    """ Troca os trabalhadores das estações `source` e `target`. """
+    __slots__ = ()
+
+    def permute(self, solution: SequenceSolution):
+        workers = solution.workers
+        workers[self.source], workers[self.target] = workers[self.target], workers[self.source]
+
+    revert = permute
+
+    def resume_station(self, boundaries: List[int]) -> int:
+        return min(self.source, self.target)
+
+    def settled(self, station: int, position: int) -> bool:
+        return station >= max(self.source, self.target)
+
+def _insertion_range(solution: SequenceSolution, position: List[int], p: int) -> Tuple[int, int]:
+    """ Posições [lo, hi] (na sequência sem a tarefa) em que a tarefa da posição p pode ser reinserida. """
+    inst = solution.instance
+    i = solution.sequence[p]
+    lo = max((position[a] for a in inst.predecessors(i)), default=-1) + 1
+    hi = min((position[b] for b in inst.successors(i)), default=len(solution.sequence)) - 1
+    return lo, hi
+
+def _swap_feasible(solution: SequenceSolution, p: int, q: int) -> bool:
+    """ True se trocar as tarefas das posições p < q mantém a sequência topológica (fecho transitivo). """
+    sequence = solution.sequence
+    ancestors, descendants = solution.instance.closure()
+    a, b = sequence[p], sequence[q]
+    between = 0
+    for x in range(p + 1, q):
+        between |= 1 << sequence[x]
+    return not (descendants[a] & (between | (1 << b))) and not (ancestors[b] & between)
+
+def _try_sequence_move(solution: SequenceSolution, move, base: tuple, trail: Optional[list]) -> bool:
+    """ Aplica o movimento se ele melhora a chave (tempo de ciclo, nº de estações gargalo) da base; senão o desfaz. """
+    move.permute(solution)
+    if solution.improves(base, move):
+        move.state = solution._snapshot()
+        solution.decode(solution.cycle_time)
+        if trail is not None:
+            trail.append(move)
+        return True
+    move.revert(solution)
+    return False
+
+def _shake_sequence(solution: SequenceSolution, k: int, trail: Optional[list]):
+    """
+    Shaking do motor "sequence" (sempre sem violar precedências): k=1 troca duas tarefas da
+    sequência, k=2 reinsere uma tarefa numa posição aleatória da sua faixa, k=3 troca dois
+    trabalhadores; para k > 3, repete a reinserção.
+    """
+    n = len(solution.sequence)
+    m = solution.instance.num_workers
+    if k == 1:
+        if n >= 2:
+            for _ in range(SHAKE_ATTEMPTS):
+                p, q = sorted(random.sample(range(n), 2))
+                if _swap_feasible(solution, p, q):
+                    _apply_move(solution, SequenceSwapMove(p, q), trail)
+                    return
+        _shake_sequence(solution, 2, trail)
+    elif k == 3:
+        if m < 2: return
+        _apply_move(solution, SequenceWorkerSwapMove(*random.sample(range(m), 2)), trail)
+    else:
+        if n < 2: return
+        position = solution.positions()
+        for _ in range(SHAKE_ATTEMPTS):
+            p = random.randrange(n)
+            lo, hi = _insertion_range(solution, position, p)
+            targets = [t for t in range(lo, hi + 1) if t != p]
+            if targets:
+                _apply_move(solution, SequenceInsertionMove(p, random.choice(targets)), trail)
+                return
+
+def _descent_sequence_insertion(solution: SequenceSolution, backend: str = "python", trail: Optional[list] = None,
+                                budget: Optional[SearchBudget] = None) -> bool:
+    """
+    Reinserção (First Improvement) das tarefas das estações gargalo fora da própria estação,
+    aceita com o critério de _descent_critical_reassign. As posições testadas são as fronteiras
+    entre estações e os extremos da faixa de precedência da tarefa: no interior de um bloco, a
+    reinserção muda a carga gulosa como na fronteira, exceto pela tarefa que transborda.
+    """
+    if not solution.is_feasible:
+        return False
+    improved_any = False
+    while budget is None or not budget.exhausted():
+        base = solution.probe_base()
+        position = solution.positions()
+        improved = False
+        evaluations = 0
+        for s in solution.critical_stations():
+            start, end = solution.boundaries[s], solution.boundaries[s + 1]
+            for p in range(start, end):
+                lo, hi = _insertion_range(solution, position, p)
+                # Posições na sequência sem a tarefa, onde a estação s ocupa [start, end - 1]
+                targets = {b if b <= p else b - 1 for b in solution.boundaries}
+                targets.update((lo, hi))
+                for target in sorted(targets):
+                    if not lo <= target <= hi or start <= target <= end - 1:
+                        continue
+                    evaluations += 1
+                    if _try_sequence_move(solution, SequenceInsertionMove(p, target), base, trail):
+                        improved = True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+        if budget is not None:
+            budget.evaluations += evaluations
+        if not improved:
+            break
+        improved_any = True
+    return improved_any
+
+def _descent_sequence_swap(solution: SequenceSolution, backend: str = "python", trail: Optional[list] = None,
+                           budget: Optional[SearchBudget] = None) -> bool:
+    """ Trocas (First Improvement) entre uma tarefa de estação gargalo e uma tarefa de outra estação. """
+    if not solution.is_feasible:
+        return False
+    n = len(solution.sequence)
+    improved_any = False
+    while budget is None or not budget.exhausted():
+        base = solution.probe_base()
+        improved = False
+        evaluations = 0
+        for s in solution.critical_stations():
+            start, end = solution.boundaries[s], solution.boundaries[s + 1]
+            for p in range(start, end):
+                for q in range(n):
+                    if start <= q < end:
+                        continue
+                    first, second = min(p, q), max(p, q)
+                    if not _swap_feasible(solution, first, second):
+                        continue
+                    evaluations += 1
+                    if _try_sequence_move(solution, SequenceSwapMove(first, second), base, trail):
+                        improved = True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+        if budget is not None:
+            budget.evaluations += evaluations
+        if not improved:
+            break
+        improved_any = True
+    return improved_any
+
+def _descent_sequence_worker_swap(solution: SequenceSolution, backend: str = "python", trail: Optional[list] = None,
+                                  budget: Optional[SearchBudget] = None) -> bool:
+    """ Trocas de trabalhadores (First Improvement) que envolvem uma estação gargalo. """
+    if not solution.is_feasible:
+        return False
+    m = solution.instance.num_workers
+    improved_any = False
+    while budget is None or not budget.exhausted():
+        base = solution.probe_base()
+        improved = False
+        evaluations = 0
+        for s1 in solution.critical_stations():
+            for s2 in range(m):
+                if s2 == s1:
+                    continue
+                evaluations += 1
+                if _try_sequence_move(solution, SequenceWorkerSwapMove(s1, s2), base, trail):
+                    improved = True
+                    break
+            if improved:
+                break
+        if budget is not None:
+            budget.evaluations += evaluations
+        if not improved:
+            break
+        improved_any = True
+    return improved_any
+
+# Vizinhanças do VND do motor "sequence"
+SEQUENCE_NEIGHBORHOODS = {
+    "sequence_insertion": _descent_sequence_insertion,
+    "sequence_swap": _descent_sequence_swap,
+    "sequence_worker_swap": _descent_sequence_worker_swap,
+}
+DEFAULT_SEQUENCE_VND = ("sequence_insertion", "sequence_worker_swap")
+
+
+# --- VNS multi-start paralelo e cooperativo ---
+
+# Instância usada pelos processos do pool de parallel_vns (definida pelo initializer)
+_POOL_INSTANCE: Optional[ALWABPInstance] = None
+
+def _init_pool_instance(instance: ALWABPInstance):
+    global _POOL_INSTANCE
+    _POOL_INSTANCE = instance
+
+def _run_trajectory_epoch(seed: int, start: Optional[Tuple[List[int], List[int]]], max_iter: Optional[int], k_max: int,
+                          backend: str, time_limit: Optional[float], max_evaluations: Optional[int],
+                          shaking_mode: str, cache_size: int, lower_bound: Optional[float],
+                          collect_stats: bool, neighborhoods: Optional[Tuple[str, ...]],
+                          engine: str = "assignment") -> Dict[str, Any]:
+    """ Executa uma época de uma trajetória VNS num processo do pool, a partir de `start` (ou do zero). """
+    instance = _POOL_INSTANCE
+    random.seed(seed)
+    initial = None
+    if start is not None:
+        initial = ALWABPSolution(instance, start[0], start[1])
+        initial.evaluate()
+    budget = SearchBudget(time_limit, max_evaluations)
+    cache = EvaluationCache(cache_size) if cache_size > 0 else None
+    stats = SearchStats() if collect_stats else None
+    s_initial, s_best = vns(instance, max_iter, k_max, backend, budget, initial, shaking_mode, cache, lower_bound,
+                            stats, neighborhoods, engine)
+    return {
+        "initial": (list(s_initial.task_station_assignment), list(s_initial.worker_station_assignment)),
+        "initial_cycle_time": s_initial.cycle_time,
+        "best": (list(s_best.task_station_assignment), list(s_best.worker_station_assignment)),
+        "best_cycle_time": s_best.cycle_time,
+        "evaluations": budget.evaluations,
+        "cache": cache.stats() if cache is not None else None,
+        "stats": stats.to_dict() if stats is not None else None,
+    }
+
+def parallel_vns(instance: ALWABPInstance, num_trajectories: int, seed: int, max_iter: Optional[int], k_max: int,
+                 backend: str = "python", budget: Optional[SearchBudget] = None,
+                 epochs: int = 5, shaking_mode: str = "feasible", cache_size: int = CACHE_SIZE,
+                 cache_stats: Optional[List[Dict[str, Any]]] = None,
+                 lower_bound: Optional[float] = None,
+                 initial: Optional[ALWABPSolution] = None,
+                 stats: Optional[SearchStats] = None,
+                 neighborhoods: Optional[Tuple[str, ...]] = None,
+                 engine: str = "assignment") -> Tuple[ALWABPSolution, ALWABPSolution]:
+    """
+    VNS multi-start cooperativo para uma única instância: `num_trajectories` trajetórias
+    rodam em paralelo num pool de processos, em `epochs` épocas. Ao fim de cada época a
+    melhor solução global é compartilhada: as trajetórias que não a detêm reiniciam a
+    partir dela (com sementes diferentes), a que a detém continua de onde parou.
+    max_iter e os limites do budget são repartidos igualmente entre as épocas.
+    Cada trajetória usa, em cada época, um cache de até `cache_size` soluções; se
+    `cache_stats` for dada, as estatísticas de cada cache são acrescentadas a ela.
+    Com `lower_bound`, as épocas param assim que a melhor solução global o atinge.
+    Com `initial`, todas as trajetórias partem dessa solução (senão, da heurística gulosa); se o
+    orçamento já estiver esgotado antes da primeira época, essa solução é retornada sem busca.
+    Com `stats`, os contadores de todas as trajetórias e épocas são somados nela.
+    engine: motor de busca de cada trajetória (ver vns).
+    Retorna (melhor solução inicial entre as trajetórias, melhor solução global).
+    """
+    if budget is None:
+        budget = SearchBudget()
+    if max_iter is None and budget.time_limit is None and budget.max_evaluations is None:
+        raise ValueError("Sem limite de iterações é preciso definir um limite de tempo ou de avaliações.")
+    if num_trajectories < 1 or epochs < 1:
+        raise ValueError("São necessárias ao menos uma trajetória e uma época.")
+    seeds = random.Random(seed)
+
+    s_initial: Optional[ALWABPSolution] = None
+    s_best: Optional[ALWABPSolution] = None
+    starts: List[Optional[Tuple[List[int], List[int]]]] = [None] * num_trajectories
+    if initial is not None:
+        starts = [(list(initial.task_station_assignment), list(initial.worker_station_assignment))] * num_trajectories
+
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=num_trajectories, mp_context=context,
+                             initializer=_init_pool_instance, initargs=(instance,)) as executor:
+        for epoch in range(epochs):
+            if budget.exhausted() or (lower_bound is not None and s_best is not None and s_best.is_feasible
+                                      and s_best.cycle_time <= lower_bound):
+                break
+            epochs_left = epochs - epoch
+            epoch_iter = None if max_iter is None else max(1, -(-max_iter // epochs))
+            epoch_time = None
+            if budget.time_limit is not None:
+                epoch_time = max(0.0, budget.time_limit - budget.elapsed()) / epochs_left
+            epoch_evaluations = None
+            if budget.max_evaluations is not None:
+                remaining = budget.max_evaluations - budget.evaluations
+                epoch_evaluations = max(1, remaining // (epochs_left * num_trajectories))
+
+            futures = [executor.submit(_run_trajectory_epoch, seeds.randrange(2 ** 31), starts[t], epoch_iter, k_max,
+                                       backend, epoch_time, epoch_evaluations, shaking_mode, cache_size,
+                                       lower_bound, stats is not None, neighborhoods, engine)
+                       for t in range(num_trajectories)]
+            results = [future.result() for future in futures]
+
+            for result in results:
+                budget.evaluations += result["evaluations"]
+                if cache_stats is not None and result["cache"] is not None:
+                    cache_stats.append(result["cache"])
+                if stats is not None:
+                    stats.merge(result["stats"])
+                if epoch == 0 and (s_initial is None or result["initial_cycle_time"] < s_initial.cycle_time):
+                    s_initial = ALWABPSolution(instance, *result["initial"])
+                    s_initial.evaluate()
+                    if s_best is None:
+                        s_best = s_initial
+                        budget.record(s_best.cycle_time)
+
+            # Migração: a melhor solução da época passa a ser o ponto de partida das demais trajetórias
+            leader = min(range(num_trajectories), key=lambda t: results[t]["best_cycle_time"])
+            if results[leader]["best_cycle_time"] < s_best.cycle_time:
+                s_best = ALWABPSolution(instance, *results[leader]["best"])
+                s_best.evaluate()
+                budget.record(s_best.cycle_time)
+            elite = (list(s_best.task_station_assignment), list(s_best.worker_station_assignment))
+            for t in range(num_trajectories):
+                starts[t] = results[t]["best"] if t == leader else elite
+
+    if s_initial is None:
+        # Orçamento esgotado antes da primeira época: retorna a solução de partida
+        s_initial = initial.copy() if initial is not None else generate_initial_solution(instance)
+        s_best = s_initial
+        budget.evaluations += 1
+        budget.record(s_best.cycle_time)
+    return s_initial, s_best
+
+# --- Execução e Saída ---
+
+def run_vns(instance: ALWABPInstance, seed: int = DEFAULT_SEED, max_iter: Optional[int] = MAX_ITER, k_max: int = K_MAX,
+            backend: str = "python", time_limit: Optional[float] = None,
+            max_evaluations: Optional[int] = None, jobs: int = 1, epochs: int = 5,
+            shaking_mode: str = "feasible", cache_size: int = CACHE_SIZE,
+            lower_bound: Optional[float] = None, construction: str = "station",
+            collect_stats: bool = False, profile: bool = False,
+            neighborhoods: Optional[Tuple[str, ...]] = None, engine: str = "assignment") -> Dict[str, Any]:
+    """
+    Executa uma replicação do VNS com a semente dada e retorna um resultado estruturado:
+    SI (tempo de ciclo inicial), SF (tempo de ciclo final), tempo computacional, número
+    de avaliações, traço de convergência, estatísticas do cache (None se cache_size = 0)
+    e as soluções.
+    Com jobs > 1, usa o VNS multi-start paralelo (parallel_vns) com `epochs` épocas.
+    Com lower_bound, a busca para ao atingir o limitante ("optimal" indica se foi atingido).
+    construction: solução inicial "station" (orientada a estações) ou "greedy" (gulosa original);
+    com time_limit, a construção usa no máximo CONSTRUCTION_TIME_SHARE do limite.
+    collect_stats: inclui em "stats" os contadores da busca (SearchStats) e o tempo da construção;
+    profile: executa sob o cProfile e inclui em "stats" as funções mais custosas (implica collect_stats).
+    neighborhoods: sequência de vizinhanças do VND (padrão: DEFAULT_VND, ou DEFAULT_SEQUENCE_VND no motor "sequence").
+    engine: "assignment" ou "sequence" (ver vns); a saída tem o mesmo formato nos dois.
+    """
+    collect_stats = collect_stats or profile
+    stats = SearchStats() if collect_stats else None
+    profiler = cProfile.Profile() if profile else None
+    if profiler is not None:
+        profiler.enable()
+    random.seed(seed)
+    start_time = time.time()
+    budget = SearchBudget(time_limit, max_evaluations)
+    # A construção tem orçamento próprio (uma fração do limite de tempo, sem contar avaliações)
+    # para não consumir o tempo da busca
+    construction_budget = SearchBudget(time_limit * CONSTRUCTION_TIME_SHARE if time_limit is not None else None)
+    initial = build_initial_solution(instance, construction, construction_budget) if construction != "greedy" else None
+    construction_time = time.time() - start_time
+    cache_stats = None
+    if jobs > 1:
+        trajectory_stats: List[Dict[str, Any]] = []
+        initial_solution, best_solution = parallel_vns(instance, jobs, seed, max_iter, k_max, backend, budget, epochs,
+                                                       shaking_mode, cache_size, trajectory_stats, lower_bound,
+                                                       initial, stats, neighborhoods, engine)
+        if cache_size > 0:
+            cache_stats = merge_cache_stats(trajectory_stats)
+    else:
+        cache = EvaluationCache(cache_size) if cache_size > 0 else None
+        initial_solution, best_solution = vns(instance, max_iter, k_max, backend, budget, initial, shaking_mode,
+                                              cache, lower_bound, stats, neighborhoods, engine)
+        if cache is not None:
+            cache_stats = cache.stats()
+    computational_time = time.time() - start_time
+    if profiler is not None:
+        profiler.disable()
+
+    search_stats = None
+    if stats is not None:
+        search_stats = stats.to_dict()
+        search_stats.update(engine=engine, construction=construction, construction_time_s=construction_time,
+                            evaluations=budget.evaluations, time_s=computational_time, cache=cache_stats)
+        if profiler is not None:
+            search_stats["profile"] = profile_summary(profiler)
+
+    return {
+        "si": initial_solution.cycle_time if initial_solution.is_feasible else INF,
+        "sf": best_solution.cycle_time if best_solution.is_feasible else INF,
+        "time_s": computational_time,
+        "evaluations": budget.evaluations,
+        "trace": budget.trace,
+        "cache": cache_stats,
+        "stats": search_stats,
+        "profiler": profiler,
+        "lower_bound": lower_bound,
+        "optimal": lower_bound is not None and best_solution.is_feasible and best_solution.cycle_time <= lower_bound,
+        "initial_solution": initial_solution,
+        "best_solution": best_solution,
+    }
+
+def summary_line(result: Dict[str, Any]) -> str:
+    """ Linha de resumo no formato usado pelos scripts de automação: SI;SF;TempoComputacional """
+    return f"{result['si']};{result['sf']};{result['time_s']:.4f}"
+
+def write_solution(output_filename: str, solution: ALWABPSolution):
+    """ Grava a solução (completa) no arquivo especificado. """
+    with open(output_filename, "w") as f:
+        f.write(solution.to_output_format())
 
 # --- Função Principal ---
 
 def main():
+    parser = argparse.ArgumentParser(description="VNS para o ALWABP. A instância é lida da entrada padrão ou de --instance.")
     # O primeiro argumento da linha de comando é o nome do arquivo para gravar a melhor solução
-    if len(sys.argv) < 2:
-        output_filename = "best_solution.txt"
-    else:
-        output_filename = sys.argv[1]
+    parser.add_argument("output_filename", nargs="?", default="best_solution.txt",
+                        help="arquivo para gravar a melhor solução")
+    parser.add_argument("seed", nargs="?", default=None, help=f"semente aleatória (padrão: {DEFAULT_SEED})")
+    parser.add_argument("--backend", choices=BACKENDS, default="python",
+                        help="avaliação das vizinhanças da busca local (numpy requer o pacote numpy e só vale "
+                             f"para as vizinhanças {', '.join(NUMPY_NEIGHBORHOODS)} do --vnd)")
+    parser.add_argument("--instance", default=None, help="arquivo da instância (em vez da entrada padrão)")
+    parser.add_argument("--max-iter", type=int, default=MAX_ITER,
+                        help=f"número máximo de iterações do VNS, 0 = sem limite (padrão: {MAX_ITER})")
+    parser.add_argument("--k-max", type=int, default=K_MAX, help=f"número de vizinhanças do shaking (padrão: {K_MAX})")
+    parser.add_argument("--time-limit", type=float, default=None, help="limite de tempo de relógio em segundos")
+    parser.add_argument("--max-evaluations", type=int, default=None, help="limite de avaliações de vizinhos")
+    parser.add_argument("--shaking", choices=SHAKING_MODES, default="feasible",
+                        help="feasible: apenas perturbações factíveis; random: perturbação original (padrão: feasible)")
+    parser.add_argument("--engine", choices=ENGINES, default="assignment",
+                        help="motor de busca: assignment (tarefa -> estação) ou sequence (sequência de tarefas + "
+                             "permutação de trabalhadores, com decodificador guloso) (padrão: assignment)")
+    parser.add_argument("--vnd", default=None,
+                        help=f"vizinhanças do VND em ordem, separadas por vírgula, entre {', '.join(VND_NEIGHBORHOODS)} "
+                             f"(padrão: {','.join(DEFAULT_VND)}) ou, com --engine sequence, entre "
+                             f"{', '.join(SEQUENCE_NEIGHBORHOODS)} (padrão: {','.join(DEFAULT_SEQUENCE_VND)})")
+    parser.add_argument("--initial", choices=CONSTRUCTIONS, default="station",
+                        help="solução inicial: station (orientada a estações, com busca binária do tempo de ciclo) "
+                             "ou greedy (gulosa original) (padrão: station)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="número de trajetórias VNS paralelas e cooperativas para esta instância (padrão: 1)")
+    parser.add_argument("--epochs", type=int, default=5,
+                        help="épocas de compartilhamento da melhor solução com --jobs > 1 (padrão: 5)")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE,
+                        help=f"máximo de soluções no cache de avaliações, 0 desativa (padrão: {CACHE_SIZE})")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="imprime na saída de erro os acertos, falhas e memória do cache")
+    parser.add_argument("--lower-bound", type=float, default=None,
+                        help="limitante inferior conhecido de C_max (padrão: calculado da instância e de "
+                             f"{alwabp_bounds.INSTANCES_CSV}, quando --instance é usado)")
+    parser.add_argument("--no-early-stop", action="store_true",
+                        help="executa todas as iterações mesmo ao atingir o limitante inferior")
+    parser.add_argument("--stats", action="store_true",
+                        help="grava contadores de avaliações, movimentos e tempo por vizinhança em <saída>.stats.json")
+    parser.add_argument("--profile", action="store_true",
+                        help="executa sob o cProfile: inclui as funções mais custosas no JSON de --stats "
+                             "e grava o perfil completo em <saída>.prof (implica --stats)")
+    parser.add_argument("--trace", default=None,
+                        help="arquivo CSV para gravar o traço de convergência (tempo, avaliações, melhor C_max)")
+    args = parser.parse_args()
+    output_filename = args.output_filename
+
+    if args.backend == "numpy" and np is None:
+        print("Erro: o backend 'numpy' requer o pacote numpy instalado.", file=sys.stderr)
+        sys.exit(1)
+    registry, default_vnd = ((SEQUENCE_NEIGHBORHOODS, DEFAULT_SEQUENCE_VND) if args.engine == "sequence"
+                             else (VND_NEIGHBORHOODS, DEFAULT_VND))
+    vnd_names = args.vnd if args.vnd is not None else ",".join(default_vnd)
+    neighborhoods = tuple(name.strip() for name in vnd_names.split(",") if name.strip())
+    unknown = [name for name in neighborhoods if name not in registry]
+    if unknown or not neighborhoods:
+        print(f"Erro: vizinhanças do VND inválidas: {vnd_names}", file=sys.stderr)
+        sys.exit(1)
+    max_iter = args.max_iter if args.max_iter > 0 else None
+    if max_iter is None and args.time_limit is None and args.max_evaluations is None:
+        print("Erro: --max-iter 0 exige --time-limit ou --max-evaluations.", file=sys.stderr)
+        sys.exit(1)
         
     # 1. Leitura da Instância
-    # A entrada é redirecionada para o stdin pelo usuário
-    instance = ALWABPInstance.from_stdin()
-    
-    # 2. Parâmetros do VNS
-    # Parâmetros podem ser lidos da linha de comando em uma versão mais completa
-    # Por enquanto, usamos valores fixos.
-    MAX_ITER = 50 # Número máximo de iterações do VNS
-    K_MAX = 3 # Número máximo de vizinhanças para o Shaking
+    # A entrada é redirecionada para o stdin pelo usuário, ou lida do arquivo indicado
+    if args.instance is None:
+        instance = ALWABPInstance.from_stdin()
+    else:
+        try:
+            instance = ALWABPInstance.from_path(args.instance)
+        except (OSError, ValueError) as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
     
-    # 3. Execução do VNS
+    # 2. Semente aleatória
     # O segundo argumento (opcional) é a semente aleatória.
-    if len(sys.argv) > 2:
+    seed_value = DEFAULT_SEED # Semente padrão
+    if args.seed is not None:
         try:
-            seed_value = int(sys.argv[2])
-            random.seed(seed_value)
+            seed_value = int(args.seed)
         except ValueError:
             print("Aviso: Semente aleatória inválida. Usando semente padrão.", file=sys.stderr)
-            random.seed(42) # Semente padrão
-    else:
-        random.seed(42) # Semente padrão
-        
-    start_time = time.time()
     
-    # 3. Execução do VNS
-    initial_solution, best_solution = vns(instance, MAX_ITER, K_MAX)
-    
-    end_time = time.time()
-    computational_time = end_time - start_time
+    # 3. Limitante inferior para a parada antecipada no ótimo provado
+    lower_bound = None
+    if not args.no_early_stop:
+        known_lb = args.lower_bound
+        if known_lb is None and args.instance is not None:
+            known = alwabp_bounds.known_bounds(args.instance)
+            known_lb = known[0] if known is not None else None
+        lower_bound = alwabp_bounds.lower_bound(instance, known_lb)
+
+    # 4. Execução do VNS
+    result = run_vns(instance, seed_value, max_iter, args.k_max, args.backend, args.time_limit, args.max_evaluations,
+                     args.jobs, args.epochs, args.shaking, args.cache_size, lower_bound, args.initial,
+                     args.stats, args.profile, neighborhoods, args.engine)
     
-    # 4. Saída
-    # 4. Saída
-    # Imprimir a melhor solução encontrada na saída padrão (stdout)
+    # 5. Saída
+    # Imprimir a linha de resumo na saída padrão (stdout)
     # O formato de saída para o script de automação será:
     # SI;SF;TempoComputacional
-    
-    si_value = initial_solution.cycle_time if initial_solution.is_feasible else INF
-    sf_value = best_solution.cycle_time if best_solution.is_feasible else INF
-    
-    print(f"{si_value};{sf_value};{computational_time:.4f}")
+    print(summary_line(result))
+    if args.cache_stats and result["cache"] is not None:
+        print(cache_summary(result["cache"]), file=sys.stderr)
     
     # Gravar a melhor solução (completa) no arquivo especificado
     try:
-        with open(output_filename, "w") as f:
-            f.write(best_solution.to_output_format())
+        write_solution(output_filename, result["best_solution"])
     except Exception as e:
         print(f"Erro ao gravar a solução no arquivo {output_filename}: {e}", file=sys.stderr)
 
+    if args.trace is not None:
+        try:
+            write_trace(args.trace, result["trace"])
+        except Exception as e:
+            print(f"Erro ao gravar o traço no arquivo {args.trace}: {e}", file=sys.stderr)
+
+    if result["stats"] is not None:
+        try:
+            write_stats(stats_filename(output_filename), result["stats"])
+            if result["profiler"] is not None:
+                result["profiler"].dump_stats(os.path.splitext(output_filename)[0] + ".prof")
+        except Exception as e:
+            print(f"Erro ao gravar as estatísticas de {output_filename}: {e}", file=sys.stderr)
+
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,117 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from typing import List, Dict, Any, Tuple
+
+import alwabp_vns
+import alwabp_bounds
+import gerar_instancias
+"""
+
+    benchmark de escalabilidade do VNS
+
+    Gera instâncias sintéticas de tamanho crescente (gerar_instancias.py) e mede,
+    para cada tamanho (n tarefas, k trabalhadores, |P| precedências):
+      - tempo de leitura do arquivo e da construção da solução inicial;
+      - tempo total, avaliações por segundo (excluída a construção) e tempo de ciclo
+        de uma replicação do VNS com orçamento fixo de avaliações;
+      - memória da instância e pico de memória da replicação (tracemalloc, numa
+        segunda execução idêntica, para não distorcer os tempos).
+
+"""
+# Configurações
+SIZES = [(100, 10), (250, 25), (500, 50), (1000, 100), (2000, 200)]
+MAX_EVALUATIONS = 20000 # Orçamento de avaliações por replicação
+SEED = 42
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """ 'NxK' -> (n, k). """
+    try:
+        n, k = text.lower().split("x")
+        return int(n), int(k)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tamanho inválido: {text} (use NxK, ex.: 1000x100)")
+
+def _run(instance: alwabp_vns.ALWABPInstance, params: Dict[str, Any]) -> Dict[str, Any]:
+    return alwabp_vns.run_vns(instance, params["seed"], params["max_iter"] or None,
+                              max_evaluations=params["max_evaluations"], time_limit=params["time_limit"],
+                              lower_bound=alwabp_bounds.lower_bound(instance), collect_stats=True)
+
+def run_scaling_case(n: int, k: int, params: Dict[str, Any], memory: bool = True) -> Dict[str, Any]:
+    """ Mede leitura, construção, busca e memória para uma instância gerada com n tarefas e k trabalhadores. """
+    instance = gerar_instancias.generate_instance(n, k, params["arcs"], seed=params["seed"])
+    data = gerar_instancias.format_instance(instance).encode()
+
+    start_time = time.perf_counter()
+    instance = alwabp_vns.ALWABPInstance.from_bytes(data)
+    parse_time = time.perf_counter() - start_time
+
+    result = _run(instance, params)
+    search_time = result["time_s"] - result["stats"]["construction_time_s"]
+    row = {
+        "n": n, "k": k, "arcs": len(instance.precedences), "file_bytes": len(data),
+        "parse_s": parse_time, "construction_s": result["stats"]["construction_time_s"],
+        "time_s": result["time_s"], "evaluations": result["evaluations"],
+        "evaluations_per_s": result["evaluations"] / search_time if search_time > 0 else 0.0,
+        "si": result["si"], "sf": result["sf"], "lower_bound": result["lower_bound"],
+        "instance_bytes": None, "peak_bytes": None,
+    }
+    if memory:
+        tracemalloc.start()
+        instance = alwabp_vns.ALWABPInstance.from_bytes(data)
+        row["instance_bytes"] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        _run(instance, params)
+        row["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return row
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+    """ Tabela dos resultados por tamanho. """
+    def mib(value):
+        return "-" if value is None else f"{value / 2 ** 20:.2f}"
+
+    lines = [f"{'n':>6} {'k':>5} {'|P|':>7} {'Parse_s':>8} {'Constr_s':>8} {'Time_s':>8} {'Evals/s':>9} "
+             f"{'SI':>8} {'SF':>8} {'LB':>8} {'Inst_MiB':>8} {'Peak_MiB':>8}"]
+    for row in rows:
+        lines.append(f"{row['n']:>6} {row['k']:>5} {row['arcs']:>7} {row['parse_s']:>8.3f} "
+                     f"{row['construction_s']:>8.3f} {row['time_s']:>8.2f} {row['evaluations_per_s']:>9.0f} "
+                     f"{row['si']:>8g} {row['sf']:>8g} {row['lower_bound']:>8g} "
+                     f"{mib(row['instance_bytes']):>8} {mib(row['peak_bytes']):>8}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo e memória do VNS em função de n, k e |P|.")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=SIZES,
+                        help="tamanhos NxK (padrão: " + " ".join(f"{n}x{k}" for n, k in SIZES) + ")")
+    parser.add_argument("--arcs", type=float, nargs="+", default=[gerar_instancias.ARCS],
+                        help="predecessores diretos por tarefa; com vários valores, varia |P| para cada tamanho")
+    parser.add_argument("--max-evaluations", type=int, default=MAX_EVALUATIONS,
+                        help=f"orçamento de avaliações por replicação (padrão: {MAX_EVALUATIONS})")
+    parser.add_argument("--max-iter", type=int, default=0, help="iterações do VNS (padrão: 0 = sem limite)")
+    parser.add_argument("--time-limit", type=float, default=None, help="limite de tempo por replicação (s)")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"semente da instância e do VNS (padrão: {SEED})")
+    parser.add_argument("--no-memory", action="store_true", help="não executa a medição de memória (tracemalloc)")
+    parser.add_argument("--output", default=None, help="arquivo JSON com os resultados")
+    args = parser.parse_args()
+    if args.max_iter == 0 and args.time_limit is None and args.max_evaluations is None:
+        parser.error("--max-iter 0 exige --time-limit ou --max-evaluations")
+
+    rows = []
+    for n, k in args.sizes:
+        for arcs in args.arcs:
+            params = {"arcs": arcs, "seed": args.seed, "max_iter": args.max_iter, "time_limit": args.time_limit,
+                      "max_evaluations": args.max_evaluations}
+            rows.append(run_scaling_case(n, k, params, memory=not args.no_memory))
+            print(format_rows(rows[-1:]).splitlines()[-1], file=sys.stderr, flush=True)
+    print(format_rows(rows))
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"environment": {"python": platform.python_version(), "platform": platform.platform()},
+                       "params": {"max_evaluations": args.max_evaluations, "max_iter": args.max_iter,
+                                  "time_limit": args.time_limit, "seed": args.seed},
+                       "rows": rows}, f, indent=2)
@@ -0,0 +1,211 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+import alwabp_vns
+import alwabp_bounds
+import instance_cache
+"""
+
+    benchmark reprodutível do VNS
+
+    Executa grupos de instâncias (famílias de instances.csv: heskia, roszieg, tonge,
+    wee-mag) com sementes fixas e reporta, por família, o tempo de execução, as
+    avaliações por segundo e o gap para o LB/UB conhecidos. Os resultados podem ser
+    gravados como linha de base e comparados com ela para sinalizar regressões de
+    qualidade (gap) ou de velocidade (avaliações por segundo).
+
+"""
+# Configurações
+INSTANCES_DIR = "alwabp"
+SEEDS = [42, 101, 202]
+FAMILIES = list(alwabp_bounds.FAMILIES.values())
+GAP_TOLERANCE = 0.5 # Aumento máximo do gap médio para o UB, em pontos percentuais
+SPEED_TOLERANCE = 0.10 # Queda relativa máxima de avaliações por segundo
+
+def select_instances(instances: Dict[str, Any], known: Dict[Any, Any], families: List[str],
+                     sample: int) -> List[str]:
+    """ Instâncias das famílias pedidas que têm LB/UB conhecidos; com sample > 1, uma a cada `sample` por família. """
+    selected = []
+    for family in families:
+        names = sorted((name for name, instance in instances.items()
+                        if isinstance(instance, alwabp_vns.ALWABPInstance)
+                        and alwabp_bounds.instance_key(name) in known
+                        and alwabp_bounds.instance_key(name)[0] == family),
+                       key=lambda name: alwabp_bounds.instance_key(name)[1])
+        selected.extend(names[::max(1, sample)])
+    return selected
+
+# Instâncias e limitantes usados pelos processos do pool (herdados via fork ou enviados pelo initializer)
+_INSTANCES: Dict[str, Any] = {}
+_KNOWN: Dict[Any, Any] = {}
+
+def _init_worker(instances, known):
+    global _INSTANCES, _KNOWN
+    _INSTANCES, _KNOWN = instances, known
+
+def run_benchmark_case(name: str, seed: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    """ Uma replicação do benchmark: resultado do VNS e gaps para o LB/UB conhecidos. """
+    instance = _INSTANCES[name]
+    family, num = alwabp_bounds.instance_key(name)
+    lb, ub = _KNOWN[(family, num)]
+    lower_bound = alwabp_bounds.lower_bound(instance, lb) if params["early_stop"] else None
+    result = alwabp_vns.run_vns(instance, seed, params["max_iter"] or None, time_limit=params["time_limit"],
+                                max_evaluations=params["max_evaluations"], lower_bound=lower_bound)
+    sf = result["sf"]
+    return {
+        "instance": name, "family": family, "num": num, "seed": seed,
+        "lb": lb, "ub": ub, "si": result["si"], "sf": sf,
+        "time_s": result["time_s"], "evaluations": result["evaluations"],
+        "gap_lb": 100.0 * (sf - lb) / lb if sf < alwabp_vns.INF else None,
+        "gap_ub": 100.0 * (sf - ub) / ub if sf < alwabp_vns.INF else None,
+    }
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """ Resumo por família (e "all"): gaps médios, ótimos atingidos, tempo e avaliações por segundo. """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for run in runs:
+        groups.setdefault(run["family"], []).append(run)
+    groups["all"] = runs
+
+    summary = {}
+    for family, group in groups.items():
+        feasible = [run for run in group if run["gap_lb"] is not None]
+        total_time = sum(run["time_s"] for run in group)
+        total_evaluations = sum(run["evaluations"] for run in group)
+        summary[family] = {
+            "instances": len({run["instance"] for run in group}),
+            "runs": len(group),
+            "infeasible": len(group) - len(feasible),
+            "gap_lb": _mean([run["gap_lb"] for run in feasible]),
+            "gap_ub": _mean([run["gap_ub"] for run in feasible]),
+            "hits_lb": sum(run["sf"] <= run["lb"] for run in feasible),
+            "time_s": total_time,
+            "mean_time_s": total_time / len(group) if group else 0.0,
+            "evaluations_per_s": total_evaluations / total_time if total_time > 0 else 0.0,
+        }
+    return summary
+
+def compare_with_baseline(summary: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                          gap_tolerance: float, speed_tolerance: float) -> List[str]:
+    """ Regressões em relação à linha de base: gap médio para o UB ou avaliações/s piores que a tolerância. """
+    regressions = []
+    for family, current in summary.items():
+        reference = baseline.get(family)
+        if reference is None:
+            continue
+        if current["infeasible"] > reference["infeasible"]:
+            regressions.append(f"{family}: {current['infeasible']} execuções infactíveis (base: {reference['infeasible']})")
+        if current["gap_ub"] is not None and reference["gap_ub"] is not None \
+                and current["gap_ub"] > reference["gap_ub"] + gap_tolerance:
+            regressions.append(f"{family}: gap UB {current['gap_ub']:.2f}% (base: {reference['gap_ub']:.2f}%)")
+        if reference["evaluations_per_s"] > 0 \
+                and current["evaluations_per_s"] < (1 - speed_tolerance) * reference["evaluations_per_s"]:
+            regressions.append(f"{family}: {current['evaluations_per_s']:.0f} avaliações/s "
+                               f"(base: {reference['evaluations_per_s']:.0f})")
+    return regressions
+
+def format_summary(summary: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """ Tabela do resumo por família (com a linha de base entre parênteses, se houver). """
+    def fmt(value, spec):
+        return "-" if value is None else format(value, spec)
+
+    lines = [f"{'Family':<9} {'Inst':>4} {'Runs':>4} {'Inf':>3} {'GapLB%':>8} {'GapUB%':>8} {'HitLB':>5} "
+             f"{'Time_s':>8} {'Evals/s':>9}"]
+    for family, row in summary.items():
+        line = (f"{family:<9} {row['instances']:>4} {row['runs']:>4} {row['infeasible']:>3} "
+                f"{fmt(row['gap_lb'], '8.2f')} {fmt(row['gap_ub'], '8.2f')} {row['hits_lb']:>5} "
+                f"{row['time_s']:>8.2f} {row['evaluations_per_s']:>9.0f}")
+        reference = (baseline or {}).get(family)
+        if reference is not None:
+            line += (f"   (base: gap UB {fmt(reference['gap_ub'], '.2f')}%, "
+                     f"{reference['evaluations_per_s']:.0f} aval/s)")
+        lines.append(line)
+    return "\n".join(lines)
+
+def run_benchmark(families: List[str], seeds: List[int], params: Dict[str, Any], sample: int = 1,
+                  workers: int = 1, instances_dir: str = INSTANCES_DIR,
+                  instances_csv: str = alwabp_bounds.INSTANCES_CSV) -> Dict[str, Any]:
+    """
+    Executa o benchmark e retorna {"params", "environment", "runs", "summary"}.
+    Com workers > 1 as replicações rodam num pool de processos (tempos menos estáveis).
+    """
+    global _INSTANCES, _KNOWN
+    _INSTANCES = instance_cache.load_instances(instances_dir)
+    _KNOWN = alwabp_bounds.load_known_bounds(instances_csv)
+    names = select_instances(_INSTANCES, _KNOWN, families, sample)
+    cases = [(name, seed, params) for name in names for seed in seeds]
+
+    start_time = time.time()
+    if workers > 1:
+        context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(_INSTANCES, _KNOWN)) as executor:
+            runs = list(executor.map(run_benchmark_case, *zip(*cases))) if cases else []
+    else:
+        runs = [run_benchmark_case(*case) for case in cases]
+
+    return {
+        "params": dict(params, families=families, seeds=seeds, sample=sample, workers=workers),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "wall_time_s": time.time() - start_time},
+        "runs": runs,
+        "summary": summarize(runs),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark reprodutível do VNS sobre as famílias de instâncias.")
+    parser.add_argument("--families", nargs="+", choices=FAMILIES, default=FAMILIES, help="famílias a executar")
+    parser.add_argument("--seeds", nargs="+", type=int, default=SEEDS, help=f"sementes (padrão: {SEEDS})")
+    parser.add_argument("--sample", type=int, default=1, help="usa uma a cada N instâncias de cada família")
+    parser.add_argument("--workers", type=int, default=1, help="processos em paralelo (padrão: 1, tempos estáveis)")
+    parser.add_argument("--max-iter", type=int, default=alwabp_vns.MAX_ITER, help="iterações do VNS (0 = sem limite)")
+    parser.add_argument("--time-limit", type=float, default=None, help="limite de tempo por replicação (s)")
+    parser.add_argument("--max-evaluations", type=int, default=None, help="limite de avaliações por replicação")
+    parser.add_argument("--no-early-stop", action="store_true", help="não para ao atingir o limitante inferior")
+    parser.add_argument("--output", default=None, help="arquivo JSON com todas as execuções e o resumo")
+    parser.add_argument("--baseline", default=None, help="arquivo JSON de linha de base para comparação")
+    parser.add_argument("--save-baseline", default=None, help="grava o resultado como nova linha de base")
+    parser.add_argument("--gap-tolerance", type=float, default=GAP_TOLERANCE,
+                        help=f"aumento tolerado do gap médio para o UB, em pontos percentuais (padrão: {GAP_TOLERANCE})")
+    parser.add_argument("--speed-tolerance", type=float, default=SPEED_TOLERANCE,
+                        help=f"queda relativa tolerada de avaliações/s (padrão: {SPEED_TOLERANCE})")
+    args = parser.parse_args()
+    if args.max_iter == 0 and args.time_limit is None and args.max_evaluations is None:
+        parser.error("--max-iter 0 exige --time-limit ou --max-evaluations")
+
+    params = {"max_iter": args.max_iter, "time_limit": args.time_limit, "max_evaluations": args.max_evaluations,
+              "early_stop": not args.no_early_stop}
+    report = run_benchmark(args.families, args.seeds, params, args.sample, args.workers)
+
+    baseline_report = None
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline_report = json.load(f)
+    baseline = baseline_report["summary"] if baseline_report is not None else None
+    print(format_summary(report["summary"], baseline))
+
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if baseline is not None:
+        ignored = ("workers",)
+        if any(report["params"].get(key) != baseline_report["params"].get(key)
+               for key in report["params"] if key not in ignored):
+            print("Aviso: parâmetros diferentes dos da linha de base.", file=sys.stderr)
+        regressions = compare_with_baseline(report["summary"], baseline, args.gap_tolerance, args.speed_tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("Sem regressões em relação à linha de base.")
@@ -1,63 +1,53 @@
 import os
+import sys
+import argparse
 import pandas as pd
 
+import results_store
+
 # Caminhos
 PASTA_VNS = "vns_results"
 ARQUIVO_INSTANCIAS = "instances.csv"
 SAIDA_CSV = "resultado_vns.csv"
-
-# Mapeamento simplificado → nome completo
-MAP_INSTANCIAS = {
-    "hes": "heskia",
-    "ros": "roszieg",
-    "wee": "wee-mag",
-    "ton": "tonge"
-}
+BASE_RESULTADOS = results_store.DEFAULT_DB
 
 # Seeds esperadas
 SEEDS = [42, 101, 202, 303, 404]
 
 def main():
+    parser = argparse.ArgumentParser(description="Gera o resultado_vns.csv a partir da base de resultados.")
+    parser.add_argument("--config", type=int, default=0,
+                        help="índice da configuração (parâmetros + versão do resolvedor) em --list "
+                             "(padrão: 0, a da execução mais recente)")
+    parser.add_argument("--list", action="store_true", help="lista as configurações da base e sai")
+    args = parser.parse_args()
+
     # Lê o CSV de instâncias
     df_inst = pd.read_csv(ARQUIVO_INSTANCIAS)
     df_inst = df_inst.rename(columns=str.strip)
 
-    resultados = {}
-
-    for arquivo in os.listdir(PASTA_VNS):
-        if not arquivo.endswith(".txt"):
-            continue
-
-        # Exemplo: 1_hes_rep1_seed42.txt
-        nome = os.path.splitext(arquivo)[0]
-        partes = nome.split("_")
-
-        num = int(partes[0])  # Corrigido para inteiro
-        inst_simplificada = partes[1]
-        seed = int(partes[-1].replace("seed", ""))
+    # Melhor SF por (instância, semente), agregada incrementalmente na base de resultados
+    if not os.path.exists(BASE_RESULTADOS):
+        print(f"⚠️ Base de resultados não encontrada: {BASE_RESULTADOS}")
+        print(f"   Para importar resultados antigos: python results_store.py import {PASTA_VNS}")
+        sys.exit(1)
+    with results_store.ResultsStore(BASE_RESULTADOS) as store:
+        configuracoes = store.configurations()
+        if args.list:
+            print(results_store.format_configurations(configuracoes))
+            return
+        if not 0 <= args.config < len(configuracoes):
+            print(f"⚠️ Configuração {args.config} inexistente (a base tem {len(configuracoes)}; veja --list)")
+            sys.exit(1)
+        configuracao = configuracoes[args.config]
+        # Apenas as execuções de uma configuração: não mistura parâmetros nem versões do resolvedor
+        melhores = store.seed_results(configuracao)
+    print(f"Configuração {args.config}: versão {configuracao['solver_version'] or '-'}, "
+          f"parâmetros {configuracao['params']} ({configuracao['runs']} execuções)")
 
-        if inst_simplificada not in MAP_INSTANCIAS:
-            print(f"⚠️ Instância desconhecida: {inst_simplificada}")
-            continue
-
-        inst_completa = MAP_INSTANCIAS[inst_simplificada]
-
-        # Lê a primeira linha do arquivo
-        caminho = os.path.join(PASTA_VNS, arquivo)
-        with open(caminho, "r") as f:
-            primeira_linha = f.readline().strip()
-
-        try:
-            valor = float(primeira_linha)
-        except ValueError:
-            print(f"⚠️ Erro ao converter valor em {arquivo}: {primeira_linha}")
-            continue
-
-        chave = (inst_completa, num)  # Corrigido: chave é (instancia, num)
-        if chave not in resultados:
-            resultados[chave] = {}
-
-        resultados[chave][f"seed_{seed}"] = valor
+    resultados = {}
+    for chave, por_seed in melhores.items():  # chave é (instancia, num)
+        resultados[chave] = {f"seed_{seed}": valor for seed, valor in por_seed.items() if valor is not None}
 
     # Monta DataFrame final
     linhas = []
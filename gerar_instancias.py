@@ -0,0 +1,104 @@
+import os
+import random
+import argparse
+from typing import List, Tuple
+
+from alwabp_vns import ALWABPInstance
+"""
+
+    gerador de instâncias do ALWABP
+
+    Gera instâncias sintéticas no formato dos arquivos de alwabp/ (n, a matriz n x k
+    de tempos com Inf para incapacidade e os pares de precedência terminados por
+    -1 -1), em tamanhos muito maiores que os do conjunto original.
+
+    O grafo de precedência é um DAG com as tarefas numeradas em ordem topológica:
+    cada tarefa recebe em média `arcs` predecessores entre as `window` tarefas
+    anteriores. Os tempos seguem o padrão das instâncias da literatura: um tempo
+    base por tarefa e, para cada trabalhador, um tempo sorteado em [1, 2 * base];
+    uma fração `incapable` dos pares (tarefa, trabalhador) vira Inf. Toda instância
+    gerada é factível: a ordem topológica é dividida em k blocos atribuídos a uma
+    permutação dos trabalhadores, e cada tarefa mantém o trabalhador do seu bloco.
+
+"""
+# Configurações
+OUTPUT_DIR = "instancias_geradas"
+MAX_TIME = 100 # Tempo base máximo de uma tarefa
+ARCS = 1.5 # Média de predecessores diretos por tarefa
+WINDOW = 20 # Predecessores sorteados entre as WINDOW tarefas anteriores
+INCAPABLE = 0.2 # Fração dos pares (tarefa, trabalhador) incapazes
+
+def generate_precedences(num_tasks: int, arcs: float, window: int, rng: random.Random) -> List[Tuple[int, int]]:
+    """ Pares (i, j) 1-indexados com i < j: cada tarefa j recebe ~arcs predecessores entre as window anteriores. """
+    precedences = []
+    for j in range(1, num_tasks):
+        candidates = range(max(0, j - window), j)
+        count = min(len(candidates), int(arcs) + (rng.random() < arcs - int(arcs)))
+        for i in sorted(rng.sample(candidates, count)):
+            precedences.append((i + 1, j + 1))
+    return precedences
+
+def generate_instance(num_tasks: int, num_workers: int, arcs: float = ARCS, window: int = WINDOW,
+                      incapable: float = INCAPABLE, max_time: int = MAX_TIME, seed: int = 0) -> ALWABPInstance:
+    """ Instância aleatória factível com num_tasks tarefas e num_workers trabalhadores (ver docstring do módulo). """
+    if num_tasks < 1 or num_workers < 1:
+        raise ValueError("O número de tarefas e o de trabalhadores devem ser positivos.")
+    rng = random.Random(seed)
+    precedences = generate_precedences(num_tasks, arcs, window, rng)
+
+    # Solução plantada: blocos contíguos da ordem topológica para uma permutação dos trabalhadores
+    workers = list(range(num_workers))
+    rng.shuffle(workers)
+    planted = [workers[i * num_workers // num_tasks] for i in range(num_tasks)]
+
+    task_times = [[0.0] * num_tasks for _ in range(num_workers)]
+    for i in range(num_tasks):
+        base = rng.randint(1, max_time)
+        for w in range(num_workers):
+            if w != planted[i] and rng.random() < incapable:
+                task_times[w][i] = float('inf')
+            else:
+                task_times[w][i] = float(rng.randint(1, 2 * base))
+    return ALWABPInstance(num_tasks, num_workers, task_times, precedences)
+
+def format_instance(instance: ALWABPInstance) -> str:
+    """ Conteúdo do arquivo de instância, no formato lido por ALWABPInstance.from_bytes. """
+    lines = [str(instance.num_tasks)]
+    for i in range(instance.num_tasks):
+        lines.append(" ".join("Inf" if instance.task_times[w][i] == float('inf') else str(int(instance.task_times[w][i]))
+                              for w in range(instance.num_workers)))
+    lines.extend(f"{i} {j}" for i, j in instance.precedences)
+    lines.append("-1 -1")
+    return "\n".join(lines) + "\n"
+
+def write_instance(path: str, instance: ALWABPInstance):
+    with open(path, "w") as f:
+        f.write(format_instance(instance))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera instâncias sintéticas do ALWABP no formato de alwabp/.")
+    parser.add_argument("--tasks", type=int, nargs="+", required=True, help="número(s) de tarefas n")
+    parser.add_argument("--workers", type=int, nargs="+", required=True,
+                        help="número(s) de trabalhadores k (um por valor de --tasks, ou um único para todos)")
+    parser.add_argument("--arcs", type=float, default=ARCS, help=f"predecessores diretos por tarefa (padrão: {ARCS})")
+    parser.add_argument("--window", type=int, default=WINDOW, help=f"janela dos predecessores (padrão: {WINDOW})")
+    parser.add_argument("--incapable", type=float, default=INCAPABLE,
+                        help=f"fração de pares tarefa-trabalhador incapazes (padrão: {INCAPABLE})")
+    parser.add_argument("--max-time", type=int, default=MAX_TIME, help=f"tempo base máximo (padrão: {MAX_TIME})")
+    parser.add_argument("--count", type=int, default=1, help="instâncias por tamanho")
+    parser.add_argument("--seed", type=int, default=0, help="semente da primeira instância")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help=f"diretório de saída (padrão: {OUTPUT_DIR})")
+    args = parser.parse_args()
+    if len(args.workers) not in (1, len(args.tasks)):
+        parser.error("--workers deve ter um valor ou um por valor de --tasks")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    workers = args.workers * len(args.tasks) if len(args.workers) == 1 else args.workers
+    seed = args.seed
+    for n, k in zip(args.tasks, workers):
+        for c in range(args.count):
+            instance = generate_instance(n, k, args.arcs, args.window, args.incapable, args.max_time, seed)
+            path = os.path.join(args.output_dir, f"gen_n{n}_k{k}_{c + 1}")
+            write_instance(path, instance)
+            print(f"{path}: {n} tarefas, {k} trabalhadores, {len(instance.precedences)} precedências")
+            seed += 1
@@ -0,0 +1,103 @@
+import os
+import sys
+import glob
+import pickle
+import argparse
+from array import array
+from typing import Dict, Tuple, Any
+
+from alwabp_vns import ALWABPInstance
+"""
+
+    cache compilado das instâncias
+
+    Todas as instâncias de um diretório são lidas uma vez e gravadas num único
+    arquivo binário (pickle de arrays compactos). As execuções em lote carregam
+    esse arquivo em milissegundos em vez de reinterpretar cada instância. O cache
+    é reconstruído automaticamente quando algum arquivo do diretório muda.
+
+"""
+# Configurações
+INSTANCES_DIR = "alwabp"
+CACHE_VERSION = 1
+
+def default_cache_path(instances_dir: str) -> str:
+    """ Caminho padrão do cache: '<diretório>.cache' ao lado do diretório de instâncias. """
+    return os.path.normpath(instances_dir) + ".cache"
+
+def _file_stamps(instances_dir: str) -> Dict[str, Tuple[int, int]]:
+    """ Nome -> (tamanho, mtime_ns) de cada arquivo de instância do diretório. """
+    stamps = {}
+    for path in sorted(glob.glob(os.path.join(instances_dir, "*"))):
+        if os.path.isfile(path):
+            st = os.stat(path)
+            stamps[os.path.basename(path)] = (st.st_size, st.st_mtime_ns)
+    return stamps
+
+def _pack(instance: ALWABPInstance) -> Tuple[int, int, array, array]:
+    """ Representação compacta: tempos (tarefa-major) e precedências achatadas. """
+    n, m = instance.num_tasks, instance.num_workers
+    times = array('d', [instance.task_times[w][i] for i in range(n) for w in range(m)])
+    precedences = array('i', [v for pair in instance.precedences for v in pair])
+    return n, m, times, precedences
+
+def _unpack(packed: Tuple[int, int, array, array]) -> ALWABPInstance:
+    n, m, times, precedences = packed
+    task_times = [times[w::m].tolist() for w in range(m)]
+    pairs = list(zip(precedences[::2], precedences[1::2]))
+    return ALWABPInstance(n, m, task_times, pairs)
+
+def build_cache(instances_dir: str = INSTANCES_DIR, cache_path: str = None) -> Dict[str, Any]:
+    """
+    Lê todas as instâncias do diretório e grava o cache compilado.
+    Retorna o conteúdo gravado; arquivos inválidos ficam registrados em "errors".
+    """
+    cache_path = cache_path or default_cache_path(instances_dir)
+    stamps = _file_stamps(instances_dir)
+    packed = {}
+    errors = {}
+    for name in stamps:
+        try:
+            packed[name] = _pack(ALWABPInstance.from_path(os.path.join(instances_dir, name)))
+        except ValueError as e:
+            errors[name] = str(e)
+
+    content = {"version": CACHE_VERSION, "stamps": stamps, "instances": packed, "errors": errors}
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(content, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return content
+
+def load_instances(instances_dir: str = INSTANCES_DIR, cache_path: str = None) -> Dict[str, Any]:
+    """
+    Carrega todas as instâncias do diretório a partir do cache compilado,
+    reconstruindo-o se estiver ausente ou desatualizado.
+    Retorna nome -> ALWABPInstance (ou a mensagem de erro, para arquivos inválidos).
+    """
+    cache_path = cache_path or default_cache_path(instances_dir)
+    content = None
+    try:
+        with open(cache_path, "rb") as f:
+            content = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    if (not isinstance(content, dict) or content.get("version") != CACHE_VERSION
+            or content.get("stamps") != _file_stamps(instances_dir)):
+        content = build_cache(instances_dir, cache_path)
+
+    instances: Dict[str, Any] = {name: _unpack(packed) for name, packed in content["instances"].items()}
+    instances.update(content["errors"])
+    return instances
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compila todas as instâncias de um diretório num único arquivo de cache.")
+    parser.add_argument("instances_dir", nargs="?", default=INSTANCES_DIR)
+    parser.add_argument("--output", default=None, help="arquivo do cache (padrão: <diretório>.cache)")
+    args = parser.parse_args()
+
+    content = build_cache(args.instances_dir, args.output)
+    print(f"{len(content['instances'])} instâncias gravadas em {args.output or default_cache_path(args.instances_dir)}")
+    for name, error in content["errors"].items():
+        print(f"Aviso: {name}: {error}", file=sys.stderr)
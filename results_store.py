@@ -0,0 +1,438 @@
+import os
+import re
+import json
+import hashlib
+import sqlite3
+import argparse
+from typing import List, Dict, Any, Optional, Tuple
+
+import alwabp_bounds
+"""
+
+    armazenamento estruturado dos resultados
+
+    Todas as replicações ficam numa base SQLite (tabela runs): instância, família,
+    replicação, semente, parâmetros (JSON), SI, SF, tempo, avaliações e a solução.
+    Os resumos por instância e a melhor SF por (instância, semente) são mantidos
+    incrementalmente: update_aggregates() processa apenas as linhas inseridas desde a
+    última agregação, sem reler as anteriores nem varrer o diretório de resultados.
+
+    Cada execução pode ter uma chave de tarefa (job_key) derivada do conteúdo: hash do
+    arquivo da instância, semente, parâmetros e versão do resolvedor (hash do código e
+    de instances.csv, cujo LB decide a parada antecipada).
+    Os runners consultam as chaves já concluídas para retomar experimentos interrompidos
+    ou alterados em parte, executando apenas as tarefas que faltam.
+
+    Cada execução registra também a versão do resolvedor que a produziu. Os resumos são
+    agregados por configuração (parâmetros + versão do resolvedor), para que execuções
+    antigas, com limites de tempo diferentes ou de outra versão do código não se
+    misturem; por padrão as consultas usam a configuração da execução mais recente.
+
+"""
+# Configurações
+DEFAULT_DB = os.path.join("vns_results", "results.sqlite")
+# Arquivos cujo conteúdo define a versão do resolvedor (relativos ao diretório deste módulo)
+SOLVER_FILES = ("alwabp_vns.py", "alwabp_bounds.py")
+# Parâmetros dos runners que não alteram o resultado (ficam fora da configuração e da chave das tarefas)
+NON_ALGORITHMIC_PARAMS = ("trace",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instance TEXT NOT NULL,
+    family TEXT,
+    num INTEGER,
+    replication INTEGER,
+    seed INTEGER NOT NULL,
+    params TEXT NOT NULL DEFAULT '{}',
+    si REAL,
+    sf REAL,
+    time_s REAL,
+    evaluations INTEGER,
+    solution TEXT,
+    error TEXT,
+    job_key TEXT,
+    solver_version TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE INDEX IF NOT EXISTS runs_instance_seed ON runs (instance, seed);
+
+-- Resumo por (instância, configuração) (apenas execuções sem erro e com SF finita entram nas
+-- somas; SI e tempo podem faltar nos resultados importados, por isso têm contagens próprias).
+-- A configuração é o par (params, solver_version); '' = versão desconhecida (importados).
+CREATE TABLE IF NOT EXISTS instance_summary (
+    instance TEXT NOT NULL,
+    params TEXT NOT NULL,
+    solver_version TEXT NOT NULL,
+    family TEXT,
+    num INTEGER,
+    runs INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    si_runs INTEGER NOT NULL,
+    sum_si REAL NOT NULL,
+    sum_sf REAL NOT NULL,
+    sum_sf_sq REAL NOT NULL,
+    best_sf REAL,
+    time_runs INTEGER NOT NULL,
+    sum_time REAL NOT NULL,
+    PRIMARY KEY (instance, params, solver_version)
+);
+
+-- Melhor SF por (instância, semente, configuração)
+CREATE TABLE IF NOT EXISTS seed_best (
+    instance TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    solver_version TEXT NOT NULL,
+    family TEXT,
+    num INTEGER,
+    best_sf REAL,
+    PRIMARY KEY (instance, seed, params, solver_version)
+);
+
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# --- Chaves de tarefa endereçadas por conteúdo ---
+
+def file_digest(path: str) -> str:
+    """ SHA-256 do conteúdo de um arquivo. """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def solver_version(directory: str = None, bounds_path: str = alwabp_bounds.INSTANCES_CSV) -> str:
+    """
+    Versão do resolvedor: hash do conteúdo de SOLVER_FILES (muda a cada alteração do código) e do
+    arquivo de limitantes conhecidos (bounds_path, instances.csv), cujo LB decide a parada antecipada.
+    """
+    directory = directory or os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name, path in [(name, os.path.join(directory, name)) for name in SOLVER_FILES] + [("bounds", bounds_path)]:
+        digest.update(name.encode())
+        digest.update(file_digest(path).encode() if os.path.exists(path) else b"-")
+    return digest.hexdigest()[:16]
+
+def configuration_params(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """ Parâmetros que definem a configuração de uma execução (sem NON_ALGORITHMIC_PARAMS). """
+    return {key: value for key, value in (params or {}).items() if key not in NON_ALGORITHMIC_PARAMS}
+
+def job_key(instance_digest: str, seed: int, params: Dict[str, Any], version: str) -> str:
+    """ Chave de uma tarefa: hash de (conteúdo da instância, semente, parâmetros, versão do resolvedor). """
+    content = json.dumps({"instance": instance_digest, "seed": seed, "params": params, "solver": version},
+                         sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+# Execuções que entram nas somas do resumo
+_VALID = "error IS NULL AND sf IS NOT NULL AND sf < 1e308"
+
+class ResultsStore:
+    """ Base de resultados das replicações do VNS (um único escritor: o processo principal do runner). """
+    def __init__(self, path: str = DEFAULT_DB):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self._version: Optional[str] = None
+        # Resumos de bases antigas não separam configurações: são descartados e reagregados
+        summary_columns = {row["name"] for row in self.connection.execute("PRAGMA table_info(instance_summary)")}
+        if summary_columns and "params" not in summary_columns:
+            self.connection.executescript("DROP TABLE instance_summary; DROP TABLE seed_best; "
+                                          "DELETE FROM meta WHERE key = 'aggregated_id';")
+        self.connection.executescript(SCHEMA)
+        # Bases criadas antes das chaves de tarefa (ou das versões) não têm as colunas job_key e solver_version
+        columns = {row["name"] for row in self.connection.execute("PRAGMA table_info(runs)")}
+        if "job_key" not in columns:
+            self.connection.execute("ALTER TABLE runs ADD COLUMN job_key TEXT")
+        if "solver_version" not in columns:
+            self.connection.execute("ALTER TABLE runs ADD COLUMN solver_version TEXT NOT NULL DEFAULT ''")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS runs_job_key ON runs (job_key)")
+        # Execuções antigas guardavam na configuração parâmetros que não alteram o resultado (o traço):
+        # são normalizadas e os resumos, reagregados
+        legacy = [row["params"] for row in self.connection.execute("SELECT DISTINCT params FROM runs")
+                  if configuration_params(json.loads(row["params"])) != json.loads(row["params"])]
+        for params in legacy:
+            self.connection.execute("UPDATE runs SET params = ? WHERE params = ?",
+                                    (json.dumps(configuration_params(json.loads(params)), sort_keys=True), params))
+        if legacy:
+            self.connection.executescript("DELETE FROM instance_summary; DELETE FROM seed_best; "
+                                          "DELETE FROM meta WHERE key = 'aggregated_id';")
+        self.connection.commit()
+
+    @property
+    def version(self) -> str:
+        """ Versão do resolvedor atual (calculada uma vez), gravada nas execuções novas. """
+        if self._version is None:
+            self._version = solver_version()
+        return self._version
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> 'ResultsStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_run(self, instance: str, replication: Optional[int], seed: int, params: Optional[Dict[str, Any]] = None,
+                si: Optional[float] = None, sf: Optional[float] = None, time_s: Optional[float] = None,
+                evaluations: Optional[int] = None, solution: Optional[str] = None, error: Optional[str] = None,
+                commit: bool = True, job_key: Optional[str] = None, version: Optional[str] = None) -> int:
+        """
+        Registra uma replicação e retorna o seu id.
+        params: parâmetros da execução; os de NON_ALGORITHMIC_PARAMS não são gravados.
+        version: versão do resolvedor que a produziu (None = a atual; '' = desconhecida).
+        """
+        key = alwabp_bounds.instance_key(instance)
+        family, num = key if key is not None else (None, None)
+        cursor = self.connection.execute(
+            "INSERT INTO runs (instance, family, num, replication, seed, params, si, sf, time_s, evaluations,"
+            " solution, error, job_key, solver_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (instance, family, num, replication, seed, json.dumps(configuration_params(params), sort_keys=True),
+             si, sf, time_s, evaluations, solution, error, job_key, self.version if version is None else version))
+        if commit:
+            self.connection.commit()
+        return cursor.lastrowid
+
+    def add_result(self, result: Dict[str, Any], params: Optional[Dict[str, Any]] = None, commit: bool = True) -> int:
+        """
+        Registra um resultado estruturado dos runners (instance, replication, seed, error, job_key
+        e, sem erro, si, sf, time_s e evaluations); a solução é lida de result["output_file"], se existir.
+        """
+        solution = None
+        output_file = result.get("output_file")
+        if result.get("error") is None and output_file and os.path.exists(output_file):
+            solution = read_solution_file(output_file)
+        return self.add_run(result["instance"], result.get("replication"), result["seed"], params,
+                            result.get("si"), result.get("sf"), result.get("time_s"), result.get("evaluations"),
+                            solution, result.get("error"), commit, result.get("job_key"))
+
+    def completed_jobs(self, job_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """ job_key -> execução mais recente sem erro, para as chaves dadas que já foram concluídas. """
+        completed: Dict[str, Dict[str, Any]] = {}
+        keys = list(job_keys)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT * FROM runs WHERE error IS NULL AND job_key IN ({', '.join('?' * len(chunk))}) ORDER BY id",
+                chunk)
+            for row in rows:
+                completed[row["job_key"]] = dict(row)
+        return completed
+
+    def mean_times(self) -> Dict[str, float]:
+        """ Instância -> tempo médio das execuções sem erro com tempo registrado (quaisquer parâmetros). """
+        rows = self.connection.execute(
+            "SELECT instance, AVG(time_s) AS mean_time FROM runs "
+            "WHERE error IS NULL AND time_s IS NOT NULL GROUP BY instance")
+        return {row["instance"]: row["mean_time"] for row in rows}
+
+    def _watermark(self) -> int:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'aggregated_id'").fetchone()
+        return int(row["value"]) if row is not None else 0
+
+    def update_aggregates(self) -> int:
+        """ Incorpora aos resumos as execuções novas desde a última agregação; retorna quantas foram processadas. """
+        with self.connection:
+            start = self._watermark()
+            end = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM runs").fetchone()[0]
+            if end <= start:
+                return 0
+            self.connection.execute(f"""
+                INSERT INTO instance_summary (instance, params, solver_version, family, num, runs, failed, si_runs,
+                                              sum_si, sum_sf, sum_sf_sq, best_sf, time_runs, sum_time)
+                SELECT instance, params, solver_version, family, num, COUNT(*), SUM(NOT ({_VALID})),
+                       COUNT(CASE WHEN {_VALID} THEN si END), TOTAL(CASE WHEN {_VALID} THEN si END),
+                       TOTAL(CASE WHEN {_VALID} THEN sf END), TOTAL(CASE WHEN {_VALID} THEN sf * sf END),
+                       MIN(CASE WHEN {_VALID} THEN sf END),
+                       COUNT(CASE WHEN {_VALID} THEN time_s END), TOTAL(CASE WHEN {_VALID} THEN time_s END)
+                FROM runs WHERE id > ? AND id <= ? GROUP BY instance, params, solver_version
+                ON CONFLICT (instance, params, solver_version) DO UPDATE SET
+                    runs = runs + excluded.runs, failed = failed + excluded.failed,
+                    si_runs = si_runs + excluded.si_runs, time_runs = time_runs + excluded.time_runs,
+                    sum_si = sum_si + excluded.sum_si, sum_sf = sum_sf + excluded.sum_sf,
+                    sum_sf_sq = sum_sf_sq + excluded.sum_sf_sq, sum_time = sum_time + excluded.sum_time,
+                    best_sf = CASE WHEN best_sf IS NULL THEN excluded.best_sf
+                                   WHEN excluded.best_sf IS NULL THEN best_sf
+                                   ELSE MIN(best_sf, excluded.best_sf) END
+            """, (start, end))
+            self.connection.execute(f"""
+                INSERT INTO seed_best (instance, seed, params, solver_version, family, num, best_sf)
+                SELECT instance, seed, params, solver_version, family, num, MIN(CASE WHEN {_VALID} THEN sf END)
+                FROM runs WHERE id > ? AND id <= ? GROUP BY instance, seed, params, solver_version
+                ON CONFLICT (instance, seed, params, solver_version) DO UPDATE SET
+                    best_sf = CASE WHEN best_sf IS NULL THEN excluded.best_sf
+                                   WHEN excluded.best_sf IS NULL THEN best_sf
+                                   ELSE MIN(best_sf, excluded.best_sf) END
+            """, (start, end))
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('aggregated_id', ?)", (str(end),))
+        return end - start
+
+    def configurations(self) -> List[Dict[str, Any]]:
+        """
+        Configurações (params, solver_version) presentes na base, da mais recente para a mais antiga,
+        com o número de execuções e a data da última.
+        """
+        rows = self.connection.execute(
+            "SELECT params, solver_version, COUNT(*) AS runs, MAX(created_at) AS last_run, MAX(id) AS last_id "
+            "FROM runs GROUP BY params, solver_version ORDER BY last_id DESC")
+        return [{"params": row["params"], "solver_version": row["solver_version"], "runs": row["runs"],
+                 "last_run": row["last_run"]} for row in rows]
+
+    def _configuration(self, configuration: Optional[Dict[str, Any]]) -> Optional[Tuple[str, str]]:
+        """ (params, solver_version) da configuração dada ou, com None, da execução mais recente. """
+        if configuration is None:
+            configurations = self.configurations()
+            if not configurations:
+                return None
+            configuration = configurations[0]
+        return configuration["params"], configuration["solver_version"]
+
+    def instance_summaries(self, configuration: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Resumo por instância de uma configuração (um item de configurations(); padrão: a da execução
+        mais recente): execuções, falhas, médias de SI/SF/tempo, desvio padrão e melhor SF.
+        """
+        self.update_aggregates()
+        selected = self._configuration(configuration)
+        if selected is None:
+            return []
+        summaries = []
+        for row in self.connection.execute("SELECT * FROM instance_summary WHERE params = ? AND solver_version = ? "
+                                           "ORDER BY family, num, instance", selected):
+            valid = row["runs"] - row["failed"]
+            mean_sf = row["sum_sf"] / valid if valid else None
+            std_sf = None
+            if valid > 1:
+                std_sf = max(0.0, (row["sum_sf_sq"] - valid * mean_sf ** 2) / (valid - 1)) ** 0.5
+            summaries.append({
+                "instance": row["instance"], "family": row["family"], "num": row["num"],
+                "runs": row["runs"], "failed": row["failed"],
+                "mean_si": row["sum_si"] / row["si_runs"] if row["si_runs"] else None,
+                "mean_sf": mean_sf, "std_sf": std_sf, "best_sf": row["best_sf"],
+                "mean_time_s": row["sum_time"] / row["time_runs"] if row["time_runs"] else None,
+            })
+        return summaries
+
+    def seed_results(self, configuration: Optional[Dict[str, Any]] = None) -> Dict[Tuple[str, int], Dict[int, Optional[float]]]:
+        """
+        (família, número) -> {semente: melhor SF} das instâncias com família conhecida, para uma
+        configuração (um item de configurations(); padrão: a da execução mais recente).
+        """
+        self.update_aggregates()
+        selected = self._configuration(configuration)
+        results: Dict[Tuple[str, int], Dict[int, Optional[float]]] = {}
+        if selected is None:
+            return results
+        for row in self.connection.execute("SELECT family, num, seed, best_sf FROM seed_best WHERE family IS NOT NULL "
+                                           "AND params = ? AND solver_version = ?", selected):
+            results.setdefault((row["family"], row["num"]), {})[row["seed"]] = row["best_sf"]
+        return results
+
+    def export_summary_csv(self, path: str):
+        """ Grava todas as execuções no formato do summary_results.csv dos runners. """
+        with open(path, "w") as f:
+            f.write("Instance;Replication;Seed;SI;SF;Time_s\n")
+            for row in self.connection.execute("SELECT * FROM runs ORDER BY id"):
+                if row["error"] is not None:
+                    f.write(f"{row['instance']};{row['replication']};{row['seed']};ERROR;ERROR;ERROR\n")
+                else:
+                    f.write(f"{row['instance']};{row['replication']};{row['seed']};"
+                            f"{row['si']};{row['sf']};{row['time_s']:.4f}\n")
+
+    def import_directory(self, directory: str, params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Importa resultados antigos de um diretório de saída (arquivos '<instância>_rep<r>_seed<s>.txt'
+        e, se existir, summary_results.csv com SI e tempo). Retorna o número de execuções importadas.
+        """
+        summary = _read_legacy_summary(os.path.join(directory, "summary_results.csv"))
+        pattern = re.compile(r"^(?P<instance>.+)_rep(?P<rep>\d+)_seed(?P<seed>-?\d+)\.txt$")
+        count = 0
+        with self.connection:
+            for filename in sorted(os.listdir(directory)):
+                match = pattern.match(filename)
+                if match is None:
+                    continue
+                instance, rep, seed = match["instance"], int(match["rep"]), int(match["seed"])
+                solution = read_solution_file(os.path.join(directory, filename))
+                si, sf, time_s = summary.get((instance, rep, seed), (None, None, None))
+                if sf is None:
+                    try:
+                        sf = float(solution.split("\n", 1)[0])
+                    except ValueError:
+                        pass
+                self.add_run(instance, rep, seed, params, si, sf, time_s, solution=solution,
+                             error=None if sf is not None else "SF ilegível", commit=False, version="")
+                count += 1
+        return count
+
+def format_configurations(configurations: List[Dict[str, Any]]) -> str:
+    """ Tabela das configurações, com o índice usado por --config. """
+    lines = [f"{'#':>3} {'Versão':<16} {'Execuções':>9} {'Última':<19} Parâmetros"]
+    for index, configuration in enumerate(configurations):
+        lines.append(f"{index:>3} {configuration['solver_version'] or '-':<16} {configuration['runs']:>9} "
+                     f"{configuration['last_run']:<19} {configuration['params']}")
+    return "\n".join(lines)
+
+def read_solution_file(path: str) -> str:
+    """ Conteúdo de um arquivo de solução (UTF-8 ou, nos arquivos antigos gerados no Windows, cp1252). """
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("cp1252", errors="replace")
+
+def _read_legacy_summary(path: str) -> Dict[Tuple[str, int, int], Tuple[Optional[float], Optional[float], Optional[float]]]:
+    """ (instância, replicação, semente) -> (SI, SF, tempo) de um summary_results.csv, se existir. """
+    summary = {}
+    if not os.path.exists(path):
+        return summary
+    with open(path) as f:
+        next(f, None)
+        for line in f:
+            fields = [field.strip() for field in line.split(";")]
+            if len(fields) != 6:
+                continue
+            try:
+                key = (fields[0], int(fields[1]), int(fields[2]))
+                summary[key] = (float(fields[3]), float(fields[4]), float(fields[5]))
+            except ValueError:
+                continue
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Base de resultados das replicações do VNS.")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"arquivo SQLite (padrão: {DEFAULT_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="importa um diretório de resultados antigo")
+    importer.add_argument("directory", help="diretório com os arquivos <instância>_rep<r>_seed<s>.txt")
+    summary_parser = commands.add_parser("summary", help="mostra o resumo por instância de uma configuração")
+    summary_parser.add_argument("--config", type=int, default=0,
+                                help="índice da configuração em 'configs' (padrão: 0, a mais recente)")
+    commands.add_parser("configs", help="lista as configurações (parâmetros + versão do resolvedor)")
+    exporter = commands.add_parser("export", help="exporta as execuções no formato summary_results.csv")
+    exporter.add_argument("output", help="arquivo CSV de saída")
+    args = parser.parse_args()
+
+    with ResultsStore(args.db) as store:
+        if args.command == "import":
+            print(f"{store.import_directory(args.directory)} execuções importadas em {args.db}")
+        elif args.command == "configs":
+            print(format_configurations(store.configurations()))
+        elif args.command == "summary":
+            configurations = store.configurations()
+            if not 0 <= args.config < max(1, len(configurations)):
+                parser.error(f"--config deve estar entre 0 e {len(configurations) - 1}")
+            print("Instance;Runs;Failed;MeanSI;MeanSF;StdSF;BestSF;MeanTime_s")
+            for row in store.instance_summaries(configurations[args.config] if configurations else None):
+                print(";".join("" if row[key] is None else str(row[key]) for key in
+                               ("instance", "runs", "failed", "mean_si", "mean_sf", "std_sf", "best_sf", "mean_time_s")))
+        elif args.command == "export":
+            store.export_summary_csv(args.output)
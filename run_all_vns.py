@@ -3,6 +3,8 @@ import subprocess
 import glob
 import time
 from typing import List, Dict
+
+import results_store
 """
 
     primeira versão (para linux)
@@ -15,6 +17,7 @@ INSTANCES_DIR = "alwabp"
 VNS_SCRIPT = "alwabp_vns.py"
 OUTPUT_DIR = "vns_results"
 SUMMARY_FILE = os.path.join(OUTPUT_DIR, "summary_results.csv")
+RESULTS_DB = results_store.DEFAULT_DB
 
 def run_experiment():
     """
@@ -33,49 +36,55 @@ def run_experiment():
         f.write("Instance;Replication;Seed;SI;SF;Time_s\n")
 
     print(f"Iniciando experimentos: {len(instance_files)} instâncias x {NUM_REPLICATIONS} replicações...")
-
-    for instance_path in instance_files:
-        instance_name = os.path.basename(instance_path)
-        print(f"\nProcessando instância: {instance_name}")
+    with results_store.ResultsStore(RESULTS_DB) as store:
+        for instance_path in instance_files:
+            instance_name = os.path.basename(instance_path)
+            print(f"\nProcessando instância: {instance_name}")
         
-        for rep in range(NUM_REPLICATIONS):
-            seed = SEEDS[rep]
-            # O nome do arquivo de solução completa é gerado aqui, mas o VNS_SCRIPT
-            # irá gerar a saída resumida para o stdout.
-            output_filename = os.path.join(OUTPUT_DIR, f"{instance_name}_rep{rep+1}_seed{seed}.txt")
+            for rep in range(NUM_REPLICATIONS):
+                seed = SEEDS[rep]
+                # O nome do arquivo de solução completa é gerado aqui, mas o VNS_SCRIPT
+                # irá gerar a saída resumida para o stdout.
+                output_filename = os.path.join(OUTPUT_DIR, f"{instance_name}_rep{rep+1}_seed{seed}.txt")
             
-            # O comando de execução deve ser compatível com o shell (Linux/WSL/Git Bash)
-            # O usuário pode precisar adaptar para o Command Prompt do Windows.
-            # Usaremos a sintaxe compatível com Unix/WSL/Git Bash.
-            # Comando: cat instance | python3 vns_script output_file seed
-            command = f"cat {instance_path} | python3 {VNS_SCRIPT} {output_filename} {seed}"
+                # O comando de execução deve ser compatível com o shell (Linux/WSL/Git Bash)
+                # O usuário pode precisar adaptar para o Command Prompt do Windows.
+                # Usaremos a sintaxe compatível com Unix/WSL/Git Bash.
+                # Comando: cat instance | python3 vns_script output_file seed
+                command = f"cat {instance_path} | python3 {VNS_SCRIPT} {output_filename} {seed}"
             
-            print(f"  -> Replicação {rep+1} (Semente: {seed})...", end="", flush=True)
+                print(f"  -> Replicação {rep+1} (Semente: {seed})...", end="", flush=True)
             
-            try:
-                # Executa o comando e captura a saída padrão (stdout)
-                # O VNS_SCRIPT imprime a linha de resumo (SI;SF;Time_s) no stdout
-                result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+                try:
+                    # Executa o comando e captura a saída padrão (stdout)
+                    # O VNS_SCRIPT imprime a linha de resumo (SI;SF;Time_s) no stdout
+                    result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+                
+                    # A saída padrão deve ser: SI;SF;Time_s
+                    summary_line = result.stdout.strip()
                 
-                # A saída padrão deve ser: SI;SF;Time_s
-                summary_line = result.stdout.strip()
+                    si, sf, time_s = (float(value) for value in summary_line.split(";"))
                 
-                # Escreve no arquivo de resumo
-                with open(SUMMARY_FILE, "a") as f:
-                    f.write(f"{instance_name};{rep+1};{seed};{summary_line}\n")
+                    # Escreve no arquivo de resumo e na base de resultados
+                    with open(SUMMARY_FILE, "a") as f:
+                        f.write(f"{instance_name};{rep+1};{seed};{summary_line}\n")
+                    store.add_run(instance_name, rep + 1, seed, si=si, sf=sf, time_s=time_s,
+                                  solution=results_store.read_solution_file(output_filename))
                 
-                print(" OK")
+                    print(" OK")
                 
-            except subprocess.CalledProcessError as e:
-                print(f" ERRO: Falha na execução. Stderr: {e.stderr.strip()}")
-                with open(SUMMARY_FILE, "a") as f:
-                    f.write(f"{instance_name};{rep+1};{seed};ERROR;ERROR;ERROR\n")
-            except Exception as e:
-                print(f" ERRO: {e}")
-                with open(SUMMARY_FILE, "a") as f:
-                    f.write(f"{instance_name};{rep+1};{seed};ERROR;ERROR;ERROR\n")
+                except subprocess.CalledProcessError as e:
+                    print(f" ERRO: Falha na execução. Stderr: {e.stderr.strip()}")
+                    store.add_run(instance_name, rep + 1, seed, error=e.stderr.strip())
+                    with open(SUMMARY_FILE, "a") as f:
+                        f.write(f"{instance_name};{rep+1};{seed};ERROR;ERROR;ERROR\n")
+                except Exception as e:
+                    print(f" ERRO: {e}")
+                    store.add_run(instance_name, rep + 1, seed, error=str(e))
+                    with open(SUMMARY_FILE, "a") as f:
+                        f.write(f"{instance_name};{rep+1};{seed};ERROR;ERROR;ERROR\n")
 
-    print("\nExperimentos concluídos. Resultados no arquivo:", SUMMARY_FILE)
+    print("\nExperimentos concluídos. Resultados em:", RESULTS_DB, "e", SUMMARY_FILE)
     print("O usuário deve calcular as médias e desvios a partir deste CSV.")
 
 if __name__ == "__main__":
@@ -1,13 +1,30 @@
 import os
+import csv
+import argparse
 import subprocess
 import glob
 import time
+import multiprocessing
 from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import List, Dict
+from typing import List, Dict, Any, Tuple
+
+import alwabp_bounds
+import results_store
 """
 
     execução paralela
 
+    Cada tarefa é identificada pelo conteúdo: hash do arquivo da instância, semente,
+    parâmetros e versão do resolvedor. Tarefas já concluídas na base de resultados são
+    puladas, de modo que uma execução interrompida (ou com parte dos parâmetros ou das
+    instâncias alterada) retoma de onde parou; --force executa tudo novamente.
+
+    As tarefas são despachadas da mais cara para a mais barata (LPT), para que as
+    instâncias grandes (tonge, wee-mag) não fiquem para o fim com núcleos ociosos.
+    O custo de uma instância é o tempo médio já medido na base de resultados ou,
+    sem medição, uma estimativa pelo tamanho em instances.csv (tarefas,
+    trabalhadores e precedências).
+
 """
 # Configurações
 NUM_REPLICATIONS = 5
@@ -17,10 +34,42 @@ VNS_SCRIPT = "alwabp_vns.py"
 OUTPUT_DIR = "vns_results"
 SUMMARY_FILE = os.path.join(OUTPUT_DIR, "summary_results.csv")
 
+CHUNKSIZE = 1 # Tarefas enviadas juntas a um processo do pool
+
+# Parâmetros de parada repassados ao VNS (None = padrão do alwabp_vns.py);
+# early_stop: para ao atingir o limitante inferior (LB de instances.csv e limitantes da instância)
+DEFAULT_PARAMS: Dict[str, Any] = {"max_iter": None, "time_limit": None, "max_evaluations": None, "trace": False,
+                                  "early_stop": True}
+
+def trace_filename(output_filename: str) -> str:
+    """ Arquivo do traço de convergência ao lado do arquivo da solução. """
+    return os.path.splitext(output_filename)[0] + ".trace.csv"
+
+def vns_flags(params: Dict[str, Any], output_filename: str, instance_name: str = "") -> str:
+    """ Opções de linha de comando do alwabp_vns.py correspondentes aos parâmetros. """
+    flags = ""
+    if not params["early_stop"]:
+        flags += " --no-early-stop"
+    else:
+        # A instância chega pela entrada padrão: o LB conhecido é repassado explicitamente
+        known = alwabp_bounds.known_bounds(instance_name)
+        if known is not None:
+            flags += f" --lower-bound {known[0]}"
+    if params["max_iter"] is not None:
+        flags += f" --max-iter {params['max_iter']}"
+    if params["time_limit"] is not None:
+        flags += f" --time-limit {params['time_limit']}"
+    if params["max_evaluations"] is not None:
+        flags += f" --max-evaluations {params['max_evaluations']}"
+    if params["trace"]:
+        flags += f" --trace {trace_filename(output_filename)}"
+    return flags
+
 # Função para executar uma única replicação
-def run_single_replication(instance_path, instance_name, rep, seed):
+def run_single_replication(instance_path, instance_name, rep, seed, params=DEFAULT_PARAMS) -> Dict[str, Any]:
     """
-    Executa uma única replicação do VNS e retorna a linha de resumo.
+    Executa uma única replicação do VNS num subprocesso e retorna o resultado estruturado
+    (o mesmo formato de run_single_replication_in_process).
     """
     # Garante que o diretório de saída exista, pois o ProcessPoolExecutor
     # executa em processos separados onde o estado do diretório pode não ser garantido.
@@ -28,35 +77,158 @@ def run_single_replication(instance_path, instance_name, rep, seed):
         os.makedirs(OUTPUT_DIR, exist_ok=True)
         
     output_filename = os.path.join(OUTPUT_DIR, f"{instance_name}_rep{rep+1}_seed{seed}.txt")
+    result = {"instance": instance_name, "replication": rep + 1, "seed": seed,
+              "output_file": output_filename, "error": None}
     
     # Comando de execução adaptado para Windows/CMD:
     # python VNS_SCRIPT output_file seed < instance_path
     # Usaremos 'python' para compatibilidade, mas o usuário pode precisar mudar para 'python3'
-    command = f"python {VNS_SCRIPT} {output_filename} {seed} < {instance_path}"
+    command = f"python {VNS_SCRIPT} {output_filename} {seed}{vns_flags(params, output_filename, instance_name)} < {instance_path}"
     
     try:
         # Executa o comando e captura a saída padrão (stdout)
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        process = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
         
         # A saída padrão deve ser: SI;SF;Time_s
-        summary_line = result.stdout.strip()
-        
-        # Retorna a linha completa para o CSV
-        return f"{instance_name};{rep+1};{seed};{summary_line}"
+        si, sf, time_s = (float(value) for value in process.stdout.strip().split(";"))
+        result.update(si=si, sf=sf, time_s=time_s)
         
     except subprocess.CalledProcessError as e:
-        error_msg = f"ERRO: Falha na execução. Stderr: {e.stderr.strip()}"
-        print(f"\n{instance_name} - Replicação {rep+1} (Semente: {seed}): {error_msg}")
-        return f"{instance_name};{rep+1};{seed};ERROR;ERROR;ERROR"
+        result["error"] = f"Falha na execução. Stderr: {e.stderr.strip()}"
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+# --- Modo em processo: alwabp_vns é importado uma vez por processo do pool ---
+
+# Instâncias já lidas (nome -> ALWABPInstance, ou a mensagem de erro da leitura).
+# No processo principal é preenchido antes de criar o pool; com "fork" os filhos
+# herdam o dicionário, caso contrário ele é enviado uma única vez pelo initializer.
+_INSTANCES: Dict[str, Any] = {}
+
+def load_instances() -> Dict[str, Any]:
+    """ Carrega todas as instâncias uma única vez, a partir do cache compilado do diretório. """
+    import instance_cache
+
+    return instance_cache.load_instances(INSTANCES_DIR)
+
+def _init_worker(instances):
+    """ Initializer do pool: recebe as instâncias quando não há herança via fork. """
+    global _INSTANCES
+    if instances is not None:
+        _INSTANCES = instances
+
+def run_single_replication_in_process(instance_name, rep, seed, params=DEFAULT_PARAMS) -> Dict[str, Any]:
+    """
+    Executa uma replicação chamando vns() diretamente e retorna o resultado estruturado.
+    """
+    import alwabp_vns
+
+    output_filename = os.path.join(OUTPUT_DIR, f"{instance_name}_rep{rep+1}_seed{seed}.txt")
+    result = {"instance": instance_name, "replication": rep + 1, "seed": seed,
+              "output_file": output_filename, "error": None}
+
+    instance = _INSTANCES.get(instance_name)
+    if not isinstance(instance, alwabp_vns.ALWABPInstance):
+        result["error"] = instance or "instância não carregada"
+        return result
+
+    try:
+        max_iter = params["max_iter"] if params["max_iter"] is not None else alwabp_vns.MAX_ITER
+        lower_bound = None
+        if params["early_stop"]:
+            known = alwabp_bounds.known_bounds(instance_name)
+            lower_bound = alwabp_bounds.lower_bound(instance, known[0] if known is not None else None)
+        vns_result = alwabp_vns.run_vns(instance, seed, max_iter or None, time_limit=params["time_limit"],
+                                        max_evaluations=params["max_evaluations"], lower_bound=lower_bound)
+        alwabp_vns.write_solution(output_filename, vns_result["best_solution"])
+        if params["trace"]:
+            alwabp_vns.write_trace(trace_filename(output_filename), vns_result["trace"])
+        result.update(si=vns_result["si"], sf=vns_result["sf"], time_s=vns_result["time_s"],
+                      evaluations=vns_result["evaluations"])
     except Exception as e:
-        error_msg = f"ERRO: {e}"
-        print(f"\n{instance_name} - Replicação {rep+1} (Semente: {seed}): {error_msg}")
-        return f"{instance_name};{rep+1};{seed};ERROR;ERROR;ERROR"
+        result["error"] = str(e)
+    return result
+
+def task_key_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """ Parâmetros que entram na chave da tarefa (o traço não altera o resultado). """
+    return results_store.configuration_params(params)
+
+def cached_result(row: Dict[str, Any], instance_name: str, rep: int, seed: int) -> Dict[str, Any]:
+    """
+    Resultado estruturado a partir de uma execução já registrada na base; regrava o
+    arquivo da solução se ele não existir mais no diretório de saída.
+    """
+    output_filename = os.path.join(OUTPUT_DIR, f"{instance_name}_rep{rep+1}_seed{seed}.txt")
+    if row["solution"] is not None and not os.path.exists(output_filename):
+        with open(output_filename, "w", encoding="utf-8") as f:
+            f.write(row["solution"])
+    return {"instance": instance_name, "replication": rep + 1, "seed": seed, "output_file": output_filename,
+            "error": None, "si": row["si"], "sf": row["sf"], "time_s": row["time_s"],
+            "evaluations": row["evaluations"]}
+
+def load_instance_sizes(path: str = alwabp_bounds.INSTANCES_CSV) -> Dict[Tuple[str, int], Tuple[int, int, int]]:
+    """ (família, número) -> (tarefas, trabalhadores, precedências) lidos de instances.csv. """
+    sizes = {}
+    if not os.path.exists(path):
+        return sizes
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            row = {key.strip(): value for key, value in row.items()}
+            sizes[(row["name"], int(row["num"]))] = (int(row["tasks"]), int(row["workers"]), int(row["deps"]))
+    return sizes
+
+def size_cost(tasks: int, workers: int, deps: int) -> float:
+    """ Custo relativo de uma replicação: vizinhos por passada (n·m) vezes o trabalho por vizinho (n + |P|). """
+    return tasks * workers * (tasks + deps)
+
+def estimate_costs(instance_names: List[str], measured: Dict[str, float],
+                   sizes: Dict[Tuple[str, int], Tuple[int, int, int]]) -> Dict[str, float]:
+    """
+    Custo estimado (em segundos) de uma replicação de cada instância: o tempo médio medido,
+    se houver; senão o custo pelo tamanho, convertido pela razão tempo/custo das instâncias
+    medidas. Instâncias sem medição nem tamanho conhecido recebem o maior custo (vão primeiro).
+    """
+    by_size = {}
+    for name in instance_names:
+        key = alwabp_bounds.instance_key(name)
+        if key in sizes:
+            by_size[name] = size_cost(*sizes[key])
+    calibrated = [name for name in by_size if name in measured]
+    total_cost = sum(by_size[name] for name in calibrated)
+    scale = sum(measured[name] for name in calibrated) / total_cost if total_cost > 0 else 1.0
 
+    costs = {name: measured[name] if name in measured else by_size[name] * scale
+             for name in instance_names if name in measured or name in by_size}
+    highest = max(costs.values(), default=1.0)
+    return {name: costs.get(name, highest) for name in instance_names}
 
-def run_experiment_parallel():
+def run_chunk(job, tasks: List[Tuple]) -> List[Dict[str, Any]]:
+    """ Executa um lote de tarefas no mesmo processo do pool. """
+    return [job(*task) for task in tasks]
+
+def format_result(result: Dict[str, Any]) -> str:
+    """ Converte um resultado estruturado na linha do CSV de resumo. """
+    prefix = f"{result['instance']};{result['replication']};{result['seed']}"
+    if result["error"] is not None:
+        print(f"\n{result['instance']} - Replicação {result['replication']} (Semente: {result['seed']}): ERRO: {result['error']}")
+        return f"{prefix};ERROR;ERROR;ERROR"
+    return f"{prefix};{result['si']};{result['sf']};{result['time_s']:.4f}"
+
+
+def run_experiment_parallel(in_process: bool = False, params: Dict[str, Any] = DEFAULT_PARAMS,
+                            db_path: str = results_store.DEFAULT_DB, force: bool = False,
+                            workers: int = None, chunksize: int = CHUNKSIZE):
     """
     Executa o VNS para todas as instâncias com múltiplas replicações em paralelo.
+    Com in_process=True, cada processo do pool chama vns() diretamente sobre
+    instâncias lidas uma única vez, sem iniciar um interpretador por replicação.
+    params: limites de parada (max_iter, time_limit, max_evaluations) e gravação do traço.
+    Cada resultado é registrado na base de resultados (db_path) pelo processo principal,
+    com a chave da tarefa; tarefas já concluídas são reaproveitadas, a menos que force=True.
+    As tarefas pendentes são despachadas em ordem decrescente de custo estimado, em lotes de
+    chunksize tarefas, para workers processos (None = número de núcleos da CPU).
     """
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
@@ -64,43 +236,108 @@ def run_experiment_parallel():
     instance_files = sorted(glob.glob(os.path.join(INSTANCES_DIR, "*")))
     
     print(f"Iniciando experimentos em paralelo: {len(instance_files)} instâncias x {NUM_REPLICATIONS} replicações.")
-    print(f"Resultados serão salvos em: {SUMMARY_FILE}")
+    print(f"Resultados serão salvos em: {db_path} e {SUMMARY_FILE}")
 
     tasks = []
+    version = results_store.solver_version()
+    key_params = task_key_params(params)
     
-    # Cria a lista de tarefas a serem executadas
+    # Cria a lista de tarefas a serem executadas, cada uma com a sua chave
     for instance_path in instance_files:
         instance_name = os.path.basename(instance_path)
+        digest = results_store.file_digest(instance_path)
         for rep in range(NUM_REPLICATIONS):
             seed = SEEDS[rep]
-            tasks.append((instance_path, instance_name, rep, seed))
+            key = results_store.job_key(digest, seed, key_params, version)
+            if in_process:
+                tasks.append((key, (instance_name, rep, seed, params)))
+            else:
+                tasks.append((key, (instance_path, instance_name, rep, seed, params)))
+
+    with results_store.ResultsStore(db_path) as store:
+        completed = {} if force else store.completed_jobs([key for key, _ in tasks])
+        measured = store.mean_times()
+    pending = [(key, task) for key, task in tasks if key not in completed]
+    print(f"Tarefas: {len(tasks)} ({len(tasks) - len(pending)} já concluídas na base, {len(pending)} a executar).")
+
+    # Maior custo primeiro (LPT); a ordenação é estável, então empates mantêm a ordem dos arquivos
+    costs = estimate_costs([os.path.basename(path) for path in instance_files], measured, load_instance_sizes())
+    pending.sort(key=lambda item: costs[item[1][-4]], reverse=True)
+    chunksize = max(1, chunksize)
+    chunks = [pending[start:start + chunksize] for start in range(0, len(pending), chunksize)]
+
+    executor_kwargs: Dict[str, Any] = {}
+    job = run_single_replication
+    if in_process and pending:
+        global _INSTANCES
+        _INSTANCES = load_instances()
+        job = run_single_replication_in_process
+        if "fork" in multiprocessing.get_all_start_methods():
+            executor_kwargs["mp_context"] = multiprocessing.get_context("fork")
+            executor_kwargs.update(initializer=_init_worker, initargs=(None,))
+        else:
+            executor_kwargs.update(initializer=_init_worker, initargs=(_INSTANCES,))
 
     # Executa as tarefas em paralelo
     # O max_workers é o número de processos a serem usados. Por padrão, usa o número de núcleos da CPU.
-    with ProcessPoolExecutor() as executor:
-        futures = [executor.submit(run_single_replication, *task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers, **executor_kwargs) as executor, \
+            results_store.ResultsStore(db_path) as store, open(SUMMARY_FILE, "w") as summary:
+        futures = {executor.submit(run_chunk, job, [task for _, task in chunk]): [key for key, _ in chunk]
+                   for chunk in chunks}
         
         # Cabeçalho do arquivo CSV de resumo
-        with open(SUMMARY_FILE, "w") as f:
-            f.write("Instance;Replication;Seed;SI;SF;Time_s\n")
+        summary.write("Instance;Replication;Seed;SI;SF;Time_s\n")
+
+        # O resumo cobre o experimento inteiro: primeiro as tarefas reaproveitadas da base
+        for key, task in tasks:
+            if key in completed:
+                summary.write(format_result(cached_result(completed[key], *task[-4:-1])) + "\n")
+        summary.flush()
             
         print("\nProgresso:")
         
-        # Coleta os resultados à medida que ficam prontos
-        for i, future in enumerate(as_completed(futures)):
-            result_line = future.result()
-            
-            # Escreve no arquivo de resumo
-            with open(SUMMARY_FILE, "a") as f:
-                f.write(result_line + "\n")
-                
-            # Exibe o progresso
-            total_tasks = len(tasks)
-            progress = (i + 1) / total_tasks * 100
-            print(f"  -> Concluído {i + 1}/{total_tasks} ({progress:.2f}%)", end='\r', flush=True)
-
-    print("\n\nExperimentos concluídos. Resultados no arquivo:", SUMMARY_FILE)
+        # Coleta os resultados à medida que os lotes ficam prontos
+        done = 0
+        for future in as_completed(futures):
+            for key, result in zip(futures[future], future.result()):
+                result["job_key"] = key
+                store.add_result(result, key_params)
+
+                # Escreve no arquivo de resumo
+                summary.write(format_result(result) + "\n")
+                summary.flush()
+
+                # Exibe o progresso
+                done += 1
+                total_tasks = len(pending)
+                progress = done / total_tasks * 100
+                print(f"  -> Concluído {done}/{total_tasks} ({progress:.2f}%)", end='\r', flush=True)
+
+    print("\n\nExperimentos concluídos. Resultados em:", db_path, "e", SUMMARY_FILE)
     print("O usuário deve calcular as médias e desvios a partir deste CSV.")
 
 if __name__ == "__main__":
-    run_experiment_parallel()
+    parser = argparse.ArgumentParser(description="Executa o VNS em paralelo para todas as instâncias.")
+    parser.add_argument("--in-process", action="store_true",
+                        help="chama vns() diretamente nos processos do pool (sem subprocessos por replicação)")
+    parser.add_argument("--max-iter", type=int, default=None, help="iterações máximas do VNS (0 = sem limite)")
+    parser.add_argument("--time-limit", type=float, default=None, help="limite de tempo por replicação (s)")
+    parser.add_argument("--max-evaluations", type=int, default=None, help="limite de avaliações por replicação")
+    parser.add_argument("--trace", action="store_true", help="grava o traço de convergência de cada replicação")
+    parser.add_argument("--db", default=results_store.DEFAULT_DB,
+                        help=f"base SQLite de resultados (padrão: {results_store.DEFAULT_DB})")
+    parser.add_argument("--no-early-stop", action="store_true",
+                        help="não para as replicações ao atingir o limitante inferior (LB)")
+    parser.add_argument("--force", action="store_true",
+                        help="executa novamente as tarefas já concluídas na base de resultados")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processos em paralelo (padrão: número de núcleos da CPU)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE,
+                        help=f"tarefas enviadas juntas a cada processo (padrão: {CHUNKSIZE})")
+    args = parser.parse_args()
+    if args.max_iter == 0 and args.time_limit is None and args.max_evaluations is None:
+        parser.error("--max-iter 0 exige --time-limit ou --max-evaluations")
+    params = {"max_iter": args.max_iter, "time_limit": args.time_limit,
+              "max_evaluations": args.max_evaluations, "trace": args.trace, "early_stop": not args.no_early_stop}
+    run_experiment_parallel(in_process=args.in_process, params=params, db_path=args.db, force=args.force,
+                            workers=args.workers, chunksize=args.chunksize)
@@ -3,6 +3,8 @@ import subprocess
 import glob
 import time
 from typing import List, Dict
+
+import results_store
 """
 
     execução para windows cmd
@@ -15,6 +17,7 @@ INSTANCES_DIR = "alwabp"
 VNS_SCRIPT = "alwabp_vns.py"
 OUTPUT_DIR = "vns_results"
 SUMMARY_FILE = os.path.join(OUTPUT_DIR, "summary_results.csv")
+RESULTS_DB = results_store.DEFAULT_DB
 
 def run_experiment():
     """
@@ -33,46 +36,52 @@ def run_experiment():
         f.write("Instance;Replication;Seed;SI;SF;Time_s\n")
 
     print(f"Iniciando experimentos: {len(instance_files)} instâncias x {NUM_REPLICATIONS} replicações...")
-
-    for instance_path in instance_files:
-        instance_name = os.path.basename(instance_path)
-        print(f"\nProcessando instância: {instance_name}")
+    with results_store.ResultsStore(RESULTS_DB) as store:
+        for instance_path in instance_files:
+            instance_name = os.path.basename(instance_path)
+            print(f"\nProcessando instância: {instance_name}")
         
-        for rep in range(NUM_REPLICATIONS):
-            seed = SEEDS[rep]
-            output_filename = os.path.join(OUTPUT_DIR, f"{instance_name}_rep{rep+1}_seed{seed}.txt")
+            for rep in range(NUM_REPLICATIONS):
+                seed = SEEDS[rep]
+                output_filename = os.path.join(OUTPUT_DIR, f"{instance_name}_rep{rep+1}_seed{seed}.txt")
             
-            print(f"  -> Replicação {rep+1} (Semente: {seed})...", end="", flush=True)
+                print(f"  -> Replicação {rep+1} (Semente: {seed})...", end="", flush=True)
             
-            # Comando de execução adaptado para Windows/CMD:
-            # python VNS_SCRIPT output_file seed < instance_path
-            # Nota: O uso de 'python' em vez de 'python3' é mais comum no Windows
-            command = f"python {VNS_SCRIPT} {output_filename} {seed} < {instance_path}"
+                # Comando de execução adaptado para Windows/CMD:
+                # python VNS_SCRIPT output_file seed < instance_path
+                # Nota: O uso de 'python' em vez de 'python3' é mais comum no Windows
+                command = f"python {VNS_SCRIPT} {output_filename} {seed} < {instance_path}"
             
-            try:
-                # Executa o comando e captura a saída padrão (stdout)
-                # O VNS_SCRIPT imprime a linha de resumo (SI;SF;Time_s) no stdout
-                result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+                try:
+                    # Executa o comando e captura a saída padrão (stdout)
+                    # O VNS_SCRIPT imprime a linha de resumo (SI;SF;Time_s) no stdout
+                    result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+                
+                    # A saída padrão deve ser: SI;SF;Time_s
+                    summary_line = result.stdout.strip()
                 
-                # A saída padrão deve ser: SI;SF;Time_s
-                summary_line = result.stdout.strip()
+                    si, sf, time_s = (float(value) for value in summary_line.split(";"))
                 
-                # Escreve no arquivo de resumo
-                with open(SUMMARY_FILE, "a") as f:
-                    f.write(f"{instance_name};{rep+1};{seed};{summary_line}\n")
+                    # Escreve no arquivo de resumo e na base de resultados
+                    with open(SUMMARY_FILE, "a") as f:
+                        f.write(f"{instance_name};{rep+1};{seed};{summary_line}\n")
+                    store.add_run(instance_name, rep + 1, seed, si=si, sf=sf, time_s=time_s,
+                                  solution=results_store.read_solution_file(output_filename))
                 
-                print(" OK")
+                    print(" OK")
                 
-            except subprocess.CalledProcessError as e:
-                print(f" ERRO: Falha na execução. Stderr: {e.stderr.strip()}")
-                with open(SUMMARY_FILE, "a") as f:
-                    f.write(f"{instance_name};{rep+1};{seed};ERROR;ERROR;ERROR\n")
-            except Exception as e:
-                print(f" ERRO: {e}")
-                with open(SUMMARY_FILE, "a") as f:
-                    f.write(f"{instance_name};{rep+1};{seed};ERROR;ERROR;ERROR\n")
+                except subprocess.CalledProcessError as e:
+                    print(f" ERRO: Falha na execução. Stderr: {e.stderr.strip()}")
+                    store.add_run(instance_name, rep + 1, seed, error=e.stderr.strip())
+                    with open(SUMMARY_FILE, "a") as f:
+                        f.write(f"{instance_name};{rep+1};{seed};ERROR;ERROR;ERROR\n")
+                except Exception as e:
+                    print(f" ERRO: {e}")
+                    store.add_run(instance_name, rep + 1, seed, error=str(e))
+                    with open(SUMMARY_FILE, "a") as f:
+                        f.write(f"{instance_name};{rep+1};{seed};ERROR;ERROR;ERROR\n")
 
-    print("\nExperimentos concluídos. Resultados no arquivo:", SUMMARY_FILE)
+    print("\nExperimentos concluídos. Resultados em:", RESULTS_DB, "e", SUMMARY_FILE)
     print("O usuário deve calcular as médias e desvios a partir deste CSV.")
 
 if __name__ == "__main__":
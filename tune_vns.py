@@ -0,0 +1,280 @@
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import itertools
+import multiprocessing
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple
+
+import alwabp_vns
+import alwabp_bounds
+import instance_cache
+"""
+
+    ajuste de parâmetros do VNS por corrida estatística (racing)
+
+    Configurações (MAX_ITER, K_max, modo de shaking, sequência de vizinhanças do VND e
+    construção inicial) são sorteadas e avaliadas, família por família, em blocos
+    (instância, semente). Cada bloco roda todas as configurações ainda vivas num pool
+    de processos. Após alguns blocos, o teste de Friedman sobre os postos decide se há
+    diferença; havendo, são eliminadas as configurações cujo posto médio fica acima do da
+    melhor por mais que a diferença crítica (Bonferroni-Dunn). O custo de cada execução
+    combina qualidade e tempo de CPU: gap para o LB (%) + TIME_WEIGHT * segundos de CPU.
+
+"""
+# Configurações
+INSTANCES_DIR = "alwabp"
+NUM_CONFIGS = 24 # Configurações sorteadas (além da configuração padrão)
+MAX_BLOCKS = 30 # Blocos (instância, semente) por família
+FIRST_TEST = 5 # Blocos antes do primeiro teste estatístico
+ALPHA = 0.05 # Nível de significância do teste de Friedman e da eliminação
+TIME_WEIGHT = 1.0 # Pontos percentuais de gap equivalentes a um segundo de CPU
+INFEASIBLE_GAP = 1000.0 # Gap atribuído a execuções sem solução factível
+
+# Espaço de busca
+SPACE: Dict[str, List[Any]] = {
+    "max_iter": [25, 50, 100, 200],
+    "k_max": [1, 2, 3],
+    "shaking_mode": list(alwabp_vns.SHAKING_MODES),
+    "construction": list(alwabp_vns.CONSTRUCTIONS),
+    # Sequências de 1 a 3 vizinhanças distintas do VND, em qualquer ordem
+    "neighborhoods": [list(order) for size in (1, 2, 3)
+                      for order in itertools.permutations(alwabp_vns.VND_NEIGHBORHOODS, size)],
+}
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "max_iter": alwabp_vns.MAX_ITER, "k_max": alwabp_vns.K_MAX, "shaking_mode": "feasible",
+    "construction": "station", "neighborhoods": list(alwabp_vns.DEFAULT_VND),
+}
+
+def sample_configs(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    """ A configuração padrão seguida de `count` configurações distintas sorteadas do espaço de busca. """
+    configs = [dict(DEFAULT_CONFIG)]
+    seen = {config_label(DEFAULT_CONFIG)}
+    attempts = 0
+    while len(configs) < count + 1 and attempts < 100 * (count + 1):
+        attempts += 1
+        config = {key: rng.choice(values) for key, values in SPACE.items()}
+        if config_label(config) not in seen:
+            seen.add(config_label(config))
+            configs.append(config)
+    return configs
+
+def config_label(config: Dict[str, Any]) -> str:
+    return (f"iter={config['max_iter']} k={config['k_max']} shaking={config['shaking_mode']} "
+            f"initial={config['construction']} vnd={','.join(config['neighborhoods'])}")
+
+# --- Estatística ---
+
+def block_ranks(scores: List[float]) -> List[float]:
+    """ Postos (1 = menor custo) dos custos de um bloco, com empates recebendo o posto médio. """
+    order = sorted(range(len(scores)), key=scores.__getitem__)
+    ranks = [0.0] * len(scores)
+    position = 0
+    while position < len(order):
+        end = position
+        while end + 1 < len(order) and scores[order[end + 1]] == scores[order[position]]:
+            end += 1
+        for index in order[position:end + 1]:
+            ranks[index] = (position + end) / 2 + 1
+        position = end + 1
+    return ranks
+
+def _upper_incomplete_gamma_ratio(a: float, x: float) -> float:
+    """ Q(a, x) = Γ(a, x) / Γ(a), por série (x < a + 1) ou fração contínua (Numerical Recipes). """
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        denominator = a
+        for _ in range(500):
+            denominator += 1
+            term *= x / denominator
+            total += term
+            if abs(term) < abs(total) * 1e-14:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    b = x + 1 - a
+    c = 1.0 / 1e-300
+    d = 1.0 / b
+    h = d
+    for i in range(1, 500):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = 1e-300 if abs(d) < 1e-300 else d
+        c = b + an / c
+        c = 1e-300 if abs(c) < 1e-300 else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-14:
+            break
+    return math.exp(log_prefix) * h
+
+def friedman_test(rank_rows: List[List[float]]) -> Tuple[float, float]:
+    """ Estatística de Friedman (com correção para empates) e seu p-valor (qui-quadrado com k-1 g.l.). """
+    blocks, k = len(rank_rows), len(rank_rows[0])
+    rank_sums = [sum(row[j] for row in rank_rows) for j in range(k)]
+    sum_squares = sum(r * r for row in rank_rows for r in row)
+    correction = blocks * k * (k + 1) ** 2 / 4
+    numerator = (k - 1) * (sum(r * r for r in rank_sums) - blocks * correction)
+    denominator = sum_squares - correction
+    if denominator <= 0:
+        return 0.0, 1.0
+    statistic = numerator / denominator
+    return statistic, _upper_incomplete_gamma_ratio((k - 1) / 2, statistic / 2)
+
+def critical_difference(k: int, blocks: int, alpha: float) -> float:
+    """ Diferença crítica de postos médios (Bonferroni-Dunn, comparações com a melhor configuração). """
+    z = NormalDist().inv_cdf(1 - alpha / (2 * (k - 1)))
+    return z * math.sqrt(k * (k + 1) / (6 * blocks))
+
+# --- Execução ---
+
+_INSTANCES: Dict[str, Any] = {}
+
+def _init_worker(instances):
+    global _INSTANCES
+    if instances is not None:
+        _INSTANCES = instances
+
+def run_config(config: Dict[str, Any], instance_name: str, seed: int, lb: float, time_weight: float) -> Dict[str, Any]:
+    """ Executa uma configuração num bloco e retorna SF, gap, tempo de CPU e o custo. """
+    instance = _INSTANCES[instance_name]
+    cpu_start = time.process_time()
+    result = alwabp_vns.run_vns(instance, seed, config["max_iter"], config["k_max"],
+                                shaking_mode=config["shaking_mode"], construction=config["construction"],
+                                neighborhoods=tuple(config["neighborhoods"]),
+                                lower_bound=alwabp_bounds.lower_bound(instance, lb))
+    cpu_s = time.process_time() - cpu_start
+    gap = 100.0 * (result["sf"] - lb) / lb if result["sf"] < alwabp_vns.INF else INFEASIBLE_GAP
+    return {"sf": result["sf"], "gap": gap, "cpu_s": cpu_s, "score": gap + time_weight * cpu_s}
+
+def race(executor: ProcessPoolExecutor, configs: List[Dict[str, Any]], blocks: List[Tuple[str, int, float]],
+         alpha: float, first_test: int, time_weight: float, log=print) -> Dict[str, Any]:
+    """
+    Corrida sobre os blocos de uma família. Retorna as configurações sobreviventes
+    (ordenadas por posto médio) e o histórico de eliminações.
+    """
+    alive = list(range(len(configs)))
+    runs: Dict[int, List[Dict[str, Any]]] = {c: [] for c in alive}
+    eliminated: List[Dict[str, Any]] = []
+    experiments = 0
+    completed = 0
+
+    for block, (instance_name, seed, lb) in enumerate(blocks):
+        futures = {c: executor.submit(run_config, configs[c], instance_name, seed, lb, time_weight) for c in alive}
+        for c, future in futures.items():
+            runs[c].append(future.result())
+        experiments += len(alive)
+        completed = block + 1
+
+        if completed < first_test or len(alive) < 2:
+            continue
+        rank_rows = [block_ranks([runs[c][b]["score"] for c in alive]) for b in range(completed)]
+        statistic, p_value = friedman_test(rank_rows)
+        if p_value >= alpha:
+            continue
+        mean_ranks = [sum(row[j] for row in rank_rows) / completed for j in range(len(alive))]
+        best_rank = min(mean_ranks)
+        limit = best_rank + critical_difference(len(alive), completed, alpha)
+        survivors = [c for j, c in enumerate(alive) if mean_ranks[j] <= limit]
+        for j, c in enumerate(alive):
+            if c not in survivors:
+                eliminated.append({"config": configs[c], "block": completed, "mean_rank": mean_ranks[j]})
+        if len(survivors) < len(alive):
+            log(f"  bloco {completed}: Friedman={statistic:.2f} p={p_value:.4f}, "
+                f"{len(alive) - len(survivors)} eliminadas, {len(survivors)} vivas")
+        alive = survivors
+        if len(alive) == 1:
+            break
+
+    rank_rows = [block_ranks([runs[c][b]["score"] for c in alive]) for b in range(completed)]
+    ranking = []
+    for j, c in enumerate(alive):
+        history = runs[c][:completed]
+        ranking.append({
+            "config": configs[c],
+            "mean_rank": sum(row[j] for row in rank_rows) / completed if completed else 0.0,
+            "mean_score": sum(r["score"] for r in history) / len(history),
+            "mean_gap": sum(r["gap"] for r in history) / len(history),
+            "mean_cpu_s": sum(r["cpu_s"] for r in history) / len(history),
+        })
+    ranking.sort(key=lambda row: (row["mean_rank"], row["mean_score"]))
+    return {"blocks": completed, "experiments": experiments, "survivors": ranking, "eliminated": eliminated}
+
+def family_blocks(instances: Dict[str, Any], known: Dict[Any, Any], family: str, max_blocks: int,
+                  rng: random.Random) -> List[Tuple[str, int, float]]:
+    """ Blocos (instância, semente, LB) da família: instâncias em ordem aleatória, repetidas com novas sementes. """
+    names = [name for name, instance in instances.items()
+             if isinstance(instance, alwabp_vns.ALWABPInstance) and alwabp_bounds.instance_key(name) in known
+             and alwabp_bounds.instance_key(name)[0] == family]
+    if not names:
+        return []
+    rng.shuffle(names)
+    return [(names[b % len(names)], rng.randrange(2 ** 31), known[alwabp_bounds.instance_key(names[b % len(names)])][0])
+            for b in range(max_blocks)]
+
+def tune(families: List[str], num_configs: int = NUM_CONFIGS, max_blocks: int = MAX_BLOCKS, seed: int = 0,
+         workers: int = None, alpha: float = ALPHA, first_test: int = FIRST_TEST,
+         time_weight: float = TIME_WEIGHT) -> Dict[str, Any]:
+    """ Executa uma corrida por família e retorna {família: resultado de race()}. """
+    global _INSTANCES
+    rng = random.Random(seed)
+    _INSTANCES = instance_cache.load_instances(INSTANCES_DIR)
+    known = alwabp_bounds.load_known_bounds()
+    configs = sample_configs(rng, num_configs)
+
+    executor_kwargs: Dict[str, Any] = {"max_workers": workers}
+    if "fork" in multiprocessing.get_all_start_methods():
+        executor_kwargs.update(mp_context=multiprocessing.get_context("fork"), initializer=_init_worker,
+                               initargs=(None,))
+    else:
+        executor_kwargs.update(initializer=_init_worker, initargs=(_INSTANCES,))
+
+    results = {}
+    with ProcessPoolExecutor(**executor_kwargs) as executor:
+        for family in families:
+            blocks = family_blocks(_INSTANCES, known, family, max_blocks, rng)
+            if not blocks:
+                print(f"Aviso: nenhuma instância da família {family}.", file=sys.stderr)
+                continue
+            print(f"{family}: {len(configs)} configurações, até {len(blocks)} blocos")
+            results[family] = race(executor, configs, blocks, alpha, first_test, time_weight)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ajuste de parâmetros do VNS por corrida estatística (racing).")
+    parser.add_argument("--families", nargs="+", choices=list(alwabp_bounds.FAMILIES.values()),
+                        default=list(alwabp_bounds.FAMILIES.values()), help="famílias a ajustar")
+    parser.add_argument("--configs", type=int, default=NUM_CONFIGS, help=f"configurações sorteadas (padrão: {NUM_CONFIGS})")
+    parser.add_argument("--max-blocks", type=int, default=MAX_BLOCKS,
+                        help=f"blocos (instância, semente) por família (padrão: {MAX_BLOCKS})")
+    parser.add_argument("--first-test", type=int, default=FIRST_TEST,
+                        help=f"blocos antes do primeiro teste (padrão: {FIRST_TEST})")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help=f"nível de significância (padrão: {ALPHA})")
+    parser.add_argument("--time-weight", type=float, default=TIME_WEIGHT,
+                        help=f"pontos de gap equivalentes a 1 s de CPU no custo (padrão: {TIME_WEIGHT})")
+    parser.add_argument("--workers", type=int, default=None, help="processos do pool (padrão: nº de núcleos)")
+    parser.add_argument("--seed", type=int, default=0, help="semente do sorteio de configurações e blocos")
+    parser.add_argument("--output", default=None, help="arquivo JSON com o resultado completo")
+    args = parser.parse_args()
+
+    results = tune(args.families, args.configs, args.max_blocks, args.seed, args.workers, args.alpha,
+                   args.first_test, args.time_weight)
+    print("\nMelhor configuração por família:")
+    for family, result in results.items():
+        best = result["survivors"][0]
+        print(f"{family}: {config_label(best['config'])}")
+        print(f"    posto médio {best['mean_rank']:.2f}, gap {best['mean_gap']:.2f}%, "
+              f"CPU {best['mean_cpu_s']:.3f} s ({len(result['survivors'])} sobreviventes, "
+              f"{result['blocks']} blocos, {result['experiments']} execuções)")
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)